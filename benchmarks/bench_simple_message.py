@@ -0,0 +1,294 @@
+# Copyright 2021 Norwegian University of Science and Technology.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Microbenchmarks for the Simple Message codec.
+
+Times `to_bytes`/`from_bytes` of the body and of the full, framed
+`SimpleMessage` for every entry in `MSG_TYPE_CLS`, with 1 to 4 groups for the
+Ex message types. For every operation the time per op, messages per second and
+the allocations per op (blocks and bytes still alive after the op, i.e. the
+decoded objects or the encoded bytes, as measured with tracemalloc) are
+reported.
+
+Usage:
+
+    python benchmarks/bench_simple_message.py --output before.json
+    python benchmarks/bench_simple_message.py --compare before.json
+"""
+
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import argparse
+import json
+import platform
+import sys
+import timeit
+import tracemalloc
+
+from moto.simple_message import (
+    CommandType,
+    CommType,
+    DhLink,
+    DhParameters,
+    Header,
+    IoResultCodes,
+    JointFeedback,
+    JointFeedbackEx,
+    JointTrajPtExData,
+    JointTrajPtFull,
+    JointTrajPtFullEx,
+    MotoGetDhParameters,
+    MotoIoCtrlReply,
+    MotoMotionCtrl,
+    MotoMotionReply,
+    MotoReadIO,
+    MotoReadIOReply,
+    MotoRealTimeMotionJointCommandEx,
+    MotoRealTimeMotionJointCommandExData,
+    MotoRealTimeMotionJointStateEx,
+    MotoRealTimeMotionJointStateExData,
+    MotoRealTimeMotionMode,
+    MotoWriteIO,
+    MotoWriteIOReply,
+    MsgType,
+    PendantMode,
+    ReplyType,
+    ResultType,
+    RobotStatus,
+    SelectTool,
+    SimpleMessage,
+    Ternary,
+    ValidFields,
+    MOT_MAX_GR,
+    MSG_TYPE_CLS,
+    ROS_MAX_JOINT,
+)
+
+JOINTS = [0.1 * k for k in range(ROS_MAX_JOINT)]
+VALID_FIELDS = ValidFields.TIME | ValidFields.POSITION | ValidFields.VELOCITY
+
+EX_MSG_TYPES = (
+    MsgType.MOTO_JOINT_TRAJ_PT_FULL_EX,
+    MsgType.MOTO_JOINT_FEEDBACK_EX,
+    MsgType.MOTO_REALTIME_MOTION_JOINT_STATE_EX,
+    MsgType.MOTO_REALTIME_MOTION_JOINT_COMMAND_EX,
+)
+
+
+def joint_feedback(groupno: int) -> JointFeedback:
+    return JointFeedback(groupno, VALID_FIELDS, 1.0, JOINTS, JOINTS, JOINTS)
+
+
+def sample_body(msg_type: MsgType, groups: int) -> Any:
+    if msg_type is MsgType.ROBOT_STATUS:
+        return RobotStatus(
+            Ternary.TRUE,
+            Ternary.FALSE,
+            0,
+            Ternary.FALSE,
+            Ternary.TRUE,
+            PendantMode.AUTO,
+            Ternary.TRUE,
+        )
+    if msg_type is MsgType.JOINT_TRAJ_PT_FULL:
+        return JointTrajPtFull(0, 1, VALID_FIELDS, 1.0, JOINTS, JOINTS, JOINTS)
+    if msg_type is MsgType.JOINT_FEEDBACK:
+        return joint_feedback(0)
+    if msg_type is MsgType.MOTO_MOTION_CTRL:
+        return MotoMotionCtrl(0, 1, CommandType.CHECK_MOTION_READY)
+    if msg_type is MsgType.MOTO_MOTION_REPLY:
+        return MotoMotionReply(
+            0, 1, CommandType.CHECK_MOTION_READY, ResultType.SUCCESS, 0
+        )
+    if msg_type is MsgType.MOTO_JOINT_TRAJ_PT_FULL_EX:
+        return JointTrajPtFullEx(
+            groups,
+            1,
+            [
+                JointTrajPtExData(groupno, VALID_FIELDS, 1.0, JOINTS, JOINTS, JOINTS)
+                for groupno in range(groups)
+            ],
+        )
+    if msg_type is MsgType.MOTO_JOINT_FEEDBACK_EX:
+        return JointFeedbackEx(groups, [joint_feedback(g) for g in range(groups)])
+    if msg_type in (MsgType.MOTO_READ_IO_BIT, MsgType.MOTO_READ_IO_GROUP):
+        return MotoReadIO(27010)
+    if msg_type in (MsgType.MOTO_READ_IO_BIT_REPLY, MsgType.MOTO_READ_IO_GROUP_REPLY):
+        return MotoReadIOReply(1, IoResultCodes.OK)
+    if msg_type in (MsgType.MOTO_WRITE_IO_BIT, MsgType.MOTO_WRITE_IO_GROUP):
+        return MotoWriteIO(27010, 1)
+    if msg_type in (
+        MsgType.MOTO_WRITE_IO_BIT_REPLY,
+        MsgType.MOTO_WRITE_IO_GROUP_REPLY,
+    ):
+        return MotoWriteIOReply(IoResultCodes.OK)
+    if msg_type is MsgType.MOTO_IOCTRL_REPLY:
+        return MotoIoCtrlReply(ResultType.SUCCESS, 0)
+    if msg_type is MsgType.MOTO_SELECT_TOOL:
+        return SelectTool(0, 1, 1)
+    if msg_type is MsgType.MOTO_GET_DH_PARAMETERS:
+        return MotoGetDhParameters(
+            [DhParameters([DhLink(0.0, 0.1, 0.2, 0.3)] * 8)] * MOT_MAX_GR
+        )
+    if msg_type is MsgType.MOTO_REALTIME_MOTION_JOINT_STATE_EX:
+        return MotoRealTimeMotionJointStateEx(
+            1,
+            MotoRealTimeMotionMode.JOINT_VELOCITY,
+            groups,
+            [
+                MotoRealTimeMotionJointStateExData(groupno, JOINTS, JOINTS)
+                for groupno in range(groups)
+            ],
+        )
+    if msg_type is MsgType.MOTO_REALTIME_MOTION_JOINT_COMMAND_EX:
+        return MotoRealTimeMotionJointCommandEx(
+            1,
+            groups,
+            [
+                MotoRealTimeMotionJointCommandExData(groupno, JOINTS)
+                for groupno in range(groups)
+            ],
+        )
+    # MsgType.INVALID carries no body
+    return None
+
+
+def cases() -> Iterator[Tuple[MsgType, int]]:
+    for msg_type in MSG_TYPE_CLS:
+        if msg_type in EX_MSG_TYPES:
+            for groups in range(1, MOT_MAX_GR + 1):
+                yield msg_type, groups
+        else:
+            yield msg_type, 1
+
+
+def operations(msg_type: MsgType, groups: int) -> Dict[str, Callable[[], Any]]:
+    cls = MSG_TYPE_CLS[msg_type]
+    body = sample_body(msg_type, groups)
+    msg = SimpleMessage(Header(msg_type, CommType.TOPIC, ReplyType.INVALID), body)
+    msg_bytes = msg.to_bytes()
+    body_bytes = msg_bytes[16:]
+
+    ops = {
+        "body.from_bytes": lambda: cls.from_bytes(body_bytes),
+        "SimpleMessage.from_bytes": lambda: SimpleMessage.from_bytes(msg_bytes),
+    }
+    if body is not None:
+        ops["body.to_bytes"] = body.to_bytes
+        ops["SimpleMessage.to_bytes"] = msg.to_bytes
+    return ops
+
+
+def time_op(op: Callable[[], Any], number: int, repeat: int) -> float:
+    timer = timeit.Timer(op)
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e9
+
+
+def allocations_op(op: Callable[[], Any], number: int) -> Tuple[float, float]:
+    # Keep the results alive so their allocations show up in the snapshot
+    results: List[Any] = [None] * number
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for k in range(number):
+        results[k] = op()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    blocks = sum(stat.count_diff for stat in stats)
+    size = sum(stat.size_diff for stat in stats)
+    del results
+    return blocks / number, size / number
+
+
+def run(number: int, repeat: int) -> List[Dict[str, Any]]:
+    results = []
+    for msg_type, groups in cases():
+        for name, op in operations(msg_type, groups).items():
+            ns_per_op = time_op(op, number, repeat)
+            blocks_per_op, bytes_per_op = allocations_op(op, min(number, 1000))
+            results.append(
+                {
+                    "msg_type": msg_type.name,
+                    "groups": groups,
+                    "operation": name,
+                    "ns_per_op": round(ns_per_op, 1),
+                    "msgs_per_s": round(1e9 / ns_per_op),
+                    "alloc_blocks_per_op": round(blocks_per_op, 2),
+                    "alloc_bytes_per_op": round(bytes_per_op, 1),
+                }
+            )
+    return results
+
+
+def key(result: Dict[str, Any]) -> Tuple[str, int, str]:
+    return result["msg_type"], result["groups"], result["operation"]
+
+
+def report(
+    results: List[Dict[str, Any]], baseline: Optional[List[Dict[str, Any]]] = None
+) -> None:
+    baseline_ns = {key(result): result["ns_per_op"] for result in baseline or []}
+    header = (
+        f"{'msg_type':<38} {'grp':>3} {'operation':<25} {'ns/op':>9} "
+        f"{'msgs/s':>10} {'blocks/op':>9} {'bytes/op':>9}"
+    )
+    if baseline is not None:
+        header += f" {'speedup':>8}"
+    print(header)
+    for result in results:
+        line = (
+            f"{result['msg_type']:<38} {result['groups']:>3} "
+            f"{result['operation']:<25} {result['ns_per_op']:>9.0f} "
+            f"{result['msgs_per_s']:>10} {result['alloc_blocks_per_op']:>9.1f} "
+            f"{result['alloc_bytes_per_op']:>9.0f}"
+        )
+        if baseline is not None:
+            old = baseline_ns.get(key(result))
+            line += f" {old / result['ns_per_op']:>7.2f}x" if old else f" {'-':>8}"
+        print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=5000, help="ops per repeat")
+    parser.add_argument("--repeat", type=int, default=5, help="timing repeats")
+    parser.add_argument("--output", help="save results as JSON to this file")
+    parser.add_argument("--compare", help="JSON results of an earlier run")
+    args = parser.parse_args()
+
+    results = run(args.number, args.repeat)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+    report(results, baseline)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "python": sys.version,
+                    "platform": platform.platform(),
+                    "number": args.number,
+                    "repeat": args.repeat,
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,8 @@
+import numpy as np
+
+from moto import ControlGroupDefinition
 from moto.simple_message import JointTrajPtExData, JointTrajPtFullEx, ValidFields
+from moto.trajectory import Trajectory
 
 p0 = JointTrajPtExData(
     groupno=0,
@@ -42,3 +46,19 @@ t = JointTrajPtFullEx(
 )
 
 
+
+# The same points for a program of any length, built from arrays with
+# moto.trajectory.Trajectory. The joints are padded to 10 values and the valid
+# fields follow from the arrays given.
+robot = ControlGroupDefinition("robot", 0, 6, [f"joint_{k}" for k in range(1, 7)])
+positioner = ControlGroupDefinition("positioner", 1, 2, ["joint_1", "joint_2"])
+
+time = np.arange(50000) * 0.004
+trajectory = Trajectory()
+for group in (robot, positioner):
+    zeros = np.zeros((len(time), group.num_joints))
+    trajectory.add_group(group, time, zeros, vel=zeros)
+
+# Validated at once, the JointTrajPtFullEx points are created one at a time
+points = trajectory.messages()
+assert next(points).to_bytes() == t.to_bytes()
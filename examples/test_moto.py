@@ -111,15 +111,20 @@ if response == 'sure':
     
     # m.motion.start_trajectory_mode()
     print("Waiting for robot to be ready...", end=' ')
-    while not m.state.robot_status().motion_possible and \
-        not m.state.robot_status().drives_powered:
-        time.sleep(0.1)
+    m.state.wait_until_motion_possible()
 
     print("Robot ready. Sending trajectory.")  
-    m.motion.send_joint_trajectory_point(p0) # Current position at time t=0.0
-    m.motion.send_joint_trajectory_point(p1) # Desired position at time t=5.0
-
-    input("Press enter when robot has stopped.")
+    # p0 is the current position at time t=0.0, p1 the desired position
+    execution = m.execute([p0, p1])
+
+    print("Waiting for the robot to reach the goal.")
+    while not execution.done():
+        print(
+            f"Segment {execution.segment}, {execution.remaining_time:.1f} s left,"
+            f" tracking error {execution.tracking_error}"
+        )
+        time.sleep(0.5)
+    print(f"Final tracking error: {execution.result().tracking_error}")
 
     print("Disabling trajectory mode, and turning off servos.") 
     m.motion.stop_trajectory_mode()
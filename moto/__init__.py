@@ -12,14 +12,32 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import List, Mapping, Tuple, Union
-
-from moto.motion_connection import MotionConnection
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from moto.capture import CaptureWriter
+from moto.motion_connection import MotionConnection, TrajectoryPointResult
 from moto.state_connection import StateConnection
+from moto.async_state_connection import AsyncStateConnection, StateStream
 from moto.io_connection import IoConnection
 from moto.real_time_motion_connection import RealTimeMotionConnection
 from moto.control_group import ControlGroupDefinition, ControlGroup
 from moto.simple_message import JointTrajPtExData, JointTrajPtFullEx, JointTrajPtFull
+from moto.robot_status_change import RobotStatusChange, RobotStatusField
+from moto.subscription import BackpressurePolicy, SampleFilter, Subscriber
+from moto.trajectory_execution import TrajectoryExecution, TrajectoryResult
+
+if TYPE_CHECKING:
+    # Requires NumPy
+    from moto.trajectory import Trajectory
 
 
 class Motion:
@@ -63,6 +81,17 @@ class Motion:
             joint_trajectory_point
         )
 
+    def stream_joint_trajectory(
+        self,
+        points: Iterable[Union[JointTrajPtFull, JointTrajPtFullEx]],
+        window: int = 8,
+        callback: Optional[Callable[[TrajectoryPointResult], None]] = None,
+        stop_on_error: bool = True,
+    ) -> List[TrajectoryPointResult]:
+        return self._motion_connection.stream_joint_trajectory(
+            points, window, callback, stop_on_error
+        )
+
 
 class State:
     def __init__(self, state_connection: StateConnection) -> None:
@@ -80,11 +109,89 @@ class State:
     def robot_status(self):
         return self._state_connection.robot_status()
 
-    def add_joint_feedback_msg_callback(self, callback):
-        self._state_connection.add_joint_feedback_msg_callback(callback)
+    def stats(self):
+        return self._state_connection.stats()
+
+    def reset_stats(self):
+        self._state_connection.reset_stats()
+
+    def wait_for(self, predicate, timeout: Optional[float] = None) -> bool:
+        return self._state_connection.wait_for(predicate, timeout)
+
+    def wait_until_position(
+        self,
+        groupno: int,
+        target: List[float],
+        tol: float = 1e-3,
+        timeout: Optional[float] = None,
+    ) -> bool:
+        return self._state_connection.wait_until_position(
+            groupno, target, tol, timeout
+        )
+
+    def wait_until_stopped(self, timeout: Optional[float] = None) -> bool:
+        return self._state_connection.wait_until_stopped(timeout)
+
+    def wait_until_motion_possible(self, timeout: Optional[float] = None) -> bool:
+        return self._state_connection.wait_until_motion_possible(timeout)
+
+    def enable_history(self, groupno: int, capacity: int):
+        return self._state_connection.enable_history(groupno, capacity)
+
+    def history(self, groupno: int):
+        return self._state_connection.history(groupno)
+
+    def enable_estimation(self, estimator=None):
+        return self._state_connection.enable_estimation(estimator)
 
-    def add_joint_feedback_ex_msg_callback(self, callback):
-        self._state_connection.add_joint_feedback_ex_msg_callback(callback)
+    def estimate(self, groupno: int):
+        return self._state_connection.estimate(groupno)
+
+    def enable_shared_state(self, name: Optional[str] = None):
+        return self._state_connection.enable_shared_state(name)
+
+    def disable_shared_state(self):
+        self._state_connection.disable_shared_state()
+
+    def add_joint_feedback_msg_callback(
+        self,
+        callback,
+        policy: BackpressurePolicy = BackpressurePolicy.BLOCK,
+        maxsize: int = 1024,
+        max_rate: Optional[float] = None,
+        every_nth: Optional[int] = None,
+        deadband: Optional[Union[float, List[float]]] = None,
+    ) -> Subscriber:
+        return self._state_connection.add_joint_feedback_msg_callback(
+            callback, policy, maxsize, max_rate, every_nth, deadband
+        )
+
+    def add_joint_feedback_ex_msg_callback(
+        self,
+        callback,
+        policy: BackpressurePolicy = BackpressurePolicy.BLOCK,
+        maxsize: int = 1024,
+        max_rate: Optional[float] = None,
+        every_nth: Optional[int] = None,
+        deadband: Optional[Union[float, List[float]]] = None,
+    ) -> Subscriber:
+        return self._state_connection.add_joint_feedback_ex_msg_callback(
+            callback, policy, maxsize, max_rate, every_nth, deadband
+        )
+
+    def add_robot_status_change_callback(
+        self,
+        callback,
+        fields: Optional[List[RobotStatusField]] = None,
+        policy: BackpressurePolicy = BackpressurePolicy.BLOCK,
+        maxsize: int = 1024,
+    ) -> Subscriber:
+        return self._state_connection.add_robot_status_change_callback(
+            callback, fields, policy, maxsize
+        )
+
+    def remove_callback(self, subscriber: Subscriber) -> None:
+        self._state_connection.remove_callback(subscriber)
 
 
 class IO:
@@ -132,6 +239,7 @@ class Moto:
         start_state_connection: bool = True,
         start_io_connection: bool = True,
         start_real_time_connection: bool = False,
+        recorder: Optional[CaptureWriter] = None,
     ):
         self._robot_ip: str = robot_ip
         self._control_group_defs: List[ControlGroupDefinition] = control_group_defs
@@ -142,6 +250,13 @@ class Moto:
         self._real_time_motion_connection: RealTimeMotionConnection = (
             RealTimeMotionConnection(self._robot_ip)
         )
+        for connection in (
+            self._motion_connection,
+            self._state_connection,
+            self._io_connection,
+            self._real_time_motion_connection,
+        ):
+            connection.set_recorder(recorder)
 
         self._control_groups: Mapping[str, ControlGroup] = {}
         for control_group_def in self._control_group_defs:
@@ -175,3 +290,30 @@ class Moto:
     @property
     def rt(self):
         return RealTimeMotion(self._real_time_motion_connection)
+
+    def execute(
+        self,
+        points: Union[
+            Iterable[Union[JointTrajPtFull, JointTrajPtFullEx]], "Trajectory"
+        ],
+        tol: float = 1e-3,
+        settle_timeout: float = 5.0,
+    ) -> TrajectoryExecution:
+        """Execute a trajectory in the background and track its progress.
+
+        Returns at once with a future that resolves when the robot has reached
+        the last point of every group within `tol`, comparing the joints of
+        the control group definitions.
+        """
+        num_joints = {
+            control_group_def.groupno: control_group_def.num_joints
+            for control_group_def in self._control_group_defs
+        }
+        return TrajectoryExecution(
+            points,
+            self._motion_connection,
+            self._state_connection,
+            tol=tol,
+            settle_timeout=settle_timeout,
+            num_joints=num_joints,
+        ).start()
@@ -0,0 +1,402 @@
+# Copyright 2021 Norwegian University of Science and Technology.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from collections import deque
+
+import asyncio
+import time
+
+from moto.capture import CaptureWriter, Direction
+from moto.simple_message import (
+    JointFeedback,
+    JointFeedbackEx,
+    MsgType,
+    RobotStatus,
+    SimpleMessage,
+    Ternary,
+    MOT_MAX_GR,
+)
+from moto.simple_message_connection import MessageFramer
+from moto.statistics import MessageStatistics, Statistics
+from moto.subscription import BackpressurePolicy
+
+
+class StateStream:
+    """Async iterator over the state messages of one kind.
+
+    Created by `AsyncStateConnection.feedback`, `feedback_ex` and
+    `robot_status_stream`. Messages are queued by the protocol callback and
+    the stream must be closed (or used as an async context manager) when the
+    consumer is done. With the BLOCK policy, a full queue pauses reading from
+    the socket until the consumer catches up, which delays all streams of the
+    connection. With COALESCE only the latest message is kept.
+    """
+
+    def __init__(
+        self,
+        connection: "AsyncStateConnection",
+        policy: BackpressurePolicy,
+        maxsize: int,
+    ) -> None:
+        if maxsize < 1:
+            raise ValueError(f"maxsize must be positive, got {maxsize}")
+        self._connection: "AsyncStateConnection" = connection
+        self._policy: BackpressurePolicy = policy
+        self._maxsize: int = 1 if policy is BackpressurePolicy.COALESCE else maxsize
+        self._queue: deque = deque()
+        self._waiter: Optional[asyncio.Future] = None
+        self._closed: bool = False
+        self._exception: Optional[Exception] = None
+        self._dropped: int = 0
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    @property
+    def dropped(self) -> int:
+        return self._dropped
+
+    def close(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._connection._remove_stream(self)
+            self._wake()
+
+    def put(self, msg: Any) -> None:
+        if self._closed:
+            return
+        if len(self._queue) >= self._maxsize:
+            if self._policy is BackpressurePolicy.BLOCK:
+                # Data already received is still queued, so the queue may grow
+                # slightly beyond maxsize before reading stops
+                self._connection._pause(self)
+            else:
+                self._queue.popleft()
+                self._dropped += 1
+        self._queue.append(msg)
+        self._wake()
+
+    def _end(self, exception: Optional[Exception]) -> None:
+        """The connection is closed; deliver the queued messages and stop."""
+        self._closed = True
+        self._exception = exception
+        self._wake()
+
+    def _wake(self) -> None:
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    def __aiter__(self) -> "StateStream":
+        return self
+
+    async def __anext__(self) -> Any:
+        while not self._queue:
+            if self._closed:
+                if self._exception is not None:
+                    raise self._exception
+                raise StopAsyncIteration
+            self._waiter = asyncio.get_running_loop().create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+        msg = self._queue.popleft()
+        if len(self._queue) < self._maxsize:
+            self._connection._resume(self)
+        return msg
+
+    async def __aenter__(self) -> "StateStream":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.close()
+
+
+class _StateProtocol(asyncio.BufferedProtocol):
+    def __init__(self, connection: "AsyncStateConnection") -> None:
+        self._connection: "AsyncStateConnection" = connection
+        self._framer: MessageFramer = MessageFramer()
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self._connection._connection_made(transport)
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        return self._framer.writable()
+
+    def buffer_updated(self, nbytes: int) -> None:
+        self._framer.commit(nbytes)
+        for frame in self._framer.frames():
+            self._connection._on_frame(frame)
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        self._connection._connection_lost(exc)
+
+
+class AsyncStateConnection:
+    """asyncio implementation of StateConnection.
+
+    All messages are received and decoded by a protocol on the event loop,
+    without threads. The latest messages are read-only snapshots shared with
+    all consumers, like in StateConnection. Must be used from a single event
+    loop.
+    """
+
+    TCP_PORT_STATE = 50241
+
+    def __init__(
+        self, ip_address: str, recorder: Optional[CaptureWriter] = None
+    ) -> None:
+        self._address: Tuple[str, int] = (ip_address, self.TCP_PORT_STATE)
+        self._recorder: Optional[CaptureWriter] = recorder
+        self._transport: Optional[asyncio.Transport] = None
+        self._closed: Optional[asyncio.Future] = None
+
+        self._joint_feedback: List[JointFeedback] = [None] * MOT_MAX_GR
+        self._joint_feedback_ex: JointFeedbackEx = None
+        self._robot_status: RobotStatus = None
+
+        self._joint_feedback_streams: List[List[StateStream]] = [
+            [] for _ in range(MOT_MAX_GR)
+        ]
+        self._joint_feedback_ex_streams: List[StateStream] = []
+        self._robot_status_streams: List[StateStream] = []
+        # Streams with a full queue and the BLOCK policy
+        self._blocking: Set[StateStream] = set()
+
+        self._waiters: List[Tuple[Callable[[], bool], asyncio.Future]] = []
+        self._statistics: Statistics = Statistics()
+
+    def set_recorder(self, recorder: Optional[CaptureWriter]) -> None:
+        self._recorder = recorder
+
+    async def start(self, timeout: float = 5.0) -> None:
+        loop = asyncio.get_running_loop()
+        self._closed = loop.create_future()
+        await loop.create_connection(lambda: _StateProtocol(self), *self._address)
+        if not await self.wait_for(
+            lambda: self._robot_status is not None
+            and self._joint_feedback_ex is not None
+            and any(feedback is not None for feedback in self._joint_feedback),
+            timeout,
+        ):
+            self.stop()
+            raise TimeoutError(
+                "Did not receive at least one of each message before timeout"
+                " occured. Try increasing the timeout period. "
+                + f"Timeout currently set to {timeout}"
+            )
+
+    def stop(self) -> None:
+        if self._transport is not None:
+            self._transport.close()
+
+    async def wait_closed(self) -> None:
+        if self._closed is not None:
+            await asyncio.shield(self._closed)
+
+    async def __aenter__(self) -> "AsyncStateConnection":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.stop()
+        await self.wait_closed()
+
+    async def joint_feedback(self, groupno: int) -> JointFeedback:
+        """The latest JointFeedback of a group, waiting for the first one."""
+        await self.wait_for(lambda: self._joint_feedback[groupno] is not None)
+        return self._joint_feedback[groupno]
+
+    async def joint_feedback_ex(self) -> JointFeedbackEx:
+        await self.wait_for(lambda: self._joint_feedback_ex is not None)
+        return self._joint_feedback_ex
+
+    async def robot_status(self) -> RobotStatus:
+        await self.wait_for(lambda: self._robot_status is not None)
+        return self._robot_status
+
+    def stats(self) -> Dict[MsgType, MessageStatistics]:
+        return self._statistics.snapshot()
+
+    def reset_stats(self) -> None:
+        self._statistics.reset()
+
+    def feedback(
+        self,
+        groupno: int,
+        policy: BackpressurePolicy = BackpressurePolicy.DROP_OLDEST,
+        maxsize: int = 1024,
+    ) -> StateStream:
+        """Stream of every JointFeedback of a group received from now on."""
+        stream = StateStream(self, policy, maxsize)
+        self._joint_feedback_streams[groupno].append(stream)
+        return stream
+
+    def feedback_ex(
+        self,
+        policy: BackpressurePolicy = BackpressurePolicy.DROP_OLDEST,
+        maxsize: int = 1024,
+    ) -> StateStream:
+        stream = StateStream(self, policy, maxsize)
+        self._joint_feedback_ex_streams.append(stream)
+        return stream
+
+    def robot_status_stream(
+        self,
+        policy: BackpressurePolicy = BackpressurePolicy.DROP_OLDEST,
+        maxsize: int = 1024,
+    ) -> StateStream:
+        stream = StateStream(self, policy, maxsize)
+        self._robot_status_streams.append(stream)
+        return stream
+
+    async def wait_for(
+        self, predicate: Callable[[], bool], timeout: Optional[float] = None
+    ) -> bool:
+        """Wait until `predicate()` is true. Returns False on timeout.
+
+        The predicate is evaluated after every received message, so it must
+        be cheap.
+        """
+        if predicate():
+            return True
+        if self._closed is None or self._closed.done():
+            raise ConnectionError("Not connected to the robot controller")
+        waiter = (predicate, asyncio.get_running_loop().create_future())
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter[1], timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._waiters.remove(waiter)
+
+    async def wait_until_position(
+        self,
+        groupno: int,
+        target: List[float],
+        tol: float = 1e-3,
+        timeout: Optional[float] = None,
+    ) -> bool:
+        def at_target() -> bool:
+            feedback = self._joint_feedback[groupno]
+            return feedback is not None and all(
+                abs(pos - target_pos) <= tol
+                for pos, target_pos in zip(feedback.pos, target)
+            )
+
+        return await self.wait_for(at_target, timeout)
+
+    async def wait_until_stopped(self, timeout: Optional[float] = None) -> bool:
+        return await self.wait_for(
+            lambda: self._robot_status is not None
+            and self._robot_status.in_motion is Ternary.FALSE,
+            timeout,
+        )
+
+    async def wait_until_motion_possible(
+        self, timeout: Optional[float] = None
+    ) -> bool:
+        return await self.wait_for(
+            lambda: self._robot_status is not None
+            and self._robot_status.drives_powered is Ternary.TRUE
+            and self._robot_status.motion_possible is Ternary.TRUE,
+            timeout,
+        )
+
+    def _connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self._transport = transport
+
+    def _connection_lost(self, exc: Optional[Exception]) -> None:
+        error = ConnectionError("Connection to the robot controller closed")
+        error.__cause__ = exc
+        for streams in (
+            *self._joint_feedback_streams,
+            self._joint_feedback_ex_streams,
+            self._robot_status_streams,
+        ):
+            for stream in streams:
+                # Streams end normally when the connection is closed cleanly
+                stream._end(error if exc is not None else None)
+        for _, future in self._waiters:
+            if not future.done():
+                future.set_exception(error)
+        if not self._closed.done():
+            self._closed.set_result(None)
+
+    def _on_frame(self, frame: memoryview) -> None:
+        arrival = time.perf_counter_ns()
+        if self._recorder is not None:
+            self._recorder.record(
+                Direction.RECV, self._address[1], frame, arrival * 1e-9
+            )
+        msg: SimpleMessage = SimpleMessage.from_bytes(frame)
+        decoded = time.perf_counter_ns()
+        self._dispatch(msg)
+        self._statistics.record(
+            msg.header.msg_type,
+            arrival,
+            decoded - arrival,
+            time.perf_counter_ns() - decoded,
+        )
+
+    def _dispatch(self, msg: SimpleMessage) -> None:
+        if msg.header.msg_type == MsgType.JOINT_FEEDBACK:
+            self._joint_feedback[msg.body.groupno] = msg.body
+            for stream in self._joint_feedback_streams[msg.body.groupno]:
+                stream.put(msg.body)
+
+        elif msg.header.msg_type == MsgType.MOTO_JOINT_FEEDBACK_EX:
+            self._joint_feedback_ex = msg.body
+            for stream in self._joint_feedback_ex_streams:
+                stream.put(msg.body)
+
+        elif msg.header.msg_type == MsgType.ROBOT_STATUS:
+            self._robot_status = msg.body
+            for stream in self._robot_status_streams:
+                stream.put(msg.body)
+
+        for predicate, future in self._waiters:
+            if future.done():
+                continue
+            try:
+                if predicate():
+                    future.set_result(None)
+            except Exception as e:
+                future.set_exception(e)
+
+    def _remove_stream(self, stream: StateStream) -> None:
+        for streams in (
+            *self._joint_feedback_streams,
+            self._joint_feedback_ex_streams,
+            self._robot_status_streams,
+        ):
+            if stream in streams:
+                streams.remove(stream)
+        self._resume(stream)
+
+    def _pause(self, stream: StateStream) -> None:
+        if not self._blocking and self._transport is not None:
+            self._transport.pause_reading()
+        self._blocking.add(stream)
+
+    def _resume(self, stream: StateStream) -> None:
+        if stream in self._blocking:
+            self._blocking.discard(stream)
+            if not self._blocking and self._transport is not None:
+                if not self._transport.is_closing():
+                    self._transport.resume_reading()
@@ -0,0 +1,446 @@
+# Copyright 2021 Norwegian University of Science and Technology.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Binary capture files of raw Simple Message traffic.
+
+A capture file starts with a file header (magic and version) followed by
+records. Every record is a fixed size record header followed by the raw,
+framed message exactly as it was sent or received (prefix included):
+
+    timestamp: float64  time.perf_counter() of the send or receive
+    direction: uint8    Direction.RECV or Direction.SEND
+    port:      uint16   port of the connection, e.g. 50241 for state
+    length:    uint32   number of message bytes that follow
+
+The file and record headers are little-endian, the messages themselves are in
+the byte order of the robot controller.
+
+`CaptureReader` memory-maps a capture file for random access. It keeps an
+index of the records in a sidecar file, `<capture file>.idx`, which is built
+on first use and extended when the capture file has grown since. An index that
+was built for another capture file, e.g. one that was replaced since, is
+rebuilt.
+"""
+
+from typing import Iterable, Iterator, NamedTuple, Optional, Tuple, Union
+from array import array
+from bisect import bisect_left
+from enum import IntEnum
+from struct import Struct
+from threading import Lock
+
+import hashlib
+import mmap
+import os
+import time
+
+from moto.simple_message import Header, MsgType, Prefix
+
+
+CAPTURE_MAGIC: bytes = b"MOTOCAP\x00"
+CAPTURE_VERSION: int = 1
+
+FILE_HEADER: Struct = Struct("<8sI")
+RECORD_HEADER: Struct = Struct("<dBxHI")
+
+INDEX_MAGIC: bytes = b"MOTOIDX\x00"
+INDEX_VERSION: int = 2
+
+# The index is a cache on the host that reads the capture, so it is stored in
+# native byte order: magic, version, indexed size of the capture file, number
+# of records and the identity of the capture file (size and modification time
+# when the index was saved, and a hash of its first record header), followed
+# by one array per column.
+INDEX_HEADER: Struct = Struct("=8sIQQQq8s")
+_INDEX_COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ("timestamps", "d"),
+    ("offsets", "Q"),
+    ("lengths", "I"),
+    ("msg_types", "i"),
+    ("ports", "H"),
+    ("directions", "B"),
+)
+
+_MSG_TYPE_STRUCT: Struct = Struct("i")
+_FRAME_HEADER_SIZE: int = Prefix.size + Header.size
+
+
+class Direction(IntEnum):
+    RECV = 0
+    SEND = 1
+
+
+class CaptureError(Exception):
+    pass
+
+
+class CaptureWriter:
+    """Appends records to a capture file.
+
+    Records are collected in memory and written to the file in chunks of
+    `buffer_size` bytes, so `record` is cheap enough to call from the receive
+    threads at full state rate. `record` is thread-safe, so one writer can be
+    shared by all connections. Call `close` (or use the writer as a context
+    manager) to write the remaining records.
+    """
+
+    def __init__(self, path: Union[str, os.PathLike], buffer_size: int = 1 << 20):
+        self._path = path
+        self._buffer_size: int = buffer_size
+        self._buffer: bytearray = bytearray()
+        self._lock: Lock = Lock()
+        self._file = open(path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(FILE_HEADER.pack(CAPTURE_MAGIC, CAPTURE_VERSION))
+        else:
+            check_file_header(path)
+
+    @property
+    def path(self) -> Union[str, os.PathLike]:
+        return self._path
+
+    def record(
+        self,
+        direction: Direction,
+        port: int,
+        frame: Union[bytes, bytearray, memoryview],
+        timestamp: Optional[float] = None,
+    ) -> None:
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        header = RECORD_HEADER.pack(timestamp, direction, port, len(frame))
+        with self._lock:
+            self._buffer += header
+            self._buffer += frame
+            if len(self._buffer) >= self._buffer_size:
+                self._write()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._write()
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file.closed:
+                return
+            self._write()
+            self._file.close()
+
+    def _write(self) -> None:
+        if self._buffer:
+            self._file.write(self._buffer)
+            self._buffer = bytearray()
+
+    def __enter__(self) -> "CaptureWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def check_file_header(path: Union[str, os.PathLike]) -> None:
+    with open(path, "rb") as f:
+        data = f.read(FILE_HEADER.size)
+    if len(data) < FILE_HEADER.size:
+        raise CaptureError(f"{path} is not a capture file")
+    magic, version = FILE_HEADER.unpack(data)
+    if magic != CAPTURE_MAGIC:
+        raise CaptureError(f"{path} is not a capture file")
+    if version != CAPTURE_VERSION:
+        raise CaptureError(f"Unsupported capture file version: {version}")
+
+
+class CaptureRecord(NamedTuple):
+    timestamp: float
+    direction: Direction
+    port: int
+    msg_type: int
+    frame: memoryview
+
+    @property
+    def body(self) -> memoryview:
+        return self.frame[_FRAME_HEADER_SIZE:]
+
+
+class CaptureReader:
+    """Random access to the records of a capture file.
+
+    The file is memory-mapped and `frame` and `body` of the returned records
+    are memoryviews into the mapping, so nothing is copied until the messages
+    are decoded. The views must be released before `close` is called.
+
+    Record `i` is described by the index columns `timestamps[i]`,
+    `offsets[i]` (start of the framed message in the file), `lengths[i]`,
+    `msg_types[i]`, `ports[i]` and `directions[i]`. Time range lookups assume
+    non-decreasing timestamps, which holds for a capture recorded in one
+    session.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, os.PathLike],
+        index_path: Optional[Union[str, os.PathLike]] = None,
+        save_index: bool = True,
+    ):
+        check_file_header(path)
+        self._path = path
+        self._index_path = (
+            index_path if index_path is not None else os.fspath(path) + ".idx"
+        )
+        self._file = open(path, "rb")
+        self._mmap: mmap.mmap = mmap.mmap(
+            self._file.fileno(), 0, access=mmap.ACCESS_READ
+        )
+        self._view: memoryview = memoryview(self._mmap)
+        self._identity: Tuple[int, int, bytes] = self._capture_identity()
+
+        self.timestamps: array = array("d")
+        self.offsets: array = array("Q")
+        self.lengths: array = array("I")
+        self.msg_types: array = array("i")
+        self.ports: array = array("H")
+        self.directions: array = array("B")
+
+        indexed_size = self._load_index()
+        if indexed_size < len(self._mmap):
+            self._scan(max(indexed_size, FILE_HEADER.size))
+            if save_index:
+                try:
+                    self._save_index()
+                except OSError:
+                    # E.g. a capture on read-only media. The index is only a
+                    # cache, so carry on without it.
+                    pass
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __getitem__(self, i: int) -> CaptureRecord:
+        offset = self.offsets[i]
+        return CaptureRecord(
+            self.timestamps[i],
+            Direction(self.directions[i]),
+            self.ports[i],
+            self.msg_types[i],
+            self._view[offset : offset + self.lengths[i]],
+        )
+
+    def index_range(
+        self, start: Optional[float] = None, end: Optional[float] = None
+    ) -> Tuple[int, int]:
+        """Indices [i0, i1) of the records with start <= timestamp < end."""
+        i0 = 0 if start is None else bisect_left(self.timestamps, start)
+        i1 = len(self) if end is None else bisect_left(self.timestamps, end, i0)
+        return i0, i1
+
+    def records(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        msg_types: Optional[Iterable[Union[int, MsgType]]] = None,
+        direction: Optional[Direction] = None,
+        port: Optional[int] = None,
+    ) -> Iterator[CaptureRecord]:
+        """Iterate the records in a time range, optionally filtered."""
+        for i in self._select(start, end, msg_types, direction, port):
+            yield self[i]
+
+    def bodies(
+        self,
+        msg_type: Union[int, MsgType],
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        direction: Optional[Direction] = None,
+        port: Optional[int] = None,
+    ) -> Iterator[Tuple[float, memoryview]]:
+        """Iterate (timestamp, body) of the messages of one type."""
+        view = self._view
+        timestamps, offsets, lengths = self.timestamps, self.offsets, self.lengths
+        for i in self._select(start, end, (msg_type,), direction, port):
+            offset = offsets[i]
+            yield timestamps[i], view[
+                offset + _FRAME_HEADER_SIZE : offset + lengths[i]
+            ]
+
+    def to_numpy(
+        self,
+        msg_type: Union[int, MsgType],
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        number_of_valid_groups: Optional[int] = None,
+        direction: Optional[Direction] = None,
+        port: Optional[int] = None,
+    ):
+        """Decode the messages of one type into a NumPy record array.
+
+        Returns the timestamps and the messages, see `moto.numpy_codec`. For
+        the Ex message types only messages with `number_of_valid_groups`
+        groups are included. Requires NumPy.
+        """
+        import numpy as np
+        from moto import numpy_codec
+
+        size = numpy_codec.message_dtype(msg_type, number_of_valid_groups).itemsize
+        view, offsets, lengths = self._view, self.offsets, self.lengths
+        selected = [
+            i
+            for i in self._select(start, end, (msg_type,), direction, port)
+            if lengths[i] == size
+        ]
+        buffer = b"".join(view[offsets[i] : offsets[i] + size] for i in selected)
+        timestamps = np.array([self.timestamps[i] for i in selected], dtype=np.float64)
+        return timestamps, numpy_codec.decode(buffer, msg_type, number_of_valid_groups)
+
+    def close(self) -> None:
+        self._view.release()
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self) -> "CaptureReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _select(
+        self,
+        start: Optional[float],
+        end: Optional[float],
+        msg_types: Optional[Iterable[Union[int, MsgType]]],
+        direction: Optional[Direction],
+        port: Optional[int],
+    ) -> Iterator[int]:
+        i0, i1 = self.index_range(start, end)
+        indices: Iterable[int] = range(i0, i1)
+        if msg_types is not None:
+            values = {MsgType(msg_type).value for msg_type in msg_types}
+            types = self.msg_types
+            indices = (i for i in indices if types[i] in values)
+        if direction is not None:
+            directions = self.directions
+            indices = (i for i in indices if directions[i] == direction)
+        if port is not None:
+            ports = self.ports
+            indices = (i for i in indices if ports[i] == port)
+        return iter(indices)
+
+    def _scan(self, offset: int) -> None:
+        data = self._mmap
+        size = len(data)
+        unpack_record_header = RECORD_HEADER.unpack_from
+        unpack_msg_type = _MSG_TYPE_STRUCT.unpack_from
+        while offset + RECORD_HEADER.size <= size:
+            timestamp, direction, port, length = unpack_record_header(data, offset)
+            frame = offset + RECORD_HEADER.size
+            if frame + length > size:
+                # Incomplete record, e.g. the writer is still running
+                break
+            if length >= Prefix.size + _MSG_TYPE_STRUCT.size:
+                (msg_type,) = unpack_msg_type(data, frame + Prefix.size)
+            else:
+                msg_type = MsgType.INVALID.value
+            self.timestamps.append(timestamp)
+            self.offsets.append(frame)
+            self.lengths.append(length)
+            self.msg_types.append(msg_type)
+            self.ports.append(port)
+            self.directions.append(direction)
+            offset = frame + length
+
+    def _indexed_size(self) -> int:
+        if not self.offsets:
+            return FILE_HEADER.size
+        return self.offsets[-1] + self.lengths[-1]
+
+    def _load_index(self) -> int:
+        try:
+            with open(self._index_path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return 0
+        if len(data) < INDEX_HEADER.size:
+            return 0
+        (
+            magic,
+            version,
+            indexed_size,
+            count,
+            file_size,
+            mtime_ns,
+            first_record,
+        ) = INDEX_HEADER.unpack_from(data)
+        if (
+            magic != INDEX_MAGIC
+            or version != INDEX_VERSION
+            or indexed_size > len(self._mmap)
+            or first_record != self._identity[2]
+        ):
+            return 0
+        columns = []
+        offset = INDEX_HEADER.size
+        for name, typecode in _INDEX_COLUMNS:
+            column = array(typecode)
+            nbytes = count * column.itemsize
+            if offset + nbytes > len(data):
+                return 0
+            column.frombytes(data[offset : offset + nbytes])
+            columns.append((name, column))
+            offset += nbytes
+        if (file_size, mtime_ns) != self._identity[:2]:
+            # The capture file was modified since. Records appended to it are
+            # indexed by scanning on, as long as the last indexed record is
+            # still in its place.
+            loaded = dict(columns)
+            if count > 0 and not self._is_record(
+                loaded["offsets"][-1] - RECORD_HEADER.size,
+                loaded["timestamps"][-1],
+                loaded["lengths"][-1],
+            ):
+                return 0
+        for name, column in columns:
+            setattr(self, name, column)
+        return self._indexed_size()
+
+    def _is_record(self, offset: int, timestamp: float, length: int) -> bool:
+        if offset < FILE_HEADER.size or offset + RECORD_HEADER.size > len(self._mmap):
+            return False
+        header = RECORD_HEADER.unpack_from(self._mmap, offset)
+        return header[0] == timestamp and header[3] == length
+
+    def _capture_identity(self) -> Tuple[int, int, bytes]:
+        first_record = self._mmap[
+            FILE_HEADER.size : FILE_HEADER.size + RECORD_HEADER.size
+        ]
+        return (
+            len(self._mmap),
+            os.fstat(self._file.fileno()).st_mtime_ns,
+            hashlib.blake2b(first_record, digest_size=8).digest(),
+        )
+
+    def _save_index(self) -> None:
+        tmp_path = os.fspath(self._index_path) + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(
+                INDEX_HEADER.pack(
+                    INDEX_MAGIC,
+                    INDEX_VERSION,
+                    self._indexed_size(),
+                    len(self),
+                    *self._identity,
+                )
+            )
+            for name, _ in _INDEX_COLUMNS:
+                getattr(self, name).tofile(f)
+        os.replace(tmp_path, self._index_path)
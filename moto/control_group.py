@@ -16,6 +16,7 @@ from typing import List
 from dataclasses import dataclass
 
 from moto.motion_connection import MotionConnection
+from moto.simple_message import JointFeedback, ValidFields
 from moto.state_connection import StateConnection
 
 
@@ -61,20 +62,34 @@ class ControlGroup:
     def joint_names(self) -> List[str]:
         return self._control_group_def.joint_names
 
+    # Each property reads the latest feedback. Read `joint_feedback` once to
+    # get the position, velocity and acceleration of the same sample. When the
+    # feedback has no valid velocity or acceleration and estimation is enabled
+    # on the state connection, the estimate is returned instead.
     @property
     def position(self):
         return self.joint_feedback.pos[: self.num_joints]
 
     @property
     def velocity(self):
-        return self.joint_feedback.vel[: self.num_joints]
+        feedback = self.joint_feedback
+        if not feedback.valid_fields & ValidFields.VELOCITY:
+            estimate = self._state_connection.estimate(self.groupno)
+            if estimate is not None:
+                return estimate.vel[: self.num_joints]
+        return feedback.vel[: self.num_joints]
 
     @property
     def acceleration(self):
-        return self.joint_feedback.acc[: self.num_joints]
+        feedback = self.joint_feedback
+        if not feedback.valid_fields & ValidFields.ACCELERATION:
+            estimate = self._state_connection.estimate(self.groupno)
+            if estimate is not None:
+                return estimate.acc[: self.num_joints]
+        return feedback.acc[: self.num_joints]
 
     @property
-    def joint_feedback(self):
+    def joint_feedback(self) -> JointFeedback:
         return self._state_connection.joint_feedback(self.groupno)
 
     def check_queue_count(self) -> int:
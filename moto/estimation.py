@@ -0,0 +1,153 @@
+# Copyright 2021 Norwegian University of Science and Technology.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Velocity and acceleration estimated from the joint positions.
+
+Requires NumPy, which is an optional dependency of moto.
+"""
+
+from typing import NamedTuple, Optional, Sequence
+
+import time
+
+import numpy as np
+
+from moto.simple_message import JointFeedback, ValidFields, MOT_MAX_GR, ROS_MAX_JOINT
+
+
+class JointStateEstimate(NamedTuple):
+    # Controller time of the feedback, or the host time.monotonic() when the
+    # feedback has no valid time or its time does not advance
+    time: float
+    pos: np.ndarray
+    vel: np.ndarray
+    acc: np.ndarray
+
+
+class AlphaBetaGammaEstimator:
+    """Alpha-beta-gamma filter of the positions of all joints of all groups.
+
+    The filter assumes constant acceleration between samples and corrects the
+    predicted position, velocity and acceleration with the position residual.
+    It is updated incrementally with one sample of a group at a time, for all
+    joints of the group at once. With `gamma` 0 it is an alpha-beta filter,
+    which estimates no acceleration.
+
+    The default gains are the critically damped gains for theta 0.5, see
+    `critically_damped`. Lower theta tracks faster, higher theta smooths more.
+    """
+
+    def __init__(
+        self, alpha: float = 0.875, beta: float = 0.5625, gamma: float = 0.0625
+    ) -> None:
+        if not 0.0 < alpha <= 1.0:
+            raise ValueError(f"alpha must be in (0, 1], got {alpha}")
+        if beta <= 0.0 or gamma < 0.0:
+            raise ValueError(f"Invalid beta {beta} or gamma {gamma}")
+        self._alpha: float = alpha
+        self._beta: float = beta
+        self._gamma: float = gamma
+
+        shape = (MOT_MAX_GR, ROS_MAX_JOINT)
+        self._pos: np.ndarray = np.zeros(shape)
+        self._vel: np.ndarray = np.zeros(shape)
+        self._acc: np.ndarray = np.zeros(shape)
+        self._time: np.ndarray = np.zeros(MOT_MAX_GR)
+        self._initialized: np.ndarray = np.zeros(MOT_MAX_GR, dtype=bool)
+        # Clock of the filter time of every group in update_feedback, and the
+        # controller and host time of the last feedback of the group
+        self._host_clock: np.ndarray = np.zeros(MOT_MAX_GR, dtype=bool)
+        self._controller_time: np.ndarray = np.zeros(MOT_MAX_GR)
+        self._host_time: np.ndarray = np.zeros(MOT_MAX_GR)
+        # Published by reference, like the messages of the StateConnection
+        self._estimates = [None] * MOT_MAX_GR
+
+    @classmethod
+    def critically_damped(cls, theta: float) -> "AlphaBetaGammaEstimator":
+        """Gains of a critically damped filter, with theta in (0, 1)."""
+        if not 0.0 < theta < 1.0:
+            raise ValueError(f"theta must be in (0, 1), got {theta}")
+        return cls(
+            alpha=1.0 - theta ** 3,
+            beta=1.5 * (1.0 - theta) ** 2 * (1.0 + theta),
+            gamma=0.5 * (1.0 - theta) ** 3,
+        )
+
+    def estimate(self, groupno: int) -> Optional[JointStateEstimate]:
+        """The latest estimate of a group, None before the first sample."""
+        return self._estimates[groupno]
+
+    def reset(self, groupno: Optional[int] = None) -> None:
+        groups = range(MOT_MAX_GR) if groupno is None else [groupno]
+        for g in groups:
+            self._initialized[g] = False
+            self._estimates[g] = None
+
+    def update_feedback(self, feedback: JointFeedback) -> JointStateEstimate:
+        """Update with the controller time of the feedback, if it advances.
+
+        Without a valid time, or when the time does not advance (e.g. the
+        simulator always sends 0.0), the host time of the update is used
+        instead. A controller time that goes back re-initializes the group.
+        """
+        groupno = feedback.groupno
+        now = time.monotonic()
+        use_host_clock = True
+        if feedback.valid_fields & ValidFields.TIME:
+            t = feedback.time
+            previous = self._controller_time[groupno]
+            self._controller_time[groupno] = t
+            if self._initialized[groupno] and t < previous:
+                # The controller time was reset
+                self.reset(groupno)
+            use_host_clock = self._initialized[groupno] and t == previous
+        switched = use_host_clock != self._host_clock[groupno]
+        if self._initialized[groupno] and switched:
+            # Continue from the time of the last sample on the other clock
+            self._time[groupno] = (
+                self._host_time[groupno] if use_host_clock else previous
+            )
+        self._host_clock[groupno] = use_host_clock
+        self._host_time[groupno] = now
+        return self.update(groupno, now if use_host_clock else t, feedback.pos)
+
+    def update(self, groupno: int, t: float, pos: Sequence[float]) -> JointStateEstimate:
+        x = self._pos[groupno]
+        v = self._vel[groupno]
+        a = self._acc[groupno]
+        z = np.asarray(pos, dtype=np.float64)
+        n = len(z)
+
+        if not self._initialized[groupno]:
+            x[:n] = z
+            v[:] = 0.0
+            a[:] = 0.0
+            self._time[groupno] = t
+            self._initialized[groupno] = True
+        else:
+            dt = t - self._time[groupno]
+            if dt <= 0.0:
+                # Repeated or reordered sample
+                return self._estimates[groupno]
+            self._time[groupno] = t
+            x += dt * v + (0.5 * dt * dt) * a
+            v += dt * a
+            residual = z - x[:n]
+            x[:n] += self._alpha * residual
+            v[:n] += (self._beta / dt) * residual
+            a[:n] += (2.0 * self._gamma / (dt * dt)) * residual
+
+        estimate = JointStateEstimate(float(t), x.copy(), v.copy(), a.copy())
+        self._estimates[groupno] = estimate
+        return estimate
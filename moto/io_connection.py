@@ -20,10 +20,10 @@ from moto.simple_message import (
     MSG_TYPE_CLS,
     SimpleMessage,
 )
-from moto.simple_message_connection import SimpleMessageConnection
+from moto.service_connection import ServiceConnection
 
 
-class IoConnection(SimpleMessageConnection):
+class IoConnection(ServiceConnection):
 
     TCP_PORT_IO = 50242
 
@@ -38,9 +38,6 @@ class IoConnection(SimpleMessageConnection):
         response: SimpleMessage = self.send_and_recv(request)
         return response
 
-    def start(self):
-        self._tcp_client.connect()
-
     def read_io_bit(self, address: int):
         return self._send_and_recv_request(MsgType.MOTO_READ_IO_BIT, address)
 
@@ -0,0 +1,225 @@
+# Copyright 2021 Norwegian University of Science and Technology.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Fixed-capacity history of the joint feedback of one control group.
+
+Requires NumPy, which is an optional dependency of moto.
+"""
+
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+import time
+
+import numpy as np
+
+from moto.simple_message import JointFeedback, ROS_MAX_JOINT
+
+
+class JointFeedbackSamples(NamedTuple):
+    """Samples in chronological order, one row per sample.
+
+    `stamp` is the host time.monotonic() when the sample was received and
+    `time` the controller time of the sample.
+    """
+
+    stamp: np.ndarray
+    time: np.ndarray
+    pos: np.ndarray
+    vel: np.ndarray
+    acc: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.stamp)
+
+
+class JointFeedbackHistory:
+    """Ring buffer of the latest `capacity` joint feedback samples.
+
+    The samples are written in place into preallocated arrays by a single
+    writer, the StateConnection receive thread. Queries copy the requested
+    samples out and check that the writer did not overwrite them meanwhile, so
+    readers never take a lock.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        if capacity < 1:
+            raise ValueError(f"Capacity must be positive, got {capacity}")
+        self._capacity: int = capacity
+        self._stamp: np.ndarray = np.zeros(capacity, dtype=np.float64)
+        self._time: np.ndarray = np.zeros(capacity, dtype=np.float64)
+        self._pos: np.ndarray = np.zeros((capacity, ROS_MAX_JOINT), dtype=np.float32)
+        self._vel: np.ndarray = np.zeros((capacity, ROS_MAX_JOINT), dtype=np.float32)
+        self._acc: np.ndarray = np.zeros((capacity, ROS_MAX_JOINT), dtype=np.float32)
+        # Number of samples whose write has started and number of samples
+        # completely written. Sample k is stored at k % capacity.
+        self._started: int = 0
+        self._count: int = 0
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def count(self) -> int:
+        """Total number of samples appended, including overwritten samples."""
+        return self._count
+
+    def __len__(self) -> int:
+        return min(self._count, self._capacity)
+
+    def append(self, feedback: JointFeedback, stamp: Optional[float] = None) -> None:
+        if stamp is None:
+            stamp = time.monotonic()
+        i = self._count % self._capacity
+        self._started = self._count + 1
+        self._stamp[i] = stamp
+        self._time[i] = feedback.time
+        self._pos[i] = feedback.pos
+        self._vel[i] = feedback.vel
+        self._acc[i] = feedback.acc
+        # Publish the sample once it is completely written
+        self._count += 1
+
+    def clear(self) -> None:
+        self._started = 0
+        self._count = 0
+
+    def last(self, n: Optional[int] = None) -> JointFeedbackSamples:
+        """Copy of the last `n` samples, or of all samples if `n` is None."""
+        count = self._count
+        size = min(count, self._capacity)
+        n = size if n is None else min(n, size)
+        return self._copy(count - n, count)
+
+    def last_view(self, n: int) -> Optional[JointFeedbackSamples]:
+        """Views of the last `n` samples if they are contiguous in the buffer.
+
+        The views are not copied, so they are overwritten by the receive
+        thread after `capacity - n` new samples. Returns None if the samples
+        wrap around the end of the buffer; use `last` then.
+        """
+        count = self._count
+        n = min(n, count, self._capacity)
+        stop = (count - 1) % self._capacity + 1 if count > 0 else 0
+        start = stop - n
+        if start < 0:
+            return None
+        return JointFeedbackSamples(
+            self._stamp[start:stop],
+            self._time[start:stop],
+            self._pos[start:stop],
+            self._vel[start:stop],
+            self._acc[start:stop],
+        )
+
+    def between(
+        self, t0: float, t1: float, clock: str = "stamp"
+    ) -> JointFeedbackSamples:
+        """Copy of the samples with t0 <= t < t1.
+
+        `clock` selects the host receive time ("stamp") or the controller
+        time ("time").
+        """
+        count = self._count
+        first, (times,) = self._copy_columns(
+            (self._column(clock),), count - min(count, self._capacity), count
+        )
+        start, stop = np.searchsorted(times, [t0, t1])
+        return self._copy(first + int(start), first + int(stop))
+
+    def interpolate(
+        self, times: np.ndarray, clock: str = "stamp"
+    ) -> JointFeedbackSamples:
+        """Samples linearly interpolated at `times`.
+
+        Times outside the range of the history give NaN.
+        """
+        self._column(clock)
+        samples = self.last()
+        times = np.asarray(times, dtype=np.float64)
+        source = samples.stamp if clock == "stamp" else samples.time
+        n = len(source)
+        if n == 0:
+            return JointFeedbackSamples(
+                *(
+                    np.full(times.shape + column.shape[1:], np.nan)
+                    for column in samples
+                )
+            )
+
+        # Samples before and after each time, and the weight of the latter
+        if n == 1:
+            lower = upper = np.zeros(times.shape, dtype=np.intp)
+        else:
+            upper = np.clip(np.searchsorted(source, times, side="right"), 1, n - 1)
+            lower = upper - 1
+        span = source[upper] - source[lower]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            weight = np.where(span > 0, (times - source[lower]) / span, 0.0)
+        outside = (times < source[0]) | (times > source[-1])
+
+        def lerp(values: np.ndarray) -> np.ndarray:
+            values = values.astype(np.float64, copy=False)
+            w = weight[..., np.newaxis] if values.ndim > 1 else weight
+            result = values[lower] * (1.0 - w) + values[upper] * w
+            result[outside] = np.nan
+            return result
+
+        return JointFeedbackSamples(*(lerp(column) for column in samples))
+
+    def _column(self, clock: str) -> np.ndarray:
+        if clock == "stamp":
+            return self._stamp
+        if clock == "time":
+            return self._time
+        raise ValueError(f"Unknown clock: {clock}")
+
+    def _slices(self, start: int, stop: int) -> Tuple[slice, ...]:
+        # Sample numbers [start, stop) as at most two slices of the buffer
+        capacity = self._capacity
+        if stop <= start:
+            return (slice(0, 0),)
+        i0 = start % capacity
+        i1 = (stop - 1) % capacity + 1
+        if i0 < i1:
+            return (slice(i0, i1),)
+        return (slice(i0, capacity), slice(0, i1))
+
+    def _copy_columns(
+        self, columns: Sequence[np.ndarray], start: int, stop: int
+    ) -> Tuple[int, List[np.ndarray]]:
+        """Copy samples [start, stop) of the columns.
+
+        Returns the first sample actually copied, which is later than `start`
+        if the writer overwrote the oldest samples while copying.
+        """
+        while True:
+            slices = self._slices(start, stop)
+            copies = [
+                np.concatenate([column[s] for s in slices])
+                if len(slices) > 1
+                else column[slices[0]].copy()
+                for column in columns
+            ]
+            overwritten = self._started - self._capacity - start
+            if overwritten <= 0:
+                return start, copies
+            start += overwritten
+            stop = max(start, stop)
+
+    def _copy(self, start: int, stop: int) -> JointFeedbackSamples:
+        _, columns = self._copy_columns(
+            (self._stamp, self._time, self._pos, self._vel, self._acc), start, stop
+        )
+        return JointFeedbackSamples(*columns)
@@ -13,9 +13,22 @@
 # limitations under the License.
 
 
-from typing import Union
+from typing import (
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from struct import Struct
 
-from moto.simple_message_connection import SimpleMessageConnection
+from moto.packed_trajectory import PackedTrajectory
+from moto.service_connection import ServiceConnection
 from moto.simple_message import (
     Header,
     MotoGetDhParameters,
@@ -29,11 +42,47 @@ from moto.simple_message import (
     SimpleMessage,
     JointTrajPtFull,
     JointTrajPtFullEx,
+    MotoMotionReply,
+    Prefix,
     SimpleMessageError,
 )
 
+JointTrajPt = Union[JointTrajPtFull, JointTrajPtFullEx]
+
+# Message type of the header and the groupno (or number of groups) of the
+# body of a trajectory point message
+_POINT_TYPE_AND_GROUP: Struct = Struct("i8xi")
+
+
+class TrajectoryPointResult(NamedTuple):
+    # Index of the point in the streamed trajectory
+    index: int
+    # The points of a PackedTrajectory are not decoded, unless they fail
+    point: Optional[JointTrajPt]
+    reply: MotoMotionReply
+
+    @property
+    def success(self) -> bool:
+        return self.reply.result is ResultType.SUCCESS
+
+
+def _reply_key(point: JointTrajPt) -> Hashable:
+    # Points of different groups may share a sequence number
+    if isinstance(point, JointTrajPtFull):
+        return (point.groupno, point.sequence)
+    return (-1, point.sequence)
+
+
+def _packed_reply_key(packed: PackedTrajectory, index: int) -> Hashable:
+    msg_type, groupno = _POINT_TYPE_AND_GROUP.unpack_from(
+        packed.buffer, packed.offsets[index] + Prefix.size
+    )
+    if msg_type == MsgType.JOINT_TRAJ_PT_FULL:
+        return (groupno, packed.sequence(index))
+    return (-1, packed.sequence(index))
 
-class MotionConnection(SimpleMessageConnection):
+
+class MotionConnection(ServiceConnection):
 
     TCP_PORT_MOTION = 50240
 
@@ -125,3 +174,114 @@ class MotionConnection(SimpleMessageConnection):
             joint_trajectory_point,
         )
         return self.send_and_recv(msg)
+
+    def stream_joint_trajectory(
+        self,
+        points: Union[Iterable[JointTrajPt], PackedTrajectory],
+        window: int = 8,
+        callback: Optional[Callable[[TrajectoryPointResult], None]] = None,
+        stop_on_error: bool = True,
+    ) -> List[TrajectoryPointResult]:
+        """Send trajectory points with up to `window` points awaiting a reply.
+
+        Instead of one round trip per point, the next points are sent while
+        the replies of the previous ones are outstanding. Every reply is
+        matched to its point by sequence number and passed to `callback` as
+        soon as it is received. The sequence numbers of the points of a group
+        in flight must be unique.
+
+        With `stop_on_error`, no more points are sent after the first reply
+        that is not SUCCESS (e.g. BUSY when the motion queue is full), but the
+        replies of the points in flight are still received. Returns the
+        results in the order of the points.
+
+        The messages of a PackedTrajectory are sent as they are packed, and
+        their replies are matched without decoding the points: `point` of a
+        result is only set for a point that failed.
+        """
+        if window < 1:
+            raise ValueError(f"window must be positive, got {window}")
+        if isinstance(points, PackedTrajectory):
+            packed = points
+            items = ((index, None) for index in range(len(packed)))
+
+            def reply_key(index: int, point: Optional[JointTrajPt]) -> Hashable:
+                return _packed_reply_key(packed, index)
+
+            def request(index: int, point: Optional[JointTrajPt]) -> Future:
+                return self.request_frame(
+                    packed.message(index), packed.sequence(index)
+                )
+
+        else:
+            items = enumerate(points)
+
+            def reply_key(index: int, point: Optional[JointTrajPt]) -> Hashable:
+                return _reply_key(point)
+
+            def request(index: int, point: Optional[JointTrajPt]) -> Future:
+                return self.request(self._joint_trajectory_point_msg(point))
+
+        results: List[TrajectoryPointResult] = []
+        # Points and their reply keys awaiting a reply, by the future of the reply
+        in_flight: Dict[Future, Tuple[int, Optional[JointTrajPt], Hashable]] = {}
+        keys = set()
+        points_iter = iter(items)
+        failed = False
+        exhausted = False
+        while True:
+            while not exhausted and not failed and len(in_flight) < window:
+                item = next(points_iter, None)
+                if item is None:
+                    exhausted = True
+                    break
+                index, point = item
+                key = reply_key(index, point)
+                if key in keys:
+                    raise ValueError(
+                        f"Sequence {key[1]} of point {index} is already"
+                        " awaiting a reply"
+                    )
+                keys.add(key)
+                future = request(index, point)
+                in_flight[future] = (index, point, key)
+            if not in_flight:
+                break
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in sorted(done, key=lambda future: in_flight[future][0]):
+                index, point, key = in_flight.pop(future)
+                keys.discard(key)
+                reply: SimpleMessage = future.result()
+                if reply.header.msg_type != MsgType.MOTO_MOTION_REPLY:
+                    raise SimpleMessageError(
+                        f"Unexpected {reply.header.msg_type} while streaming"
+                        " a trajectory"
+                    )
+                if point is None and reply.body.result is not ResultType.SUCCESS:
+                    point = packed.point(index)
+                result = TrajectoryPointResult(index, point, reply.body)
+                results.append(result)
+                if callback is not None:
+                    callback(result)
+                if stop_on_error and not result.success:
+                    failed = True
+
+        results.sort(key=lambda result: result.index)
+        return results
+
+    def _joint_trajectory_point_msg(self, point: JointTrajPt) -> SimpleMessage:
+        if isinstance(point, JointTrajPtFull):
+            msg_type = MsgType.JOINT_TRAJ_PT_FULL
+        elif isinstance(point, JointTrajPtFullEx):
+            msg_type = MsgType.MOTO_JOINT_TRAJ_PT_FULL_EX
+        else:
+            raise SimpleMessageError("Not a valid joint_trajectory_point.")
+        return SimpleMessage(
+            Header(
+                msg_type=msg_type,
+                comm_type=CommType.SERVICE_REQUEST,
+                reply_type=ReplyType.INVALID,
+            ),
+            point,
+        )
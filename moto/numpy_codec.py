@@ -0,0 +1,294 @@
+# Copyright 2021 Norwegian University of Science and Technology.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""NumPy structured dtypes for the Simple Message types with fixed layouts.
+
+The dtypes mirror the `struct_` formats in `moto.simple_message` field by
+field, so a buffer of N concatenated messages of the same type (and, for the
+Ex messages, the same number of groups) can be decoded into a record array
+with a single `np.frombuffer` call, and whole arrays encoded back to wire
+bytes with `tobytes`.
+
+Requires NumPy, which is an optional dependency of moto.
+"""
+
+from typing import Callable, Mapping, Optional, Union
+
+import numpy as np
+
+from moto.simple_message import (
+    CommType,
+    Header,
+    JointFeedback,
+    JointTrajPtExData,
+    JointTrajPtFull,
+    MotoRealTimeMotionJointCommandExData,
+    MotoRealTimeMotionJointStateExData,
+    MsgType,
+    Prefix,
+    ReplyType,
+    RobotStatus,
+    SimpleMessageError,
+    MOT_MAX_GR,
+    ROS_MAX_JOINT,
+)
+
+# Struct uses native byte order and alignment, and so do these dtypes
+_INT = np.dtype("i4")
+_FLOAT = np.dtype("f4")
+
+PREFIX_HEADER_FIELDS = [
+    ("length", _INT),
+    ("msg_type", _INT),
+    ("comm_type", _INT),
+    ("reply_type", _INT),
+]
+
+ROBOT_STATUS_DTYPE = np.dtype(
+    [
+        ("drives_powered", _INT),
+        ("e_stopped", _INT),
+        ("error_code", _INT),
+        ("in_error", _INT),
+        ("in_motion", _INT),
+        ("mode", _INT),
+        ("motion_possible", _INT),
+    ]
+)
+
+# iiif10f10f10f
+JOINT_TRAJ_PT_FULL_DTYPE = np.dtype(
+    [
+        ("groupno", _INT),
+        ("sequence", _INT),
+        ("valid_fields", _INT),
+        ("time", _FLOAT),
+        ("pos", _FLOAT, (ROS_MAX_JOINT,)),
+        ("vel", _FLOAT, (ROS_MAX_JOINT,)),
+        ("acc", _FLOAT, (ROS_MAX_JOINT,)),
+    ]
+)
+
+# iif10f10f10f, shared by JointFeedback and JointTrajPtExData
+JOINT_FEEDBACK_DTYPE = np.dtype(
+    [
+        ("groupno", _INT),
+        ("valid_fields", _INT),
+        ("time", _FLOAT),
+        ("pos", _FLOAT, (ROS_MAX_JOINT,)),
+        ("vel", _FLOAT, (ROS_MAX_JOINT,)),
+        ("acc", _FLOAT, (ROS_MAX_JOINT,)),
+    ]
+)
+JOINT_TRAJ_PT_EX_DATA_DTYPE = JOINT_FEEDBACK_DTYPE
+
+# i10f10f
+REALTIME_MOTION_JOINT_STATE_EX_DATA_DTYPE = np.dtype(
+    [
+        ("groupno", _INT),
+        ("pos", _FLOAT, (ROS_MAX_JOINT,)),
+        ("vel", _FLOAT, (ROS_MAX_JOINT,)),
+    ]
+)
+
+# i10f
+REALTIME_MOTION_JOINT_COMMAND_EX_DATA_DTYPE = np.dtype(
+    [("groupno", _INT), ("command", _FLOAT, (ROS_MAX_JOINT,))]
+)
+
+assert ROBOT_STATUS_DTYPE.itemsize == RobotStatus.size
+assert JOINT_TRAJ_PT_FULL_DTYPE.itemsize == JointTrajPtFull.size
+assert JOINT_FEEDBACK_DTYPE.itemsize == JointFeedback.size
+assert JOINT_TRAJ_PT_EX_DATA_DTYPE.itemsize == JointTrajPtExData.size
+assert (
+    REALTIME_MOTION_JOINT_STATE_EX_DATA_DTYPE.itemsize
+    == MotoRealTimeMotionJointStateExData.size
+)
+assert (
+    REALTIME_MOTION_JOINT_COMMAND_EX_DATA_DTYPE.itemsize
+    == MotoRealTimeMotionJointCommandExData.size
+)
+
+
+def joint_feedback_ex_dtype(number_of_valid_groups: int) -> np.dtype:
+    return np.dtype(
+        [
+            ("number_of_valid_groups", _INT),
+            ("joint_feedback_data", JOINT_FEEDBACK_DTYPE, (number_of_valid_groups,)),
+        ]
+    )
+
+
+def joint_traj_pt_full_ex_dtype(number_of_valid_groups: int) -> np.dtype:
+    return np.dtype(
+        [
+            ("number_of_valid_groups", _INT),
+            ("sequence", _INT),
+            (
+                "joint_traj_pt_data",
+                JOINT_TRAJ_PT_EX_DATA_DTYPE,
+                (number_of_valid_groups,),
+            ),
+        ]
+    )
+
+
+def realtime_motion_joint_state_ex_dtype(number_of_valid_groups: int) -> np.dtype:
+    return np.dtype(
+        [
+            ("message_id", _INT),
+            ("mode", _INT),
+            ("number_of_valid_groups", _INT),
+            (
+                "joint_state_data",
+                REALTIME_MOTION_JOINT_STATE_EX_DATA_DTYPE,
+                (number_of_valid_groups,),
+            ),
+        ]
+    )
+
+
+def realtime_motion_joint_command_ex_dtype(number_of_valid_groups: int) -> np.dtype:
+    return np.dtype(
+        [
+            ("message_id", _INT),
+            ("number_of_valid_groups", _INT),
+            (
+                "joint_command_data",
+                REALTIME_MOTION_JOINT_COMMAND_EX_DATA_DTYPE,
+                (number_of_valid_groups,),
+            ),
+        ]
+    )
+
+
+# Body dtypes of the fixed-size message types
+BODY_DTYPES: Mapping[MsgType, np.dtype] = {
+    MsgType.ROBOT_STATUS: ROBOT_STATUS_DTYPE,
+    MsgType.JOINT_TRAJ_PT_FULL: JOINT_TRAJ_PT_FULL_DTYPE,
+    MsgType.JOINT_FEEDBACK: JOINT_FEEDBACK_DTYPE,
+}
+
+# Body dtypes of the Ex message types, as a function of the number of groups
+EX_BODY_DTYPES: Mapping[MsgType, Callable[[int], np.dtype]] = {
+    MsgType.MOTO_JOINT_FEEDBACK_EX: joint_feedback_ex_dtype,
+    MsgType.MOTO_JOINT_TRAJ_PT_FULL_EX: joint_traj_pt_full_ex_dtype,
+    MsgType.MOTO_REALTIME_MOTION_JOINT_STATE_EX: realtime_motion_joint_state_ex_dtype,
+    MsgType.MOTO_REALTIME_MOTION_JOINT_COMMAND_EX: realtime_motion_joint_command_ex_dtype,
+}
+
+
+def body_dtype(
+    msg_type: Union[int, MsgType], number_of_valid_groups: Optional[int] = None
+) -> np.dtype:
+    msg_type = MsgType(msg_type)
+    if msg_type in BODY_DTYPES:
+        return BODY_DTYPES[msg_type]
+    if msg_type in EX_BODY_DTYPES:
+        if number_of_valid_groups is None or not (
+            0 < number_of_valid_groups <= MOT_MAX_GR
+        ):
+            raise SimpleMessageError(
+                f"{msg_type.name} requires a number of valid groups between 1 and "
+                f"{MOT_MAX_GR}, got {number_of_valid_groups}"
+            )
+        return EX_BODY_DTYPES[msg_type](number_of_valid_groups)
+    raise SimpleMessageError(f"No dtype defined for {msg_type.name}")
+
+
+def message_dtype(
+    msg_type: Union[int, MsgType], number_of_valid_groups: Optional[int] = None
+) -> np.dtype:
+    """Dtype of a complete message: prefix, header and body fields."""
+    body = body_dtype(msg_type, number_of_valid_groups)
+    return np.dtype(
+        PREFIX_HEADER_FIELDS + [(name, body.fields[name][0]) for name in body.names]
+    )
+
+
+def decode(
+    buffer: Union[bytes, bytearray, memoryview],
+    msg_type: Union[int, MsgType],
+    number_of_valid_groups: Optional[int] = None,
+) -> np.ndarray:
+    """Decode a buffer of concatenated messages of one type into a record array.
+
+    The returned array is a view of `buffer` when possible, so it is read-only
+    for `bytes` input.
+    """
+    msg_type = MsgType(msg_type)
+    dtype = message_dtype(msg_type, number_of_valid_groups)
+    if len(buffer) % dtype.itemsize != 0:
+        raise SimpleMessageError(
+            f"Buffer of {len(buffer)} bytes is not a whole number of "
+            f"{dtype.itemsize} byte {msg_type.name} messages"
+        )
+    array = np.frombuffer(buffer, dtype=dtype)
+    if array.size > 0 and (
+        np.any(array["msg_type"] != msg_type.value)
+        or np.any(array["length"] != dtype.itemsize - Prefix.size)
+    ):
+        raise SimpleMessageError(f"Buffer does not only contain {msg_type.name}")
+    return array
+
+
+def empty(
+    msg_type: Union[int, MsgType],
+    count: int,
+    number_of_valid_groups: Optional[int] = None,
+    comm_type: CommType = CommType.TOPIC,
+    reply_type: ReplyType = ReplyType.INVALID,
+) -> np.ndarray:
+    """Zeroed array of `count` messages with the prefix and header filled in."""
+    msg_type = MsgType(msg_type)
+    dtype = message_dtype(msg_type, number_of_valid_groups)
+    array = np.zeros(count, dtype=dtype)
+    array["length"] = dtype.itemsize - Prefix.size
+    array["msg_type"] = msg_type.value
+    array["comm_type"] = CommType(comm_type).value
+    array["reply_type"] = ReplyType(reply_type).value
+    if msg_type in EX_BODY_DTYPES:
+        array["number_of_valid_groups"] = number_of_valid_groups
+    return array
+
+
+def encode(
+    array: np.ndarray,
+    msg_type: Union[int, MsgType],
+    number_of_valid_groups: Optional[int] = None,
+    comm_type: CommType = CommType.TOPIC,
+    reply_type: ReplyType = ReplyType.INVALID,
+) -> bytes:
+    """Encode an array of messages or message bodies to wire bytes.
+
+    Arrays with the message dtype are written as is. Arrays with the body dtype
+    get the prefix and header added.
+    """
+    msg_type = MsgType(msg_type)
+    dtype = message_dtype(msg_type, number_of_valid_groups)
+    if array.dtype == dtype:
+        return np.ascontiguousarray(array).tobytes()
+    if array.dtype != body_dtype(msg_type, number_of_valid_groups):
+        raise SimpleMessageError(
+            f"Array of dtype {array.dtype} can not be encoded as {msg_type.name}"
+        )
+    messages = empty(
+        msg_type, len(array), number_of_valid_groups, comm_type, reply_type
+    )
+    for name in array.dtype.names:
+        messages[name] = array[name]
+    return messages.tobytes()
+
+
+assert np.dtype(PREFIX_HEADER_FIELDS).itemsize == Prefix.size + Header.size
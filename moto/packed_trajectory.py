@@ -0,0 +1,273 @@
+# Copyright 2021 Norwegian University of Science and Technology.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Iterator, List, Optional, Sequence, Tuple, Union
+from dataclasses import dataclass
+from itertools import repeat
+from struct import Struct
+
+from moto.simple_message import (
+    CommType,
+    Header,
+    JointTrajPtExData,
+    JointTrajPtFull,
+    JointTrajPtFullEx,
+    MsgType,
+    Prefix,
+    ReplyType,
+    SimpleMessage,
+    SimpleMessageError,
+    ValidFields,
+    MOT_MAX_GR,
+    ROS_MAX_JOINT,
+)
+
+
+Vector = Sequence[float]
+
+# Prefix, header and the groupno and sequence of a JOINT_TRAJ_PT_FULL message
+_JOINT_TRAJ_PT_FULL_HEAD_STRUCT: Struct = Struct("4i2i")
+# Prefix, header and the number of groups and sequence of a
+# MOTO_JOINT_TRAJ_PT_FULL_EX message. The group data follows.
+_JOINT_TRAJ_PT_FULL_EX_STRUCT: Struct = Struct("4i2i")
+# Offset of the sequence number, the second field of both message bodies
+_SEQUENCE_OFFSET: int = Prefix.size + Header.size + 4
+_SEQUENCE_STRUCT: Struct = Struct("i")
+# Size of ROS_MAX_JOINT floats
+_JOINTS_SIZE: int = 4 * ROS_MAX_JOINT
+
+
+@dataclass
+class PackedTrajectory:
+    """A trajectory encoded as consecutive, framed Simple Messages.
+
+    `buffer` holds the wire bytes of all trajectory points back to back, and
+    `offsets[i]` is the start of the message for point i. The messages can be
+    sent as they are with `MotionConnection.request_frame`, or streamed with
+    `MotionConnection.stream_joint_trajectory`.
+    """
+
+    buffer: bytearray
+    offsets: Sequence[int]
+    msg_size: int
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def message(self, index: int) -> memoryview:
+        offset = self.offsets[index]
+        return memoryview(self.buffer)[offset : offset + self.msg_size]
+
+    def sequence(self, index: int) -> int:
+        (sequence,) = _SEQUENCE_STRUCT.unpack_from(
+            self.buffer, self.offsets[index] + _SEQUENCE_OFFSET
+        )
+        return sequence
+
+    def point(self, index: int) -> Union[JointTrajPtFull, JointTrajPtFullEx]:
+        """Decode the trajectory point of a message."""
+        return SimpleMessage.from_bytes(self.message(index)).body
+
+    def __iter__(self) -> Iterator[memoryview]:
+        view = memoryview(self.buffer)
+        for offset in self.offsets:
+            yield view[offset : offset + self.msg_size]
+
+
+@dataclass
+class GroupTrajectory:
+    """Per point time, positions, velocities and accelerations of one group.
+
+    `pos`, `vel` and `acc` hold one row of at most ROS_MAX_JOINT values per
+    point, the same number for all rows. Rows are zero-padded on packing.
+    NumPy arrays are accepted.
+    """
+
+    groupno: int
+    time: Vector
+    pos: Sequence[Vector]
+    vel: Optional[Sequence[Vector]] = None
+    acc: Optional[Sequence[Vector]] = None
+
+    @property
+    def valid_fields(self) -> ValidFields:
+        valid_fields = ValidFields.TIME | ValidFields.POSITION
+        if self.vel is not None:
+            valid_fields |= ValidFields.VELOCITY
+        if self.acc is not None:
+            valid_fields |= ValidFields.ACCELERATION
+        return valid_fields
+
+
+def _tolist(values) -> List:
+    # Iterating NumPy arrays yields NumPy scalars, which are slow to pack
+    if hasattr(values, "tolist"):
+        return values.tolist()
+    return list(values)
+
+
+def _rows(rows, num_points: int, name: str) -> Tuple[Sequence, str]:
+    """The rows to pack and the struct format of a padded row.
+
+    Missing rows are packed as zeros, with pad bytes and no values.
+    """
+    if rows is None:
+        return repeat((), num_points), f"{_JOINTS_SIZE}x"
+    shape = getattr(rows, "shape", None)
+    rows = _tolist(rows)
+    if len(rows) != num_points:
+        raise SimpleMessageError(
+            f"Expected {num_points} rows of {name}, got {len(rows)}"
+        )
+    num_joints = len(rows[0]) if rows else 0
+    if num_joints > ROS_MAX_JOINT:
+        raise SimpleMessageError(
+            f"At most {ROS_MAX_JOINT} joints are supported, got {num_joints}"
+        )
+    # The rows of a 2D array have the same length
+    if (shape is None or len(shape) != 2) and any(
+        len(row) != num_joints for row in rows
+    ):
+        raise SimpleMessageError(f"All rows of {name} must have the same length")
+    padding = 4 * (ROS_MAX_JOINT - num_joints)
+    return rows, f"{num_joints}f{padding}x"
+
+
+def _group_columns(group: GroupTrajectory, num_points: int):
+    pos, pos_format = _rows(group.pos, num_points, "positions")
+    vel, vel_format = _rows(group.vel, num_points, "velocities")
+    acc, acc_format = _rows(group.acc, num_points, "accelerations")
+    return (pos, vel, acc), pos_format + vel_format + acc_format
+
+
+def pack_joint_trajectory(
+    groupno: int,
+    time: Vector,
+    pos: Sequence[Vector],
+    vel: Optional[Sequence[Vector]] = None,
+    acc: Optional[Sequence[Vector]] = None,
+    sequence_start: int = 0,
+) -> PackedTrajectory:
+    """Pack a single group trajectory as JOINT_TRAJ_PT_FULL messages."""
+    group = GroupTrajectory(groupno, time, pos, vel, acc)
+    times = _tolist(group.time)
+    num_points = len(times)
+    (pos_rows, vel_rows, acc_rows), joints_format = _group_columns(group, num_points)
+    # The rows are packed as they are, the pad bytes zero the unused joints
+    body = Struct(_JOINT_TRAJ_PT_FULL_HEAD_STRUCT.format + "if" + joints_format)
+    valid_fields = group.valid_fields.value
+
+    msg_size = body.size
+    buffer = bytearray(msg_size * num_points)
+    pack_into = body.pack_into
+    length = msg_size - Prefix.size
+    msg_type = MsgType.JOINT_TRAJ_PT_FULL.value
+    comm_type = CommType.SERVICE_REQUEST.value
+    reply_type = ReplyType.INVALID.value
+
+    offset = 0
+    sequence = sequence_start
+    for t, pos_row, vel_row, acc_row in zip(times, pos_rows, vel_rows, acc_rows):
+        pack_into(
+            buffer,
+            offset,
+            length,
+            msg_type,
+            comm_type,
+            reply_type,
+            groupno,
+            sequence,
+            valid_fields,
+            t,
+            *pos_row,
+            *vel_row,
+            *acc_row,
+        )
+        offset += msg_size
+        sequence += 1
+
+    return PackedTrajectory(buffer, range(0, len(buffer), msg_size), msg_size)
+
+
+def pack_joint_trajectory_ex(
+    groups: Sequence[GroupTrajectory], sequence_start: int = 0
+) -> PackedTrajectory:
+    """Pack a multi group trajectory as MOTO_JOINT_TRAJ_PT_FULL_EX messages.
+
+    All groups must have the same number of points.
+    """
+    number_of_valid_groups = len(groups)
+    if not 0 < number_of_valid_groups <= MOT_MAX_GR:
+        raise SimpleMessageError(
+            f"Between 1 and {MOT_MAX_GR} groups are supported, "
+            f"got {number_of_valid_groups}"
+        )
+
+    num_points = len(groups[0].time)
+    header_size = _JOINT_TRAJ_PT_FULL_EX_STRUCT.size
+    msg_size = header_size + JointTrajPtExData.size * number_of_valid_groups
+    buffer = bytearray(msg_size * num_points)
+    pack_header_into = _JOINT_TRAJ_PT_FULL_EX_STRUCT.pack_into
+    length = msg_size - Prefix.size
+    msg_type = MsgType.MOTO_JOINT_TRAJ_PT_FULL_EX.value
+    comm_type = CommType.SERVICE_REQUEST.value
+    reply_type = ReplyType.INVALID.value
+
+    offset = 0
+    for sequence in range(sequence_start, sequence_start + num_points):
+        pack_header_into(
+            buffer,
+            offset,
+            length,
+            msg_type,
+            comm_type,
+            reply_type,
+            number_of_valid_groups,
+            sequence,
+        )
+        offset += msg_size
+
+    # One pass per group over the data of the group in all messages
+    for index, group in enumerate(groups):
+        times = _tolist(group.time)
+        if len(times) != num_points:
+            raise SimpleMessageError(
+                "All groups must have the same number of trajectory points"
+            )
+        (pos_rows, vel_rows, acc_rows), joints_format = _group_columns(
+            group, num_points
+        )
+        pack_group_into = Struct("iif" + joints_format).pack_into
+        groupno = group.groupno
+        valid_fields = group.valid_fields.value
+        offset = header_size + index * JointTrajPtExData.size
+        for t, pos_row, vel_row, acc_row in zip(times, pos_rows, vel_rows, acc_rows):
+            pack_group_into(
+                buffer,
+                offset,
+                groupno,
+                valid_fields,
+                t,
+                *pos_row,
+                *vel_row,
+                *acc_row,
+            )
+            offset += msg_size
+
+    return PackedTrajectory(buffer, range(0, len(buffer), msg_size), msg_size)
+
+
+assert _JOINT_TRAJ_PT_FULL_HEAD_STRUCT.size + Struct("if30f").size == (
+    Prefix.size + Header.size + JointTrajPtFull.size
+)
@@ -12,19 +12,26 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from moto.simple_message_connection import SimpleMessageConnection
+from typing import Optional, Tuple
+import socket
+import time
+
+from moto.capture import CaptureWriter, Direction
+from moto.service_connection import ServiceConnection
 from moto.simple_message import (
     Header,
     MsgType,
     CommType,
     ReplyType,
     MotoMotionCtrl,
+    MotoRealTimeMotionJointCommandEx,
+    MotoRealTimeMotionJointStateEx,
     CommandType,
     SimpleMessage,
 )
 
 
-class RealTimeMotionConnection(SimpleMessageConnection):
+class RealTimeMotionConnection(ServiceConnection):
 
     TCP_PORT_REALTIME_MOTION = 50243
 
@@ -50,3 +57,82 @@ class RealTimeMotionConnection(SimpleMessageConnection):
         return self._send_and_recv_request(CommandType.STOP_REALTIME_MOTION_MODE)
 
 
+class RealTimeMotionServer:
+    """The UDP server the controller streams real-time motion state to.
+
+    In real-time motion mode, the controller sends a
+    MOTO_REALTIME_MOTION_JOINT_STATE_EX to this server every control cycle
+    and expects a MOTO_REALTIME_MOTION_JOINT_COMMAND_EX in return. Received
+    and sent messages are recorded from the point of view of this host, with
+    the time the state arrived.
+    """
+
+    UDP_PORT_REALTIME_MOTION = 50244
+    BUFSIZE = 1024
+
+    def __init__(
+        self,
+        ip_address: str,
+        port: int = UDP_PORT_REALTIME_MOTION,
+        recorder: Optional[CaptureWriter] = None,
+    ) -> None:
+        self._address: Tuple[str, int] = (ip_address, port)
+        self._socket: socket.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._buffer: bytearray = bytearray(self.BUFSIZE)
+        self._view: memoryview = memoryview(self._buffer)
+        # Where the last state came from, and where commands are sent
+        self._controller_address: Optional[Tuple[str, int]] = None
+        self._recorder: Optional[CaptureWriter] = recorder
+        self._arrival_ns: int = 0
+        self._port: int = port
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._socket.getsockname()
+
+    @property
+    def arrival_ns(self) -> int:
+        """time.perf_counter_ns() when the last state arrived."""
+        return self._arrival_ns
+
+    def set_recorder(self, recorder: Optional[CaptureWriter]) -> None:
+        """Record all sent and received messages, or stop recording if None."""
+        self._recorder = recorder
+
+    def start(self) -> None:
+        self._socket.bind(self._address)
+        # The port that was bound, when port 0 is given
+        self._port = self.address[1]
+
+    def close(self) -> None:
+        self._socket.close()
+
+    def settimeout(self, timeout: Optional[float]) -> None:
+        self._socket.settimeout(timeout)
+
+    def recv_state(self) -> MotoRealTimeMotionJointStateEx:
+        nbytes, self._controller_address = self._socket.recvfrom_into(self._buffer)
+        self._arrival_ns = time.perf_counter_ns()
+        frame = self._view[:nbytes]
+        if self._recorder is not None:
+            self._recorder.record(
+                Direction.RECV, self._port, frame, self._arrival_ns * 1e-9
+            )
+        return SimpleMessage.from_bytes(frame).body
+
+    def send_command(self, command: MotoRealTimeMotionJointCommandEx) -> None:
+        """Send the command for the last received state."""
+        if self._controller_address is None:
+            raise RuntimeError("No state has been received from the controller")
+        frame = SimpleMessage(
+            Header(
+                MsgType.MOTO_REALTIME_MOTION_JOINT_COMMAND_EX,
+                CommType.TOPIC,
+                ReplyType.INVALID,
+            ),
+            command,
+        ).to_bytes()
+        self._socket.sendto(frame, self._controller_address)
+        if self._recorder is not None:
+            self._recorder.record(Direction.SEND, self._port, frame)
@@ -0,0 +1,54 @@
+# Copyright 2021 Norwegian University of Science and Technology.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Any, List
+from dataclasses import dataclass
+from enum import Enum
+
+from moto.simple_message import RobotStatus
+
+
+class RobotStatusField(Enum):
+    DRIVES_POWERED = "drives_powered"
+    E_STOPPED = "e_stopped"
+    ERROR_CODE = "error_code"
+    IN_ERROR = "in_error"
+    IN_MOTION = "in_motion"
+    MODE = "mode"
+    MOTION_POSSIBLE = "motion_possible"
+
+
+_FIELDS = [(field, field.value) for field in RobotStatusField]
+
+
+@dataclass(frozen=True)
+class RobotStatusChange:
+    field: RobotStatusField
+    old: Any
+    new: Any
+    # time.perf_counter() when the RobotStatus with the new value arrived
+    stamp: float
+
+
+def diff_robot_status(
+    old: RobotStatus, new: RobotStatus, stamp: float
+) -> List[RobotStatusChange]:
+    """The changes from `old` to `new`, in the order of the RobotStatus fields."""
+    changes = []
+    for field, name in _FIELDS:
+        old_value = getattr(old, name)
+        new_value = getattr(new, name)
+        if old_value != new_value:
+            changes.append(RobotStatusChange(field, old_value, new_value, stamp))
+    return changes
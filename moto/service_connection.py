@@ -0,0 +1,203 @@
+# Copyright 2021 Norwegian University of Science and Technology.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import FrozenSet, List, Optional, Union
+from concurrent import futures
+from concurrent.futures import Future
+from threading import Lock, Thread
+
+import logging
+
+from moto.capture import CaptureWriter
+from moto.simple_message import Header, MsgType, Prefix, SimpleMessage
+from moto.simple_message_connection import Address, SimpleMessageConnection
+
+logger = logging.getLogger(__name__)
+
+_IO_REPLY_TYPES = {
+    MsgType.MOTO_READ_IO_BIT: MsgType.MOTO_READ_IO_BIT_REPLY,
+    MsgType.MOTO_WRITE_IO_BIT: MsgType.MOTO_WRITE_IO_BIT_REPLY,
+    MsgType.MOTO_READ_IO_GROUP: MsgType.MOTO_READ_IO_GROUP_REPLY,
+    MsgType.MOTO_WRITE_IO_GROUP: MsgType.MOTO_WRITE_IO_GROUP_REPLY,
+}
+
+_MOTION_REQUEST_TYPES = (
+    MsgType.MOTO_MOTION_CTRL,
+    MsgType.JOINT_TRAJ_PT_FULL,
+    MsgType.MOTO_JOINT_TRAJ_PT_FULL_EX,
+    MsgType.MOTO_SELECT_TOOL,
+)
+
+
+def reply_types(request_type: MsgType) -> FrozenSet[MsgType]:
+    """The message types the controller may reply to a request with."""
+    if request_type in _IO_REPLY_TYPES:
+        # An IO request that fails is answered with MOTO_IOCTRL_REPLY
+        return frozenset((_IO_REPLY_TYPES[request_type], MsgType.MOTO_IOCTRL_REPLY))
+    if request_type in _MOTION_REQUEST_TYPES:
+        return frozenset((MsgType.MOTO_MOTION_REPLY,))
+    return frozenset((request_type,))
+
+
+class _PendingRequest:
+    __slots__ = ("reply_types", "sequence", "future")
+
+    def __init__(self, reply_types: FrozenSet[MsgType], sequence: Optional[int]):
+        self.reply_types: FrozenSet[MsgType] = reply_types
+        self.sequence: Optional[int] = sequence
+        self.future: Future = Future()
+
+
+class ServiceConnection(SimpleMessageConnection):
+    """Request/reply connection that can be shared by several threads.
+
+    A reader thread receives all replies and completes the future of the
+    request it belongs to. A reply is matched to the oldest pending request
+    that expects its message type and has the same sequence number, or to
+    the oldest pending request that expects its message type if none has
+    (the controller handles the requests of a connection in order). Sending
+    is serialized with a lock, but it is not held while waiting for a reply,
+    so several threads can have requests pending at once.
+
+    The reply of a request whose future was cancelled is discarded. When
+    `send_and_recv` times out, it is not known whether the reply will still
+    arrive, so later replies could no longer be matched reliably: the
+    connection is closed and all pending requests fail.
+
+    Replies are only received by the reader thread; do not call `recv`.
+    """
+
+    def __init__(self, addr: Address, recorder: Optional[CaptureWriter] = None):
+        super().__init__(addr, recorder)
+        # Requests in the order they were sent
+        self._pending: List[_PendingRequest] = []
+        # Guards the pending requests; not held while sending
+        self._lock: Lock = Lock()
+        self._send_lock: Lock = Lock()
+        self._closed: bool = False
+        self._error: Optional[Exception] = None
+        self._reader_thread: Thread = Thread(target=self._reader)
+        self._reader_thread.daemon = True
+
+    def start(self) -> None:
+        self._tcp_client.connect()
+        self._reader_thread.start()
+
+    def close(self) -> None:
+        self._close(ConnectionError("Connection closed"))
+
+    def _close(self, error: Exception) -> None:
+        with self._lock:
+            self._closed = True
+        super().close()
+        self._fail_pending(error)
+
+    def request(self, msg: SimpleMessage) -> "Future[SimpleMessage]":
+        """Send a request and return the future of its reply."""
+        return self._request(
+            msg.header.msg_type, getattr(msg.body, "sequence", None), msg.to_bytes()
+        )
+
+    def request_frame(
+        self, frame: Union[bytes, memoryview], sequence: Optional[int] = None
+    ) -> "Future[SimpleMessage]":
+        """Send an encoded request, prefix included, and return its future.
+
+        `sequence` is the sequence number of the request, if it has one, which
+        its reply is matched by. See `moto.packed_trajectory`.
+        """
+        msg_type, _, _ = Header.struct_.unpack_from(frame, Prefix.size)
+        return self._request(MsgType(msg_type), sequence, frame)
+
+    def _request(
+        self,
+        msg_type: MsgType,
+        sequence: Optional[int],
+        frame: Union[bytes, memoryview],
+    ) -> "Future[SimpleMessage]":
+        pending = _PendingRequest(reply_types(msg_type), sequence)
+        # Registered and sent under the send lock, so the pending requests are
+        # in the order of the requests on the connection
+        with self._send_lock:
+            with self._lock:
+                if self._closed or self._error is not None:
+                    error = ConnectionError("Not connected to the robot controller")
+                    raise error from self._error
+                self._pending.append(pending)
+            try:
+                self.send_frame(frame)
+            except Exception:
+                with self._lock:
+                    self._pending.remove(pending)
+                raise
+        return pending.future
+
+    def send_and_recv(
+        self, msg: SimpleMessage, timeout: Optional[float] = None
+    ) -> SimpleMessage:
+        future = self.request(msg)
+        try:
+            return future.result(timeout)
+        except futures.TimeoutError:
+            self._close(
+                ConnectionError(
+                    f"Connection closed, no reply to a {msg.header.msg_type}"
+                    f" within {timeout} s"
+                )
+            )
+            raise
+
+    def _reader(self) -> None:
+        while True:
+            try:
+                reply = self.recv()
+            except Exception as e:
+                with self._lock:
+                    closed = self._closed
+                    self._error = e
+                if not closed:
+                    logger.exception("Receiving replies failed")
+                self._fail_pending(
+                    ConnectionError("Connection to the robot controller lost")
+                )
+                return
+            self._complete(reply)
+
+    def _complete(self, reply: SimpleMessage) -> None:
+        reply_type = reply.header.msg_type
+        sequence = getattr(reply.body, "sequence", None)
+        with self._lock:
+            match = None
+            for pending in self._pending:
+                if reply_type in pending.reply_types:
+                    if match is None:
+                        match = pending
+                    if sequence is not None and pending.sequence == sequence:
+                        match = pending
+                        break
+            if match is not None:
+                self._pending.remove(match)
+        if match is None:
+            logger.warning("Dropped a %s without a pending request", reply_type)
+        elif match.future.set_running_or_notify_cancel():
+            match.future.set_result(reply)
+        else:
+            logger.debug("Discarded the %s of a cancelled request", reply_type)
+
+    def _fail_pending(self, error: Exception) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for request in pending:
+            if request.future.set_running_or_notify_cancel():
+                request.future.set_exception(error)
@@ -0,0 +1,291 @@
+# Copyright 2021 Norwegian University of Science and Technology.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Latest state of the robot in shared memory, for other local processes.
+
+A single SharedStatePublisher, fed by a StateConnection, writes the latest
+JointFeedback of every group and the latest RobotStatus into a shared memory
+block. Any number of SharedStateReader instances in other processes read them
+without a connection to the controller. Every record is guarded by a sequence
+counter (a seqlock): it is odd while the record is being written, and readers
+retry until they have copied a record with the same even counter before and
+after the copy.
+
+Readers attach with multiprocessing.shared_memory.SharedMemory. From Python
+3.13 they do so with track=False; before, the block is unregistered from the
+resource tracker of the reader, which would otherwise remove it when the
+reader process exits. The publisher registers it again before removing it,
+in case a reader in its own process tree shared its resource tracker.
+
+Requires NumPy, which is an optional dependency of moto.
+"""
+
+from typing import NamedTuple, Optional
+from threading import Lock
+
+import os
+import sys
+import time
+
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from moto.simple_message import JointFeedback, RobotStatus, MOT_MAX_GR, ROS_MAX_JOINT
+
+SHARED_STATE_MAGIC = b"MOTOSHM\x00"
+SHARED_STATE_VERSION = 1
+
+# Before Python 3.13, SharedMemory registers every block it attaches to with
+# the resource tracker of the process (POSIX only), which removes the block
+# when the process exits, although it is owned by the publisher
+_READERS_UNREGISTER = sys.version_info < (3, 13) and os.name == "posix"
+
+_GROUP_DTYPE = np.dtype(
+    [
+        ("sequence", np.uint64),
+        # Host time.monotonic() when the message was received
+        ("stamp", np.float64),
+        ("valid_fields", np.int32),
+        ("time", np.float32),
+        ("pos", np.float32, (ROS_MAX_JOINT,)),
+        ("vel", np.float32, (ROS_MAX_JOINT,)),
+        ("acc", np.float32, (ROS_MAX_JOINT,)),
+    ],
+    align=True,
+)
+
+_ROBOT_STATUS_FIELDS = (
+    "drives_powered",
+    "e_stopped",
+    "error_code",
+    "in_error",
+    "in_motion",
+    "mode",
+    "motion_possible",
+)
+
+_ROBOT_STATUS_DTYPE = np.dtype(
+    [("sequence", np.uint64), ("stamp", np.float64)]
+    + [(name, np.int32) for name in _ROBOT_STATUS_FIELDS],
+    align=True,
+)
+
+_LAYOUT_DTYPE = np.dtype(
+    [
+        ("magic", "S8"),
+        ("version", np.uint32),
+        ("num_groups", np.uint32),
+        ("robot_status", _ROBOT_STATUS_DTYPE),
+        ("groups", _GROUP_DTYPE, (MOT_MAX_GR,)),
+    ],
+    align=True,
+)
+
+# Attempts to copy a record before giving up on a writer that died mid-write
+_MAX_READ_ATTEMPTS = 10000
+
+
+class SharedStateError(Exception):
+    pass
+
+
+class SharedJointFeedback(NamedTuple):
+    sequence: int
+    stamp: float
+    groupno: int
+    valid_fields: int
+    time: float
+    pos: np.ndarray
+    vel: np.ndarray
+    acc: np.ndarray
+
+
+class SharedStatePublisher:
+    """Writes the latest state into a new shared memory block.
+
+    Created by `StateConnection.enable_shared_state`, which writes every
+    received JointFeedback and RobotStatus from the receive thread. The block
+    is named `name`, or a random name if None, which readers use to attach.
+    """
+
+    def __init__(self, name: Optional[str] = None) -> None:
+        self._shm: SharedMemory = SharedMemory(
+            name, create=True, size=_LAYOUT_DTYPE.itemsize
+        )
+        layout = np.ndarray((), _LAYOUT_DTYPE, buffer=self._shm.buf)
+        layout[...] = np.zeros((), _LAYOUT_DTYPE)
+        layout["version"] = SHARED_STATE_VERSION
+        layout["num_groups"] = MOT_MAX_GR
+        # Written last, so a reader never accepts a half-initialized block
+        layout["magic"] = SHARED_STATE_MAGIC
+        self._groups: np.ndarray = layout["groups"]
+        self._robot_status: np.ndarray = layout["robot_status"]
+        del layout
+        # Held while writing, so the block is not closed under the writer
+        self._lock: Lock = Lock()
+        self._closed: bool = False
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def write_joint_feedback(
+        self, feedback: JointFeedback, stamp: Optional[float] = None
+    ) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            record = self._groups[feedback.groupno, ...]
+            sequence = int(record["sequence"])
+            record["sequence"] = sequence + 1
+            record["stamp"] = time.monotonic() if stamp is None else stamp
+            record["valid_fields"] = feedback.valid_fields
+            record["time"] = feedback.time
+            record["pos"][: len(feedback.pos)] = feedback.pos
+            record["vel"][: len(feedback.vel)] = feedback.vel
+            record["acc"][: len(feedback.acc)] = feedback.acc
+            record["sequence"] = sequence + 2
+
+    def write_robot_status(
+        self, robot_status: RobotStatus, stamp: Optional[float] = None
+    ) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            record = self._robot_status
+            sequence = int(record["sequence"])
+            record["sequence"] = sequence + 1
+            record["stamp"] = time.monotonic() if stamp is None else stamp
+            for name in _ROBOT_STATUS_FIELDS:
+                value = getattr(robot_status, name)
+                record[name] = value if name == "error_code" else value.value
+            record["sequence"] = sequence + 2
+
+    def close(self) -> None:
+        """Close and remove the shared memory block."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._groups = None
+            self._robot_status = None
+            self._shm.close()
+            if _READERS_UNREGISTER:
+                # A reader sharing the resource tracker of this process
+                # unregistered the block, which unlink expects to find
+                resource_tracker.register(_tracked_name(self._shm), "shared_memory")
+            self._shm.unlink()
+
+
+class SharedStateReader:
+    """Reads the state written by a SharedStatePublisher in another process.
+
+    `joint_feedback` and `robot_status` return consistent copies. `view`
+    returns a zero-copy, live structured array of the record of a group,
+    which is read without the seqlock and may change while it is being read;
+    use `sequence` to detect updates. All views must be deleted before
+    `close`.
+    """
+
+    def __init__(self, name: str) -> None:
+        self._name: str = name
+        if sys.version_info >= (3, 13):
+            self._shm: SharedMemory = SharedMemory(name, track=False)
+        else:
+            self._shm = SharedMemory(name)
+        buffer = self._shm.buf
+        if len(buffer) < _LAYOUT_DTYPE.itemsize:
+            self.close()
+            raise SharedStateError(f"Shared memory block {name} is too small")
+        layout = np.ndarray((), _LAYOUT_DTYPE, buffer=buffer)
+        del buffer
+        magic = bytes(layout["magic"])
+        version = int(layout["version"])
+        num_groups = int(layout["num_groups"])
+        self._groups: np.ndarray = layout["groups"]
+        self._robot_status: np.ndarray = layout["robot_status"]
+        del layout
+        if magic != SHARED_STATE_MAGIC:
+            self.close()
+            raise SharedStateError(f"{name} is not a moto shared state block")
+        if version != SHARED_STATE_VERSION or num_groups != MOT_MAX_GR:
+            self.close()
+            raise SharedStateError(
+                f"Unsupported shared state version {version} with {num_groups} groups"
+            )
+        if _READERS_UNREGISTER:
+            # Only once the block is known to be owned by a publisher
+            resource_tracker.unregister(_tracked_name(self._shm), "shared_memory")
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    def sequence(self, groupno: int) -> int:
+        """Incremented twice per JointFeedback of the group, 0 if none."""
+        return int(self._groups[groupno, ...]["sequence"])
+
+    def robot_status_sequence(self) -> int:
+        return int(self._robot_status["sequence"])
+
+    def view(self, groupno: int) -> np.ndarray:
+        return self._groups[groupno, ...]
+
+    def joint_feedback(self, groupno: int) -> Optional[SharedJointFeedback]:
+        """Consistent copy of the latest JointFeedback of a group, or None."""
+        record = _read(self._groups[groupno, ...])
+        if record is None:
+            return None
+        return SharedJointFeedback(
+            sequence=int(record["sequence"]),
+            stamp=float(record["stamp"]),
+            groupno=groupno,
+            valid_fields=int(record["valid_fields"]),
+            time=float(record["time"]),
+            pos=record["pos"],
+            vel=record["vel"],
+            acc=record["acc"],
+        )
+
+    def robot_status(self) -> Optional[RobotStatus]:
+        record = _read(self._robot_status)
+        if record is None:
+            return None
+        return RobotStatus(*(int(record[name]) for name in _ROBOT_STATUS_FIELDS))
+
+    def close(self) -> None:
+        self._groups = None
+        self._robot_status = None
+        self._shm.close()
+
+
+def _tracked_name(shm: SharedMemory) -> str:
+    # The resource tracker knows POSIX blocks by their name with a leading slash
+    return "/" + shm.name
+
+
+def _read(record: np.ndarray) -> Optional[np.ndarray]:
+    for _ in range(_MAX_READ_ATTEMPTS):
+        sequence = int(record["sequence"])
+        if sequence == 0:
+            return None
+        if sequence % 2 == 0:
+            copy = record.copy()
+            if int(record["sequence"]) == sequence:
+                return copy
+        # Let the writer finish
+        time.sleep(0)
+    raise SharedStateError("The record is being written, the publisher may be dead")
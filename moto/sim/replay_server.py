@@ -0,0 +1,188 @@
+# Copyright 2021 Norwegian University of Science and Technology.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Iterator, Optional, Tuple, Union
+
+import os
+import socket
+import time
+from threading import Event, Thread
+
+from moto.capture import CaptureReader
+from moto.simple_message import MsgType
+from moto.sim.motosim import open_tcp_connection
+
+Address = Tuple[str, int]
+
+STATE_MSG_TYPES = (
+    MsgType.ROBOT_STATUS,
+    MsgType.JOINT_FEEDBACK,
+    MsgType.MOTO_JOINT_FEEDBACK_EX,
+)
+REALTIME_MOTION_STATE_MSG_TYPES = (MsgType.MOTO_REALTIME_MOTION_JOINT_STATE_EX,)
+
+
+class ReplayServer:
+    """Plays the state and RT motion streams of a capture file back to a client.
+
+    The state messages recorded on port 50241 are served over TCP to the first
+    client that connects to `state_port`, like the `StateServer`, and the RT
+    motion state messages recorded on port 50244 are sent over UDP to
+    `client_ip_address` and `realtime_motion_port`. Replies from the client
+    are ignored. The connection is closed when the stream has been played.
+
+    With `speed` 1.0 the messages are sent with their original timing, with
+    e.g. 2.0 twice as fast, and with None (or 0) as fast as possible. Each
+    stream is timed from its own start: the state stream when the client
+    connects and the RT stream when the server is started.
+    """
+
+    TCP_PORT_STATE: int = 50241
+    UDP_PORT_REALTIME_MOTION: int = 50244
+
+    # Batch size in bytes of the state stream when replaying as fast as possible
+    BATCH_SIZE: int = 65536
+
+    def __init__(
+        self,
+        capture: Union[str, os.PathLike, CaptureReader],
+        ip_address: str = "localhost",
+        client_ip_address: str = "localhost",
+        speed: Optional[float] = 1.0,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        state_port: int = TCP_PORT_STATE,
+        realtime_motion_port: int = UDP_PORT_REALTIME_MOTION,
+    ) -> None:
+        if isinstance(capture, CaptureReader):
+            self._reader: CaptureReader = capture
+            self._owns_reader: bool = False
+        else:
+            self._reader = CaptureReader(capture)
+            self._owns_reader = True
+
+        self._ip_address: str = ip_address
+        self._state_port: int = state_port
+        self._rt_address: Address = (client_ip_address, realtime_motion_port)
+        self._speed: Optional[float] = speed or None
+        self._start: Optional[float] = start
+        self._end: Optional[float] = end
+
+        self._sent_state: int = 0
+        self._sent_realtime_motion: int = 0
+
+        self._sig_stop: bool = False
+        self._state_done: Event = Event()
+        self._rt_done: Event = Event()
+
+        self._state_worker_thread = Thread(target=self._state_worker)
+        self._state_worker_thread.daemon = True
+        self._rt_worker_thread = Thread(target=self._rt_worker)
+        self._rt_worker_thread.daemon = True
+
+    @property
+    def sent_state(self) -> int:
+        return self._sent_state
+
+    @property
+    def sent_realtime_motion(self) -> int:
+        return self._sent_realtime_motion
+
+    def start(self) -> None:
+        self._state_worker_thread.start()
+        self._rt_worker_thread.start()
+
+    def stop(self) -> None:
+        self._sig_stop = True
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait until both streams have been played back."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for done in (self._state_done, self._rt_done):
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if not done.wait(remaining):
+                return False
+        return True
+
+    def close(self) -> None:
+        self.stop()
+        if self._owns_reader:
+            self._reader.close()
+
+    def _records(self, port: int, msg_types) -> Iterator[Tuple[float, memoryview]]:
+        for record in self._reader.records(
+            self._start, self._end, msg_types=msg_types, port=port
+        ):
+            yield record.timestamp, record.frame
+
+    def _paced(
+        self, records: Iterator[Tuple[float, memoryview]]
+    ) -> Iterator[memoryview]:
+        """Yield the frames of the records when they are due."""
+        speed = self._speed
+        t0 = None
+        start = time.monotonic()
+        for timestamp, frame in records:
+            if self._sig_stop:
+                return
+            if speed is not None:
+                if t0 is None:
+                    t0 = timestamp
+                delay = start + (timestamp - t0) / speed - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            yield frame
+
+    def _state_worker(self) -> None:
+        try:
+            print("[replay_server]: Waiting for connection")
+            conn, addr = open_tcp_connection((self._ip_address, self._state_port))
+            print("[replay_server]: Got connection from {}".format(addr))
+            with conn:
+                records = self._records(self.TCP_PORT_STATE, STATE_MSG_TYPES)
+                frames = self._paced(records)
+                if self._speed is not None:
+                    for frame in frames:
+                        conn.sendall(frame)
+                        self._sent_state += 1
+                else:
+                    # Nothing to wait for, so send in batches to save syscalls
+                    batch = bytearray()
+                    count = 0
+                    for frame in frames:
+                        batch += frame
+                        count += 1
+                        if len(batch) >= self.BATCH_SIZE:
+                            conn.sendall(batch)
+                            self._sent_state += count
+                            batch.clear()
+                            count = 0
+                    conn.sendall(batch)
+                    self._sent_state += count
+        finally:
+            self._state_done.set()
+
+    def _rt_worker(self) -> None:
+        udp_client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            records = self._records(
+                self.UDP_PORT_REALTIME_MOTION, REALTIME_MOTION_STATE_MSG_TYPES
+            )
+            # One datagram per message, as sent by the controller
+            for frame in self._paced(records):
+                udp_client.sendto(frame, self._rt_address)
+                self._sent_realtime_motion += 1
+        finally:
+            udp_client.close()
+            self._rt_done.set()
@@ -12,31 +12,66 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import List, Tuple, Union, ClassVar
+from typing import Any, Dict, Sequence, Tuple, Union, ClassVar
+from array import array
 from dataclasses import dataclass
 from enum import Enum, IntEnum, IntFlag
 
-import struct
 from struct import Struct
 
 ROS_MAX_JOINT: int = 10
 MOT_MAX_GR: int = 4
 
+_INT_STRUCT: Struct = Struct("i")
+# The fields preceding the pos, vel and acc arrays of the joint messages
+_JOINT_FEEDBACK_HEAD: Struct = Struct("iif")
+_JOINT_TRAJ_PT_FULL_HEAD: Struct = Struct("iiif")
+_2INT_STRUCT: Struct = Struct("2i")
+_3INT_STRUCT: Struct = Struct("3i")
+_PREFIX_HEADER_STRUCT: Struct = Struct("4i")
+# Size of ROS_MAX_JOINT packed floats
+_JOINTS_SIZE: int = 4 * ROS_MAX_JOINT
+
 
 class SimpleMessageError(Exception):
     pass
 
 
+def _joints(values: Sequence[float]) -> array:
+    """Store joint values compactly as ROS_MAX_JOINT 32-bit floats.
+
+    Shorter sequences are zero-padded. The values are always copied, so a
+    message never shares its payload with an array of the caller.
+    """
+    joints = array("f", values)
+    num_joints = len(joints)
+    if num_joints > ROS_MAX_JOINT:
+        raise SimpleMessageError(
+            f"At most {ROS_MAX_JOINT} joint values are supported, got {num_joints}"
+        )
+    if num_joints < ROS_MAX_JOINT:
+        joints.frombytes(bytes(4 * (ROS_MAX_JOINT - num_joints)))
+    return joints
+
+
+def _joints_from_bytes(bytes_: bytes, offset: int) -> array:
+    joints = array("f")
+    joints.frombytes(bytes_[offset : offset + _JOINTS_SIZE])
+    return joints
+
+
 @dataclass
 class Prefix:
+    __slots__ = ("length",)
+
     struct_: ClassVar[Struct] = Struct("i")
     size: ClassVar[int] = struct_.size
 
     length: int
 
     @classmethod
-    def from_bytes(cls, bytes_: bytes):
-        return cls(*cls.struct_.unpack(bytes_))
+    def from_bytes(cls, bytes_: bytes, offset: int = 0):
+        return cls(*cls.struct_.unpack_from(bytes_, offset))
 
     def to_bytes(self) -> bytes:
         return self.struct_.pack(self.length)
@@ -151,8 +186,40 @@ class NotReadySubcode(IntEnum):
 SubCode = Union[int, InvalidSubCode, NotReadySubcode]
 
 
+def _enum_lookup(enum_cls) -> Dict[Any, Enum]:
+    """Map both the values and the members of an Enum to its members.
+
+    Indexing the returned dict is a lot cheaper than calling the Enum class,
+    which matters on the decode path where every message converts a handful
+    of fields.
+    """
+    lookup = {member.value: member for member in enum_cls}
+    lookup.update({member: member for member in enum_cls})
+    return lookup
+
+
+def _lookup(lookup: Dict[Any, Enum], enum_cls, value):
+    try:
+        return lookup[value]
+    except KeyError:
+        return enum_cls(value)
+
+
+_MSG_TYPES = _enum_lookup(MsgType)
+_COMM_TYPES = _enum_lookup(CommType)
+_REPLY_TYPES = _enum_lookup(ReplyType)
+_COMMAND_TYPES = _enum_lookup(CommandType)
+_RESULT_TYPES = _enum_lookup(ResultType)
+# The command of a MotoMotionReply is either a CommandType or the MsgType of the
+# request. The value ranges don't overlap.
+_REPLY_COMMANDS = {**_MSG_TYPES, **_COMMAND_TYPES}
+_SUB_CODES = {**_enum_lookup(NotReadySubcode), **_enum_lookup(InvalidSubCode)}
+
+
 @dataclass
 class Header:
+    __slots__ = ("msg_type", "comm_type", "reply_type")
+
     struct_: ClassVar[Struct] = Struct("3i")
     size: ClassVar[int] = struct_.size
 
@@ -167,19 +234,18 @@ class Header:
         reply_type: Union[int, ReplyType],
     ):
         try:
-            self.msg_type = MsgType(msg_type)
-            self.comm_type = CommType(comm_type)
-            self.reply_type = ReplyType(reply_type)
-        except ValueError as e:
+            self.msg_type = _MSG_TYPES[msg_type]
+            self.comm_type = _COMM_TYPES[comm_type]
+            self.reply_type = _REPLY_TYPES[reply_type]
+        except KeyError as e:
             # If any of the msg, command, or reply types isn't a type described in
             # Motoplus-ROS Incremental Motion interface - Engineering Design Specifications.
             # Then we assign it to be of type Invalid
-            self.msg_type = MsgType(-1)
-
+            self.msg_type = MsgType.INVALID
 
     @classmethod
-    def from_bytes(cls, bytes_: bytes):
-        return cls(*cls.struct_.unpack(bytes_))
+    def from_bytes(cls, bytes_: bytes, offset: int = 0):
+        return cls(*cls.struct_.unpack_from(bytes_, offset))
 
     def to_bytes(self) -> bytes:
         return self.struct_.pack(
@@ -215,20 +281,39 @@ class PendantMode(Enum):
     MANUAL = 1
     AUTO = 2
 
+
+# All combinations of the four valid field bits
+_VALID_FIELDS = {value: ValidFields(value) for value in range(16)}
+_TERNARIES = _enum_lookup(Ternary)
+_PENDANT_MODES = _enum_lookup(PendantMode)
+
+
 @dataclass
 class Invalid:
+    __slots__ = ("data",)
+
     data: bytes
 
     def __init__(self, data) -> None:
         self.data = data
 
     @classmethod
-    def from_bytes(cls, bytes_: bytes):
-        return cls(bytes_)
+    def from_bytes(cls, bytes_: bytes, offset: int = 0):
+        return cls(bytes(bytes_[offset:]))
 
 
 @dataclass
 class RobotStatus:
+    __slots__ = (
+        "drives_powered",
+        "e_stopped",
+        "error_code",
+        "in_error",
+        "in_motion",
+        "mode",
+        "motion_possible",
+    )
+
     struct_: ClassVar[Struct] = Struct("7i")
     size = struct_.size
 
@@ -257,17 +342,32 @@ class RobotStatus:
         mode: Union[int, PendantMode],
         motion_possible: Union[int, Ternary],
     ) -> None:
-        self.drives_powered: Ternary = Ternary(drives_powered)
-        self.e_stopped: Ternary = Ternary(e_stopped)
+        self.drives_powered: Ternary = _lookup(_TERNARIES, Ternary, drives_powered)
+        self.e_stopped: Ternary = _lookup(_TERNARIES, Ternary, e_stopped)
         self.error_code: int = error_code
-        self.in_error: Ternary = Ternary(in_error)
-        self.in_motion: Ternary = Ternary(in_motion)
-        self.mode: PendantMode = PendantMode(mode)
-        self.motion_possible: Ternary = Ternary(motion_possible)
+        self.in_error: Ternary = _lookup(_TERNARIES, Ternary, in_error)
+        self.in_motion: Ternary = _lookup(_TERNARIES, Ternary, in_motion)
+        self.mode: PendantMode = _lookup(_PENDANT_MODES, PendantMode, mode)
+        self.motion_possible: Ternary = _lookup(_TERNARIES, Ternary, motion_possible)
 
     @classmethod
-    def from_bytes(cls, bytes_: bytes):
-        return cls(*cls.struct_.unpack(bytes_[: cls.size]))
+    def from_bytes(cls, bytes_: bytes, offset: int = 0):
+        # Received with every state update, so the fields are set directly
+        values = cls.struct_.unpack_from(bytes_, offset)
+        status = cls.__new__(cls)
+        ternaries = _TERNARIES
+        try:
+            status.drives_powered = ternaries[values[0]]
+            status.e_stopped = ternaries[values[1]]
+            status.error_code = values[2]
+            status.in_error = ternaries[values[3]]
+            status.in_motion = ternaries[values[4]]
+            status.mode = _PENDANT_MODES[values[5]]
+            status.motion_possible = ternaries[values[6]]
+        except KeyError:
+            # Let __init__ raise the error of the invalid value
+            return cls(*values)
+        return status
 
     def to_bytes(self) -> bytes:
         packed = self.struct_.pack(
@@ -284,6 +384,8 @@ class RobotStatus:
 
 @dataclass
 class JointTrajPtFull:
+    __slots__ = ("groupno", "sequence", "valid_fields", "time", "pos", "vel", "acc")
+
     struct_: ClassVar[Struct] = Struct("iiif10f10f10f")
     size: ClassVar[int] = struct_.size
 
@@ -298,11 +400,11 @@ class JointTrajPtFull:
     # Timestamp associated with this trajectory point; Units: in seconds
     time: float
     # Desired joint positions in radian.  Base to Tool joint order
-    pos: List[float]
+    pos: array
     # Desired joint velocities in radian/sec.
-    vel: List[float]
+    vel: array
     # Desired joint accelerations in radian/sec^2.
-    acc: List[float]
+    acc: array
 
     def __init__(
         self,
@@ -310,28 +412,29 @@ class JointTrajPtFull:
         sequence: int,
         valid_fields: Union[int, ValidFields],
         time: float,
-        pos: List[float],
-        vel: List[float],
-        acc: List[float],
+        pos: Sequence[float],
+        vel: Sequence[float],
+        acc: Sequence[float],
     ) -> None:
         self.groupno: int = groupno
         self.sequence: int = sequence
-        self.valid_fields: ValidFields = ValidFields(valid_fields)
+        self.valid_fields: ValidFields = _lookup(
+            _VALID_FIELDS, ValidFields, valid_fields
+        )
         self.time: float = time
-        self.pos: List[float] = pos
-        self.vel: List[float] = vel
-        self.acc: List[float] = acc
+        self.pos: array = _joints(pos)
+        self.vel: array = _joints(vel)
+        self.acc: array = _joints(acc)
 
     @classmethod
-    def from_bytes(cls, bytes_: bytes):
-        unpacked: Tuple = cls.struct_.unpack(bytes_[: cls.size])
-        groupno = unpacked[0]
-        sequence = unpacked[1]
-        valid_fields = unpacked[2]
-        time = unpacked[3]
-        pos = unpacked[4:14]
-        vel = unpacked[14:24]
-        acc = unpacked[24:34]
+    def from_bytes(cls, bytes_: bytes, offset: int = 0):
+        groupno, sequence, valid_fields, time = _JOINT_TRAJ_PT_FULL_HEAD.unpack_from(
+            bytes_, offset
+        )
+        offset += _JOINT_TRAJ_PT_FULL_HEAD.size
+        pos = _joints_from_bytes(bytes_, offset)
+        vel = _joints_from_bytes(bytes_, offset + _JOINTS_SIZE)
+        acc = _joints_from_bytes(bytes_, offset + 2 * _JOINTS_SIZE)
         return cls(groupno, sequence, valid_fields, time, pos, vel, acc)
 
     def to_bytes(self) -> bytes:
@@ -349,6 +452,8 @@ class JointTrajPtFull:
 
 @dataclass
 class JointFeedback:
+    __slots__ = ("groupno", "valid_fields", "time", "pos", "vel", "acc")
+
     struct_: ClassVar[Struct] = Struct("iif10f10f10f")
     size: ClassVar[int] = struct_.size
 
@@ -360,38 +465,44 @@ class JointFeedback:
     # Timestamp associated with this trajectory point; Units: in seconds
     time: float
     # Feedback joint positions in radian. Base to Tool joint order
-    pos: List[float]
+    pos: array
     # Feedback joint velocities in radian/sec.
-    vel: List[float]
+    vel: array
     # Feedback joint accelerations in radian/sec^2.
-    acc: List[float]
+    acc: array
 
     def __init__(
         self,
         groupno: int,
         valid_fields: Union[int, ValidFields],
         time: float,
-        pos: List[float],
-        vel: List[float],
-        acc: List[float],
+        pos: Sequence[float],
+        vel: Sequence[float],
+        acc: Sequence[float],
     ):
         self.groupno: int = groupno
-        self.valid_fields: ValidFields = ValidFields(valid_fields)
+        self.valid_fields: ValidFields = _lookup(
+            _VALID_FIELDS, ValidFields, valid_fields
+        )
         self.time: float = time
-        self.pos: List[float] = pos
-        self.vel: List[float] = vel
-        self.acc: List[float] = acc
+        self.pos: array = _joints(pos)
+        self.vel: array = _joints(vel)
+        self.acc: array = _joints(acc)
 
     @classmethod
-    def from_bytes(cls, bytes_: bytes):
-        unpacked = cls.struct_.unpack(bytes_[: cls.size])
-        groupno = unpacked[0]
-        valid_fields = unpacked[1]
-        time = unpacked[2]
-        pos = unpacked[3:13]
-        vel = unpacked[13:23]
-        acc = unpacked[23:33]
-        return cls(groupno, valid_fields, time, pos, vel, acc)
+    def from_bytes(cls, bytes_: bytes, offset: int = 0):
+        # Received at the feedback rate of every group, so the fields are set
+        # directly instead of copying the decoded joint values again in __init__
+        feedback = cls.__new__(cls)
+        groupno, valid_fields, time = _JOINT_FEEDBACK_HEAD.unpack_from(bytes_, offset)
+        feedback.groupno = groupno
+        feedback.valid_fields = _lookup(_VALID_FIELDS, ValidFields, valid_fields)
+        feedback.time = time
+        offset += _JOINT_FEEDBACK_HEAD.size
+        feedback.pos = _joints_from_bytes(bytes_, offset)
+        feedback.vel = _joints_from_bytes(bytes_, offset + _JOINTS_SIZE)
+        feedback.acc = _joints_from_bytes(bytes_, offset + 2 * _JOINTS_SIZE)
+        return feedback
 
     def to_bytes(self) -> bytes:
         packed = self.struct_.pack(
@@ -399,9 +510,23 @@ class JointFeedback:
         )
         return packed
 
+    def pack_into(self, buffer: bytearray, offset: int) -> None:
+        self.struct_.pack_into(
+            buffer,
+            offset,
+            self.groupno,
+            self.valid_fields,
+            self.time,
+            *self.pos,
+            *self.vel,
+            *self.acc,
+        )
+
 
 @dataclass
 class MotoMotionCtrl:
+    __slots__ = ("groupno", "sequence", "command", "data")
+
     struct_: ClassVar[Struct] = Struct("3i10f")
     size: ClassVar[int] = struct_.size
 
@@ -412,26 +537,26 @@ class MotoMotionCtrl:
     # Desired command
     command: CommandType
     # Command data - for future use
-    data: List[float]
+    data: array
 
     def __init__(
         self,
         groupno: int,
         sequence: int,
         command: CommandType,
-        data: List[float] = [0.0] * ROS_MAX_JOINT,
+        data: Sequence[float] = (0.0,) * ROS_MAX_JOINT,
     ):
         self.groupno: int = groupno
         self.sequence: int = sequence
-        self.command: CommandType = CommandType(command)
-        self.data: List[float] = data
+        self.command: CommandType = _lookup(_COMMAND_TYPES, CommandType, command)
+        self.data: array = _joints(data)
 
     @classmethod
-    def from_bytes(cls, bytes_: bytes):
-        unpacked = cls.struct_.unpack(bytes_)
+    def from_bytes(cls, bytes_: bytes, offset: int = 0):
+        unpacked = cls.struct_.unpack_from(bytes_, offset)
         groupno = unpacked[0]
         sequence = unpacked[1]
-        command = CommandType(unpacked[2])
+        command = unpacked[2]
         data = unpacked[3:13]
         return cls(groupno, sequence, command, data)
 
@@ -444,6 +569,8 @@ class MotoMotionCtrl:
 
 @dataclass
 class MotoMotionReply:
+    __slots__ = ("groupno", "sequence", "command", "result", "subcode", "data")
+
     struct_: ClassVar[Struct] = Struct("5i10f")
     size = struct_.size
 
@@ -458,7 +585,7 @@ class MotoMotionReply:
     # More detailed result code (optional)
     subcode: SubCode
     # Reply data - for future use
-    data: List[float]
+    data: array
 
     def __init__(
         self,
@@ -467,33 +594,21 @@ class MotoMotionReply:
         command: Union[int, CommandType, MsgType],
         result: Union[int, ResultType],
         subcode: SubCode,
-        data: List[float] = [0.0] * ROS_MAX_JOINT,
+        data: Sequence[float] = (0.0,) * ROS_MAX_JOINT,
     ):
         self.groupno: int = groupno
         self.sequence: int = sequence
-        try:
-            self.command: CommandType = CommandType(command)
-        except Exception:
-            try:
-                self.command: MsgType = MsgType(command)
-            except Exception:
-                self.command: int = command
-        try:
-            self.result: ResultType = ResultType(result)
-        except Exception:
-            self.result = result
-        try:
-            self.subcode: InvalidSubCode = InvalidSubCode(subcode)
-        except Exception:
-            try:
-                self.subcode: NotReadySubcode = NotReadySubcode(subcode)
-            except Exception:
-                self.subcode = subcode
-        self.data: List[float] = data
+        # Unknown commands, results and subcodes are kept as plain integers
+        self.command: Union[CommandType, MsgType, int] = _REPLY_COMMANDS.get(
+            command, command
+        )
+        self.result: ResultType = _RESULT_TYPES.get(result, result)
+        self.subcode: SubCode = _SUB_CODES.get(subcode, subcode)
+        self.data: array = _joints(data)
 
     @classmethod
-    def from_bytes(cls, bytes_: bytes):
-        unpacked = cls.struct_.unpack(bytes_[: cls.size])
+    def from_bytes(cls, bytes_: bytes, offset: int = 0):
+        unpacked = cls.struct_.unpack_from(bytes_, offset)
         groupno = unpacked[0]
         sequence = unpacked[1]
         command = unpacked[2]
@@ -516,6 +631,8 @@ class MotoMotionReply:
 
 @dataclass
 class JointTrajPtExData:
+    __slots__ = ("groupno", "valid_fields", "time", "pos", "vel", "acc")
+
     struct_: ClassVar[Struct] = Struct("iif10f10f10f")
     size: ClassVar[int] = struct_.size
 
@@ -523,35 +640,35 @@ class JointTrajPtExData:
     valid_fields: ValidFields
     time: float  # Timestamp associated with this trajectory point; Units: in seconds
     # Desired joint positions in radian. Base to Tool joint order
-    pos: List[float]
-    vel: List[float]  # Desired joint velocities in radian/sec.
-    acc: List[float]  # Desired joint accelerations in radian/sec^2.
+    pos: array
+    vel: array  # Desired joint velocities in radian/sec.
+    acc: array  # Desired joint accelerations in radian/sec^2.
 
     def __init__(
         self,
         groupno: int,
         valid_fields: Union[int, ValidFields],
         time: float,
-        pos: List[float],
-        vel: List[float],
-        acc: List[float],
+        pos: Sequence[float],
+        vel: Sequence[float],
+        acc: Sequence[float],
     ) -> None:
         self.groupno: int = groupno
-        self.valid_fields: ValidFields = ValidFields(valid_fields)
+        self.valid_fields: ValidFields = _lookup(
+            _VALID_FIELDS, ValidFields, valid_fields
+        )
         self.time: float = time
-        self.pos: List[float] = pos
-        self.vel: List[float] = vel
-        self.acc: List[float] = acc
+        self.pos: array = _joints(pos)
+        self.vel: array = _joints(vel)
+        self.acc: array = _joints(acc)
 
     @classmethod
-    def from_bytes(cls, bytes_: bytes):
-        unpacked = cls.struct_.unpack(bytes_[: cls.size])
-        groupno = unpacked[0]
-        valid_fields = unpacked[1]
-        time = unpacked[2]
-        pos = unpacked[3:13]
-        vel = unpacked[13:23]
-        acc = unpacked[23:33]
+    def from_bytes(cls, bytes_: bytes, offset: int = 0):
+        groupno, valid_fields, time = _JOINT_FEEDBACK_HEAD.unpack_from(bytes_, offset)
+        offset += _JOINT_FEEDBACK_HEAD.size
+        pos = _joints_from_bytes(bytes_, offset)
+        vel = _joints_from_bytes(bytes_, offset + _JOINTS_SIZE)
+        acc = _joints_from_bytes(bytes_, offset + 2 * _JOINTS_SIZE)
         return cls(groupno, valid_fields, time, pos, vel, acc)
 
     def to_bytes(self) -> bytes:
@@ -565,67 +682,103 @@ class JointTrajPtExData:
         )
         return packed
 
+    def pack_into(self, buffer: bytearray, offset: int) -> None:
+        self.struct_.pack_into(
+            buffer,
+            offset,
+            self.groupno,
+            self.valid_fields.value,
+            self.time,
+            *self.pos,
+            *self.vel,
+            *self.acc,
+        )
+
 
 @dataclass
 class JointTrajPtFullEx:
+    __slots__ = ("number_of_valid_groups", "sequence", "joint_traj_pt_data")
+
     number_of_valid_groups: int
     sequence: int
-    joint_traj_pt_data: List[JointTrajPtExData]
+    joint_traj_pt_data: Tuple[JointTrajPtExData, ...]
+
+    def __post_init__(self) -> None:
+        self.joint_traj_pt_data = tuple(self.joint_traj_pt_data)
 
     @property
     def size(self):
         return 8 + JointTrajPtExData.size * self.number_of_valid_groups
 
     @classmethod
-    def from_bytes(cls, bytes_: bytes):
-        number_of_valid_groups, sequence = struct.unpack("ii", bytes_[:8])
-        bytes_ = bytes_[8:]
+    def from_bytes(cls, bytes_: bytes, offset: int = 0):
+        number_of_valid_groups, sequence = _2INT_STRUCT.unpack_from(bytes_, offset)
+        offset += _2INT_STRUCT.size
         joint_traj_pt_data = []
         for _ in range(number_of_valid_groups):
-            joint_traj_pt_data.append(
-                JointTrajPtExData.from_bytes(bytes_[: JointTrajPtExData.size])
-            )
-            bytes_ = bytes_[JointTrajPtExData.size :]
+            joint_traj_pt_data.append(JointTrajPtExData.from_bytes(bytes_, offset))
+            offset += JointTrajPtExData.size
         return cls(number_of_valid_groups, sequence, joint_traj_pt_data)
 
     def to_bytes(self) -> bytes:
-        packed: bytes = struct.pack("ii", self.number_of_valid_groups, self.sequence)
+        packed = bytearray(self.size)
+        self.pack_into(packed, 0)
+        return bytes(packed)
+
+    def pack_into(self, buffer: bytearray, offset: int) -> None:
+        _2INT_STRUCT.pack_into(
+            buffer, offset, self.number_of_valid_groups, self.sequence
+        )
+        offset += _2INT_STRUCT.size
         for pt in self.joint_traj_pt_data:
-            packed += pt.to_bytes()
-        return packed
+            pt.pack_into(buffer, offset)
+            offset += JointTrajPtExData.size
 
 
 @dataclass
 class JointFeedbackEx:
+    __slots__ = ("number_of_valid_groups", "joint_feedback_data")
+
     number_of_valid_groups: int
-    joint_feedback_data: List[JointFeedback]
+    joint_feedback_data: Tuple[JointFeedback, ...]
+
+    def __post_init__(self) -> None:
+        self.joint_feedback_data = tuple(self.joint_feedback_data)
 
     @property
     def size(self):
         return 4 + JointFeedback.size * self.number_of_valid_groups
 
     @classmethod
-    def from_bytes(cls, bytes_: bytes):
-        number_of_valid_groups = struct.unpack("i", bytes_[:4])[0]
-        bytes_ = bytes_[4:]
-        joint_traj_pt_data = []
-        for _ in range(number_of_valid_groups):
-            joint_traj_pt_data.append(
-                JointFeedback.from_bytes(bytes_[: JointFeedback.size])
-            )
-            bytes_ = bytes_[JointFeedback.size :]
-
-        return cls(number_of_valid_groups, joint_traj_pt_data)
+    def from_bytes(cls, bytes_: bytes, offset: int = 0):
+        (number_of_valid_groups,) = _INT_STRUCT.unpack_from(bytes_, offset)
+        offset += _INT_STRUCT.size
+        decode = JointFeedback.from_bytes
+        size = JointFeedback.size
+        feedback_ex = cls.__new__(cls)
+        feedback_ex.number_of_valid_groups = number_of_valid_groups
+        feedback_ex.joint_feedback_data = tuple(
+            [decode(bytes_, offset + k * size) for k in range(number_of_valid_groups)]
+        )
+        return feedback_ex
 
     def to_bytes(self) -> bytes:
-        packed: bytes = struct.pack("i", self.number_of_valid_groups)
+        packed = bytearray(self.size)
+        self.pack_into(packed, 0)
+        return bytes(packed)
+
+    def pack_into(self, buffer: bytearray, offset: int) -> None:
+        _INT_STRUCT.pack_into(buffer, offset, self.number_of_valid_groups)
+        offset += _INT_STRUCT.size
         for pt in self.joint_feedback_data:
-            packed += pt.to_bytes()
-        return packed
+            pt.pack_into(buffer, offset)
+            offset += JointFeedback.size
 
 
 @dataclass
 class SelectTool:
+    __slots__ = ("groupno", "tool", "sequence")
+
     struct_: ClassVar[Struct] = Struct("iii")
     size = struct_.size
 
@@ -634,8 +787,8 @@ class SelectTool:
     sequence: int
 
     @classmethod
-    def from_bytes(cls, bytes_: bytes):
-        return cls(*cls.struct_.unpack(bytes_[:, cls.size]))
+    def from_bytes(cls, bytes_: bytes, offset: int = 0):
+        return cls(*cls.struct_.unpack_from(bytes_, offset))
 
     def to_bytes(self) -> bytes:
         return self.struct_.pack(self.groupno, self.tool, self.sequence)
@@ -657,13 +810,15 @@ class IoResultCodes(IntEnum):
 
 @dataclass
 class MotoReadIO:
+    __slots__ = ("address",)
+
     struct_: ClassVar[Struct] = Struct("I")
     size = struct_.size
     address: int
 
     @classmethod
-    def from_bytes(cls, bytes_: bytes):
-        unpacked = cls.struct_.unpack(bytes_[: cls.size])
+    def from_bytes(cls, bytes_: bytes, offset: int = 0):
+        unpacked = cls.struct_.unpack_from(bytes_, offset)
         address = unpacked[0]
         return cls(address)
 
@@ -673,6 +828,8 @@ class MotoReadIO:
 
 @dataclass
 class MotoReadIOReply:
+    __slots__ = ("value", "result_code")
+
     struct_: ClassVar[Struct] = Struct("II")
     size = struct_.size
     value: int
@@ -686,8 +843,8 @@ class MotoReadIOReply:
             self.result_code: int = result_code
 
     @classmethod
-    def from_bytes(cls, bytes_: bytes):
-        unpacked = cls.struct_.unpack(bytes_[: cls.size])
+    def from_bytes(cls, bytes_: bytes, offset: int = 0):
+        unpacked = cls.struct_.unpack_from(bytes_, offset)
         value = unpacked[0]
         result_code = unpacked[1]
         return cls(value, result_code)
@@ -698,14 +855,16 @@ class MotoReadIOReply:
 
 @dataclass
 class MotoWriteIO:
+    __slots__ = ("address", "value")
+
     struct_: ClassVar[Struct] = Struct("II")
     size = struct_.size
     address: int
     value: int
 
     @classmethod
-    def from_bytes(cls, bytes_: bytes):
-        unpacked = cls.struct_.unpack(bytes_[: cls.size])
+    def from_bytes(cls, bytes_: bytes, offset: int = 0):
+        unpacked = cls.struct_.unpack_from(bytes_, offset)
         address = unpacked[0]
         value = unpacked[1]
         return cls(address, value)
@@ -716,6 +875,8 @@ class MotoWriteIO:
 
 @dataclass
 class MotoWriteIOReply:
+    __slots__ = ("result_code",)
+
     struct_: ClassVar[Struct] = Struct("I")
     size = struct_.size
     result_code: int
@@ -727,8 +888,8 @@ class MotoWriteIOReply:
             self.result_code: int = result_code
 
     @classmethod
-    def from_bytes(cls, bytes_: bytes):
-        unpacked = cls.struct_.unpack(bytes_[: cls.size])
+    def from_bytes(cls, bytes_: bytes, offset: int = 0):
+        unpacked = cls.struct_.unpack_from(bytes_, offset)
         result_code = unpacked[0]
         return cls(result_code)
 
@@ -738,6 +899,8 @@ class MotoWriteIOReply:
 
 @dataclass
 class MotoIoCtrlReply:
+    __slots__ = ("result", "subcode")
+
     struct_: ClassVar[Struct] = Struct("Ii")
     size = struct_.size
 
@@ -747,8 +910,8 @@ class MotoIoCtrlReply:
     subcode: SubCode
 
     @classmethod
-    def from_bytes(cls, bytes_: bytes):
-        unpacked = cls.struct_.unpack(bytes_[: cls.size])
+    def from_bytes(cls, bytes_: bytes, offset: int = 0):
+        unpacked = cls.struct_.unpack_from(bytes_, offset)
         result = unpacked[0]
         subcode = unpacked[1]
         return cls(result, subcode)
@@ -759,6 +922,8 @@ class MotoIoCtrlReply:
 
 @dataclass
 class DhLink:
+    __slots__ = ("theta", "d", "a", "alpha")
+
     struct_: ClassVar[Struct] = Struct("4f")
     size = struct_.size
 
@@ -768,55 +933,74 @@ class DhLink:
     alpha: float
 
     @classmethod
-    def from_bytes(cls, bytes_: bytes):
-        return cls(*cls.struct_.unpack(bytes_[: cls.size]))
+    def from_bytes(cls, bytes_: bytes, offset: int = 0):
+        return cls(*cls.struct_.unpack_from(bytes_, offset))
 
     def to_bytes(self) -> bytes:
         return self.struct_.pack(self.theta, self.d, self.a, self.alpha)
 
+    def pack_into(self, buffer: bytearray, offset: int) -> None:
+        self.struct_.pack_into(buffer, offset, self.theta, self.d, self.a, self.alpha)
+
 
 @dataclass
 class DhParameters:
+    __slots__ = ("link",)
+
     struct_: ClassVar[Struct] = Struct("32f")
     size = struct_.size
 
-    link: List[DhLink]
+    link: Tuple[DhLink, ...]
+
+    def __post_init__(self) -> None:
+        self.link = tuple(self.link)
 
     @classmethod
-    def from_bytes(cls, bytes_: bytes):
+    def from_bytes(cls, bytes_: bytes, offset: int = 0):
         link = []
         for _ in range(8):
-            link.append(DhLink.from_bytes(bytes_))
-            bytes_ = bytes_[DhLink.size :]
+            link.append(DhLink.from_bytes(bytes_, offset))
+            offset += DhLink.size
         return cls(link)
 
     def to_bytes(self) -> bytes:
-        bytes_: bytes = b""
+        bytes_ = bytearray(self.size)
+        self.pack_into(bytes_, 0)
+        return bytes(bytes_)
+
+    def pack_into(self, buffer: bytearray, offset: int) -> None:
         for link in self.link:
-            bytes_ += link.to_bytes()
-        return bytes_
+            link.pack_into(buffer, offset)
+            offset += DhLink.size
 
 
 @dataclass
 class MotoGetDhParameters:
+    __slots__ = ("dh_parameters",)
+
     struct_: ClassVar[Struct] = Struct("128f")
     size = struct_.size
 
-    dh_parameters: List[DhParameters]
+    dh_parameters: Tuple[DhParameters, ...]
+
+    def __post_init__(self) -> None:
+        self.dh_parameters = tuple(self.dh_parameters)
 
     @classmethod
-    def from_bytes(cls, bytes_: bytes):
+    def from_bytes(cls, bytes_: bytes, offset: int = 0):
         dh_parameters = []
         for _ in range(MOT_MAX_GR):
-            dh_parameters.append(DhParameters.from_bytes(bytes_))
-            bytes_ = bytes_[DhParameters.size :]
+            dh_parameters.append(DhParameters.from_bytes(bytes_, offset))
+            offset += DhParameters.size
         return cls(dh_parameters)
 
     def to_bytes(self) -> bytes:
-        bytes_: bytes = b""
+        bytes_ = bytearray(self.size)
+        offset = 0
         for dh_parameters in self.dh_parameters:
-            bytes_ += dh_parameters.to_bytes()
-        return bytes_
+            dh_parameters.pack_into(bytes_, offset)
+            offset += DhParameters.size
+        return bytes(bytes_)
 
 
 class MotoRealTimeMotionMode(Enum):
@@ -825,46 +1009,59 @@ class MotoRealTimeMotionMode(Enum):
     JOINT_VELOCITY = 2
 
 
+_REAL_TIME_MOTION_MODES = _enum_lookup(MotoRealTimeMotionMode)
+
+
 @dataclass
 class MotoRealTimeMotionJointStateExData:
+    __slots__ = ("groupno", "pos", "vel")
+
     struct_: ClassVar[Struct] = Struct("i10f10f")
     size: ClassVar[int] = struct_.size
 
     # Robot/group ID;  0 = 1st robot
     groupno: int
     # Feedback joint positions in radian. Base to Tool joint order
-    pos: List[float]
+    pos: array
     # Feedback joint velocities in radian/sec.
-    vel: List[float]
+    vel: array
 
-    def __init__(self, groupno: int, pos: List[float], vel: List[float]) -> None:
+    def __init__(
+        self, groupno: int, pos: Sequence[float], vel: Sequence[float]
+    ) -> None:
         self.groupno = groupno
-        num_joints = len(pos)
-        assert num_joints == len(vel)
-        padding = [0.0] * (ROS_MAX_JOINT - num_joints)
-        self.pos = pos + padding
-        self.vel = vel + padding
+        assert len(pos) == len(vel)
+        self.pos: array = _joints(pos)
+        self.vel: array = _joints(vel)
 
     @classmethod
-    def from_bytes(cls, bytes_: bytes):
-        unpacked = cls.struct_.unpack(bytes_[: cls.size])
-        groupno = unpacked[0]
-        pos = list(unpacked[1:11])
-        vel = list(unpacked[11:21])
+    def from_bytes(cls, bytes_: bytes, offset: int = 0):
+        (groupno,) = _INT_STRUCT.unpack_from(bytes_, offset)
+        offset += _INT_STRUCT.size
+        pos = _joints_from_bytes(bytes_, offset)
+        vel = _joints_from_bytes(bytes_, offset + _JOINTS_SIZE)
         return cls(groupno, pos, vel)
 
     def to_bytes(self) -> bytes:
         return self.struct_.pack(self.groupno, *self.pos, *self.vel)
 
+    def pack_into(self, buffer: bytearray, offset: int) -> None:
+        self.struct_.pack_into(buffer, offset, self.groupno, *self.pos, *self.vel)
+
 
 @dataclass
 class MotoRealTimeMotionJointStateEx:
+    __slots__ = ("message_id", "mode", "number_of_valid_groups", "joint_state_data")
+
     # Message id that the external controller must echo back in the command
     message_id: int
     # Control mode (idle, joint position, or joint velocity)
     mode: MotoRealTimeMotionMode
     number_of_valid_groups: int  # Max 4 groups
-    joint_state_data: List[MotoRealTimeMotionJointStateExData]
+    joint_state_data: Tuple[MotoRealTimeMotionJointStateExData, ...]
+
+    def __post_init__(self) -> None:
+        self.joint_state_data = tuple(self.joint_state_data)
 
     @property
     def size(self):
@@ -873,66 +1070,84 @@ class MotoRealTimeMotionJointStateEx:
         )
 
     @classmethod
-    def from_bytes(cls, bytes_: bytes):
-        message_id, mode, number_of_valid_groups = struct.unpack("3i", bytes_[:12])
-        bytes_ = bytes_[12:]
+    def from_bytes(cls, bytes_: bytes, offset: int = 0):
+        message_id, mode, number_of_valid_groups = _3INT_STRUCT.unpack_from(
+            bytes_, offset
+        )
+        offset += _3INT_STRUCT.size
         joint_state_data = []
         for _ in range(number_of_valid_groups):
             joint_state_data.append(
-                MotoRealTimeMotionJointStateExData.from_bytes(
-                    bytes_[: MotoRealTimeMotionJointStateExData.size]
-                )
+                MotoRealTimeMotionJointStateExData.from_bytes(bytes_, offset)
             )
-            bytes_ = bytes_[MotoRealTimeMotionJointStateExData.size :]
+            offset += MotoRealTimeMotionJointStateExData.size
 
         return cls(
             message_id,
-            MotoRealTimeMotionMode(mode),
+            _lookup(_REAL_TIME_MOTION_MODES, MotoRealTimeMotionMode, mode),
             number_of_valid_groups,
             joint_state_data,
         )
 
     def to_bytes(self) -> bytes:
-        packed: bytes = struct.pack(
-            "3i", self.message_id, self.mode.value, self.number_of_valid_groups
+        packed = bytearray(self.size)
+        self.pack_into(packed, 0)
+        return bytes(packed)
+
+    def pack_into(self, buffer: bytearray, offset: int) -> None:
+        _3INT_STRUCT.pack_into(
+            buffer,
+            offset,
+            self.message_id,
+            self.mode.value,
+            self.number_of_valid_groups,
         )
+        offset += _3INT_STRUCT.size
         for group_joint_state_data in self.joint_state_data:
-            packed += group_joint_state_data.to_bytes()
-        return packed
+            group_joint_state_data.pack_into(buffer, offset)
+            offset += MotoRealTimeMotionJointStateExData.size
 
 
 @dataclass
 class MotoRealTimeMotionJointCommandExData:
+    __slots__ = ("groupno", "command")
+
     struct_: ClassVar[Struct] = Struct("i10f")
     size: ClassVar[int] = struct_.size
 
     # Robot/group ID;  0 = 1st robot
     groupno: int
     # Commanded joint positions or velocities. Depends on control mode.
-    command: List[float]
+    command: array
 
-    def __init__(self, groupno: int, command: List[float]) -> None:
+    def __init__(self, groupno: int, command: Sequence[float]) -> None:
         self.groupno = groupno
-        padding = [0.0] * (ROS_MAX_JOINT - len(command))
-        self.command = list(command) + padding
+        self.command: array = _joints(command)
 
     @classmethod
-    def from_bytes(cls, bytes_: bytes):
-        unpacked = cls.struct_.unpack(bytes_[: cls.size])
-        groupno = unpacked[0]
-        command = unpacked[1:]
+    def from_bytes(cls, bytes_: bytes, offset: int = 0):
+        (groupno,) = _INT_STRUCT.unpack_from(bytes_, offset)
+        command = _joints_from_bytes(bytes_, offset + _INT_STRUCT.size)
         return cls(groupno, command)
 
     def to_bytes(self) -> bytes:
         return self.struct_.pack(self.groupno, *self.command)
 
+    def pack_into(self, buffer: bytearray, offset: int) -> None:
+        self.struct_.pack_into(buffer, offset, self.groupno, *self.command)
+
 
 @dataclass
 class MotoRealTimeMotionJointCommandEx:
+    __slots__ = ("message_id", "number_of_valid_groups", "joint_command_data")
+
     # Message id from the state message that the external controller must echo back in the command
     message_id: int
     number_of_valid_groups: int
-    joint_command_data: List[MotoRealTimeMotionJointCommandExData]
+    joint_command_data: Tuple[MotoRealTimeMotionJointCommandExData, ...]
+
+    def __post_init__(self) -> None:
+        self.joint_command_data = tuple(self.joint_command_data)
 
     @property
     def size(self):
@@ -941,25 +1156,31 @@ class MotoRealTimeMotionJointCommandEx:
         )
 
     @classmethod
-    def from_bytes(cls, bytes_: bytes):
-        message_id, number_of_valid_groups = struct.unpack("2i", bytes_[:8])
-        bytes_ = bytes_[8:]
+    def from_bytes(cls, bytes_: bytes, offset: int = 0):
+        message_id, number_of_valid_groups = _2INT_STRUCT.unpack_from(bytes_, offset)
+        offset += _2INT_STRUCT.size
         joint_command_data = []
         for _ in range(number_of_valid_groups):
             joint_command_data.append(
-                MotoRealTimeMotionJointCommandExData.from_bytes(
-                    bytes_[: MotoRealTimeMotionJointCommandExData.size]
-                )
+                MotoRealTimeMotionJointCommandExData.from_bytes(bytes_, offset)
             )
-            bytes_ = bytes_[MotoRealTimeMotionJointCommandExData.size :]
+            offset += MotoRealTimeMotionJointCommandExData.size
 
         return cls(message_id, number_of_valid_groups, joint_command_data,)
 
     def to_bytes(self) -> bytes:
-        packed: bytes = struct.pack("2i", self.message_id, self.number_of_valid_groups)
+        packed = bytearray(self.size)
+        self.pack_into(packed, 0)
+        return bytes(packed)
+
+    def pack_into(self, buffer: bytearray, offset: int) -> None:
+        _2INT_STRUCT.pack_into(
+            buffer, offset, self.message_id, self.number_of_valid_groups
+        )
+        offset += _2INT_STRUCT.size
         for group_joint_command_data in self.joint_command_data:
-            packed += group_joint_command_data.to_bytes()
-        return packed
+            group_joint_command_data.pack_into(buffer, offset)
+            offset += MotoRealTimeMotionJointCommandExData.size
 
 
 SimpleMessageBody = Union[
@@ -1006,28 +1227,39 @@ MSG_TYPE_CLS = {
     MsgType.MOTO_REALTIME_MOTION_JOINT_COMMAND_EX: MotoRealTimeMotionJointCommandEx,
 }
 
+# Body decoders keyed by the integer message type, as found on the wire
+_BODY_DECODERS = {
+    msg_type.value: cls.from_bytes for msg_type, cls in MSG_TYPE_CLS.items()
+}
+
 
 @dataclass
 class SimpleMessage:
+    __slots__ = ("header", "body")
+
     header: Header
     body: SimpleMessageBody
 
     @classmethod
     def from_bytes(cls, bytes_: bytes):
-        header = Header.from_bytes(bytes_[4:16])
-        if header.msg_type is Invalid:
-            body = MSG_TYPE_CLS[header.msg_type].from_bytes(bytes_)
-        else:
-            body = MSG_TYPE_CLS[header.msg_type].from_bytes(bytes_[16:])
+        header = Header(*Header.struct_.unpack_from(bytes_, Prefix.size))
+        body = _BODY_DECODERS[header.msg_type.value](
+            bytes_, Prefix.size + Header.size
+        )
         return SimpleMessage(header, body)
 
     def to_bytes(self) -> bytes:
         if self.body is not None:
-            return (
-                Prefix(self.header.size + self.body.size).to_bytes()
-                + self.header.to_bytes()
-                + self.body.to_bytes()
-            )
+            body = self.body.to_bytes()
         else:
-            return Prefix(self.header.size).to_bytes() + self.header.to_bytes()
+            body = b""
+        return (
+            _PREFIX_HEADER_STRUCT.pack(
+                Header.size + len(body),
+                self.header.msg_type.value,
+                self.header.comm_type.value,
+                self.header.reply_type.value,
+            )
+            + body
+        )
 
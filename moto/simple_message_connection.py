@@ -12,10 +12,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Tuple
+from typing import Iterator, Optional, Tuple, Union
 import socket
+import time
 
-from moto.simple_message import SimpleMessage
+from moto.capture import CaptureWriter, Direction
+from moto.simple_message import Header, Prefix, SimpleMessage, SimpleMessageError
 
 
 Address = Tuple[str, int]
@@ -59,19 +61,150 @@ class TcpClient:
     def recv(self, bufsize: int = 1024) -> bytes:
         return self._socket.recv(bufsize)
 
+    def recv_into(self, buffer: memoryview) -> int:
+        return self._socket.recv_into(buffer)
+
+    def close(self) -> None:
+        try:
+            # Wakes up a thread blocked in recv
+            self._socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._socket.close()
+
+
+class MessageFramer:
+    """Splits a byte stream into complete, length-prefixed Simple Messages.
+
+    Data is received directly into a preallocated buffer: `writable` returns
+    the free part of the buffer and `commit` marks the number of bytes written
+    to it. `next_frame` and `frames` then return memoryviews of the complete
+    messages (prefix included) without copying. A frame is only valid until the
+    next call to `writable`, which reuses the buffer space of consumed frames.
+    """
+
+    def __init__(self, capacity: int = 65536) -> None:
+        self._buffer: bytearray = bytearray(capacity)
+        self._view: memoryview = memoryview(self._buffer)
+        # Start of the first unconsumed byte and end of the received data
+        self._start: int = 0
+        self._end: int = 0
+
+    @property
+    def pending(self) -> int:
+        return self._end - self._start
+
+    def writable(self) -> memoryview:
+        pending = self._end - self._start
+        if self._start > 0:
+            # Move the partial message (if any) to the front of the buffer
+            if pending > 0:
+                self._view[:pending] = self._view[self._start : self._end]
+            self._start = 0
+            self._end = pending
+        return self._view[self._end :]
+
+    def commit(self, nbytes: int) -> None:
+        self._end += nbytes
+
+    def feed(self, data: bytes) -> None:
+        nbytes = len(data)
+        self._reserve(self.pending + nbytes)
+        self.writable()[:nbytes] = data
+        self.commit(nbytes)
+
+    def next_frame(self) -> Optional[memoryview]:
+        available = self._end - self._start
+        if available < Prefix.size:
+            return None
+        (length,) = Prefix.struct_.unpack_from(self._buffer, self._start)
+        if length < Header.size:
+            raise SimpleMessageError(f"Invalid message length: {length}")
+        frame_size = Prefix.size + length
+        if available < frame_size:
+            self._reserve(frame_size)
+            return None
+        start = self._start
+        self._start += frame_size
+        return self._view[start : self._start]
+
+    def frames(self) -> Iterator[memoryview]:
+        frame = self.next_frame()
+        while frame is not None:
+            yield frame
+            frame = self.next_frame()
+
+    def _reserve(self, size: int) -> None:
+        if size <= len(self._buffer):
+            return
+        # Grow the buffer to fit a message larger than the current capacity.
+        # Frames handed out earlier keep referencing the old buffer.
+        pending = self._end - self._start
+        buffer = bytearray(max(size, 2 * len(self._buffer)))
+        buffer[:pending] = self._view[self._start : self._end]
+        self._buffer = buffer
+        self._view = memoryview(buffer)
+        self._start = 0
+        self._end = pending
+
 
 class SimpleMessageConnection:
-    def __init__(self, addr: Address) -> None:
+    def __init__(self, addr: Address, recorder: Optional[CaptureWriter] = None) -> None:
+        self._port: int = addr[1]
         self._tcp_client = TcpClient(addr)
+        self._framer: MessageFramer = MessageFramer()
+        self._recorder: Optional[CaptureWriter] = recorder
+        self._arrival_ns: int = 0
+
+    @property
+    def arrival_ns(self) -> int:
+        """time.perf_counter_ns() when the last received frame arrived.
+
+        The time is taken once per read from the socket, so all frames
+        received in one read share it, however long it takes to process them.
+        """
+        return self._arrival_ns
+
+    def set_recorder(self, recorder: Optional[CaptureWriter]) -> None:
+        """Record all sent and received messages, or stop recording if None."""
+        self._recorder = recorder
 
     def start(self) -> None:
         self._tcp_client.connect()
 
+    def close(self) -> None:
+        self._tcp_client.close()
+
     def send(self, msg: SimpleMessage) -> None:
-        self._tcp_client.send(msg.to_bytes())
+        self.send_frame(msg.to_bytes())
+
+    def send_frame(self, frame: Union[bytes, memoryview]) -> None:
+        """Send a complete, already encoded message, prefix included."""
+        self._tcp_client.send(frame)
+        if self._recorder is not None:
+            self._recorder.record(Direction.SEND, self._port, frame)
 
     def recv(self) -> SimpleMessage:
-        return SimpleMessage.from_bytes(self._tcp_client.recv())
+        return SimpleMessage.from_bytes(self.recv_frame())
+
+    def recv_frame(self) -> memoryview:
+        """Receive the next complete message as a memoryview of its raw bytes.
+
+        The view is only valid until the next call to `recv` or `recv_frame`.
+        """
+        frame = self._framer.next_frame()
+        while frame is None:
+            nbytes = self._tcp_client.recv_into(self._framer.writable())
+            self._arrival_ns = time.perf_counter_ns()
+            if nbytes == 0:
+                raise ConnectionError("Connection closed by the robot controller")
+            self._framer.commit(nbytes)
+            frame = self._framer.next_frame()
+        if self._recorder is not None:
+            self._recorder.record(
+                Direction.RECV, self._port, frame, self._arrival_ns * 1e-9
+            )
+        return frame
 
     def send_and_recv(self, msg: SimpleMessage) -> SimpleMessage:
         self.send(msg)
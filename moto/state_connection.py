@@ -12,22 +12,80 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import List, Callable
-from copy import deepcopy
-from threading import Thread, Lock, Event
+from typing import (
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TYPE_CHECKING,
+    Union,
+)
+from operator import attrgetter
+from threading import Thread, Event, Lock
+
+import time
 
 from moto.simple_message_connection import SimpleMessageConnection
+from moto.robot_status_change import (
+    RobotStatusChange,
+    RobotStatusField,
+    diff_robot_status,
+)
+from moto.statistics import MessageStatistics, Statistics
+from moto.subscription import BackpressurePolicy, SampleFilter, Subscriber
 from moto.simple_message import (
     JointFeedback,
     JointFeedbackEx,
     MsgType,
     RobotStatus,
     SimpleMessage,
+    Ternary,
     MOT_MAX_GR,
 )
 
+if TYPE_CHECKING:
+    # Require NumPy, so only imported when the features using them are enabled
+    from moto.estimation import AlphaBetaGammaEstimator, JointStateEstimate
+    from moto.joint_feedback_history import JointFeedbackHistory
+    from moto.shared_state import SharedStatePublisher
+
+
+class _Waiter:
+    __slots__ = ("predicate", "event", "exception")
+
+    def __init__(self, predicate: Callable[[], bool]) -> None:
+        self.predicate: Callable[[], bool] = predicate
+        self.event: Event = Event()
+        self.exception: Optional[Exception] = None
+
+    def check(self) -> None:
+        if self.event.is_set():
+            return
+        try:
+            if self.predicate():
+                self.event.set()
+        except Exception as e:
+            # Raised in the waiting thread instead of the receive thread
+            self.exception = e
+            self.event.set()
+
+
+def _joint_feedback_ex_positions(msg: JointFeedbackEx) -> List[float]:
+    return [pos for data in msg.joint_feedback_data for pos in data.pos]
+
 
 class StateConnection(SimpleMessageConnection):
+    """Receives the state messages published by the robot controller.
+
+    Every received message is decoded into new objects, so the latest messages
+    are published by swapping a reference and the getters and callbacks share
+    the instances without copying or locking. The messages are snapshots that
+    must be treated as read-only; copy them before modifying.
+    """
 
     TCP_PORT_STATE = 50241
 
@@ -42,31 +100,271 @@ class StateConnection(SimpleMessageConnection):
         self._robot_status: RobotStatus = None
         self._initial_response: Event = Event()
         self._stop: Event = Event()
-        self._lock: Lock = Lock()
 
-        self._joint_feedback_callbacks: List[Callable] = []
-        self._joint_feedback_ex_callbacks: List[Callable] = []
+        # Predicates of the threads blocked in wait_for. Replaced, not
+        # modified, so the worker can iterate them without a lock.
+        self._waiters: List[_Waiter] = []
+        self._waiters_lock: Lock = Lock()
+
+        self._histories: List[Optional["JointFeedbackHistory"]] = [None] * MOT_MAX_GR
+        self._shared_state: Optional["SharedStatePublisher"] = None
+        self._estimator: Optional["AlphaBetaGammaEstimator"] = None
+
+        # Replaced, not modified, when subscribers are added or removed, so the
+        # worker can iterate them without a lock. Replaced under the lock.
+        self._subscribers_lock: Lock = Lock()
+        self._joint_feedback_subscribers: List[Subscriber] = []
+        self._joint_feedback_ex_subscribers: List[Subscriber] = []
+        # Subscribers and the fields they subscribe to, None for all fields
+        self._robot_status_change_subscribers: List[
+            Tuple[Optional[FrozenSet[RobotStatusField]], Subscriber]
+        ] = []
+
+        self._statistics: Statistics = Statistics()
 
         self._worker_thread: Thread = Thread(target=self._worker)
         self._worker_thread.daemon = True
 
     def joint_feedback(self, groupno: int) -> JointFeedback:
-        with self._lock:
-            return deepcopy(self._joint_feedback[groupno])
+        return self._joint_feedback[groupno]
 
     def joint_feedback_ex(self) -> JointFeedbackEx:
-        with self._lock:
-            return deepcopy(self._joint_feedback_ex)
+        return self._joint_feedback_ex
 
     def robot_status(self) -> RobotStatus:
-        with self._lock:
-            return deepcopy(self._robot_status)
+        return self._robot_status
+
+    def stats(self) -> Dict[MsgType, MessageStatistics]:
+        """Snapshot of the statistics of the received messages per type."""
+        return self._statistics.snapshot()
+
+    def reset_stats(self) -> None:
+        self._statistics.reset()
+
+    def wait_for(
+        self, predicate: Callable[[], bool], timeout: Optional[float] = None
+    ) -> bool:
+        """Wait until `predicate()` is true. Returns False on timeout.
+
+        The predicate is evaluated once by the calling thread, and then by the
+        receive thread after every state message until it is true. The waiter
+        is woken by the exact message that satisfied the predicate, so it must
+        be cheap and must not block.
+        """
+        if predicate():
+            return True
+        waiter = _Waiter(predicate)
+        with self._waiters_lock:
+            self._waiters = self._waiters + [waiter]
+        try:
+            # A message may have arrived before the waiter was registered
+            if predicate():
+                return True
+            if not waiter.event.wait(timeout):
+                return False
+            if waiter.exception is not None:
+                raise waiter.exception
+            return True
+        finally:
+            with self._waiters_lock:
+                self._waiters = [w for w in self._waiters if w is not waiter]
+
+    def wait_until_position(
+        self,
+        groupno: int,
+        target: Sequence[float],
+        tol: float = 1e-3,
+        timeout: Optional[float] = None,
+    ) -> bool:
+        """Wait until all joints of a group are within `tol` of `target`."""
+
+        def at_target() -> bool:
+            feedback = self._joint_feedback[groupno]
+            return feedback is not None and all(
+                abs(pos - target_pos) <= tol
+                for pos, target_pos in zip(feedback.pos, target)
+            )
+
+        return self.wait_for(at_target, timeout)
+
+    def wait_until_stopped(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the robot status reports that the robot is not moving."""
+        return self.wait_for(
+            lambda: self._robot_status is not None
+            and self._robot_status.in_motion is Ternary.FALSE,
+            timeout,
+        )
+
+    def wait_until_motion_possible(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the drives are powered and motion is possible."""
+        return self.wait_for(
+            lambda: self._robot_status is not None
+            and self._robot_status.drives_powered is Ternary.TRUE
+            and self._robot_status.motion_possible is Ternary.TRUE,
+            timeout,
+        )
+
+    def enable_history(self, groupno: int, capacity: int) -> "JointFeedbackHistory":
+        """Keep the last `capacity` JOINT_FEEDBACK samples of a group.
+
+        Requires NumPy. See `moto.joint_feedback_history`.
+        """
+        from moto.joint_feedback_history import JointFeedbackHistory
+
+        history = JointFeedbackHistory(capacity)
+        self._histories[groupno] = history
+        return history
+
+    def disable_history(self, groupno: int) -> None:
+        self._histories[groupno] = None
+
+    def history(self, groupno: int) -> Optional["JointFeedbackHistory"]:
+        return self._histories[groupno]
 
-    def add_joint_feedback_msg_callback(self, callback: Callable):
-        self._joint_feedback_callbacks.append(callback)
+    def enable_estimation(
+        self, estimator: Optional["AlphaBetaGammaEstimator"] = None
+    ) -> "AlphaBetaGammaEstimator":
+        """Estimate the velocity and acceleration of all groups from positions.
 
-    def add_joint_feedback_ex_msg_callback(self, callback: Callable):
-        self._joint_feedback_ex_callbacks.append(callback)
+        Requires NumPy. Uses a default AlphaBetaGammaEstimator if `estimator`
+        is None. See `moto.estimation`.
+        """
+        if estimator is None:
+            from moto.estimation import AlphaBetaGammaEstimator
+
+            estimator = AlphaBetaGammaEstimator()
+        self._estimator = estimator
+        return estimator
+
+    def disable_estimation(self) -> None:
+        self._estimator = None
+
+    def estimate(self, groupno: int) -> Optional["JointStateEstimate"]:
+        """The latest estimate of a group, None if estimation is disabled."""
+        estimator = self._estimator
+        return None if estimator is None else estimator.estimate(groupno)
+
+    def enable_shared_state(self, name: Optional[str] = None) -> "SharedStatePublisher":
+        """Publish the latest state in shared memory for other processes.
+
+        Requires NumPy. See `moto.shared_state`.
+        """
+        from moto.shared_state import SharedStatePublisher
+
+        self.disable_shared_state()
+        publisher = SharedStatePublisher(name)
+        if self._robot_status is not None:
+            publisher.write_robot_status(self._robot_status)
+        for feedback in self._joint_feedback:
+            if feedback is not None:
+                publisher.write_joint_feedback(feedback)
+        self._shared_state = publisher
+        return publisher
+
+    def disable_shared_state(self) -> None:
+        """Stop publishing and remove the shared memory block."""
+        publisher = self._shared_state
+        if publisher is not None:
+            self._shared_state = None
+            publisher.close()
+
+    def shared_state(self) -> Optional["SharedStatePublisher"]:
+        return self._shared_state
+
+    def add_joint_feedback_msg_callback(
+        self,
+        callback: Callable,
+        policy: BackpressurePolicy = BackpressurePolicy.BLOCK,
+        maxsize: int = 1024,
+        max_rate: Optional[float] = None,
+        every_nth: Optional[int] = None,
+        deadband: Optional[Union[float, Sequence[float]]] = None,
+    ) -> Subscriber:
+        """Call `callback` with every JointFeedback from a worker thread.
+
+        The COALESCE policy keeps the latest feedback per group. `max_rate`,
+        `every_nth` and `deadband` select the feedback per group on the
+        receive thread, before it is queued; see SampleFilter.
+        """
+        group = attrgetter("groupno")
+        sample_filter = None
+        if max_rate is not None or every_nth is not None or deadband is not None:
+            sample_filter = SampleFilter(
+                max_rate, every_nth, deadband, key=group, positions=attrgetter("pos")
+            )
+        subscriber = Subscriber(
+            callback, policy, maxsize, coalesce_key=group, sample_filter=sample_filter
+        )
+        with self._subscribers_lock:
+            self._joint_feedback_subscribers = self._joint_feedback_subscribers + [
+                subscriber
+            ]
+        return subscriber
+
+    def add_joint_feedback_ex_msg_callback(
+        self,
+        callback: Callable,
+        policy: BackpressurePolicy = BackpressurePolicy.BLOCK,
+        maxsize: int = 1024,
+        max_rate: Optional[float] = None,
+        every_nth: Optional[int] = None,
+        deadband: Optional[Union[float, Sequence[float]]] = None,
+    ) -> Subscriber:
+        """Call `callback` with every JointFeedbackEx from a worker thread.
+
+        A per joint `deadband` applies to the joints of all groups in order,
+        ROS_MAX_JOINT per group.
+        """
+        sample_filter = None
+        if max_rate is not None or every_nth is not None or deadband is not None:
+            sample_filter = SampleFilter(
+                max_rate, every_nth, deadband, positions=_joint_feedback_ex_positions
+            )
+        subscriber = Subscriber(callback, policy, maxsize, sample_filter=sample_filter)
+        with self._subscribers_lock:
+            self._joint_feedback_ex_subscribers = (
+                self._joint_feedback_ex_subscribers + [subscriber]
+            )
+        return subscriber
+
+    def add_robot_status_change_callback(
+        self,
+        callback: Callable[[RobotStatusChange], None],
+        fields: Optional[Iterable[RobotStatusField]] = None,
+        policy: BackpressurePolicy = BackpressurePolicy.BLOCK,
+        maxsize: int = 1024,
+    ) -> Subscriber:
+        """Call `callback` with a RobotStatusChange for every changed field.
+
+        Every received RobotStatus is compared with the previous one, and one
+        event is emitted per changed field of `fields` (all fields if None).
+        The COALESCE policy keeps the latest change per field.
+        """
+        subscriber = Subscriber(
+            callback, policy, maxsize, coalesce_key=attrgetter("field")
+        )
+        subscribed = None if fields is None else frozenset(fields)
+        with self._subscribers_lock:
+            self._robot_status_change_subscribers = (
+                self._robot_status_change_subscribers + [(subscribed, subscriber)]
+            )
+        return subscriber
+
+    def remove_callback(self, subscriber: Subscriber) -> None:
+        with self._subscribers_lock:
+            self._joint_feedback_subscribers = [
+                s for s in self._joint_feedback_subscribers if s is not subscriber
+            ]
+            self._joint_feedback_ex_subscribers = [
+                s for s in self._joint_feedback_ex_subscribers if s is not subscriber
+            ]
+            self._robot_status_change_subscribers = [
+                (fields, s)
+                for fields, s in self._robot_status_change_subscribers
+                if s is not subscriber
+            ]
+        # Not under the lock, closing waits for the queued messages
+        subscriber.close()
 
     def start(self, timeout: float = 5.0) -> None:
         self._tcp_client.connect()
@@ -79,27 +377,52 @@ class StateConnection(SimpleMessageConnection):
                 + f"Timeout currently set to {timeout}"
             )
 
-    def stop(self) -> None:
-        pass
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        """Stop receiving, and the subscribers once their queues are delivered.
+
+        Waits at most `timeout` seconds in total for the subscribers.
+        """
+        self._stop.set()
+        self.close()
+        self.disable_shared_state()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._subscribers_lock:
+            subscribers = (
+                self._joint_feedback_subscribers
+                + self._joint_feedback_ex_subscribers
+                + [s for _, s in self._robot_status_change_subscribers]
+            )
+        for subscriber in subscribers:
+            subscriber.close(
+                None if deadline is None else max(0.0, deadline - time.monotonic())
+            )
+
+    def _publish_robot_status_changes(self, changes: List[RobotStatusChange]) -> None:
+        for change in changes:
+            for fields, subscriber in self._robot_status_change_subscribers:
+                if fields is None or change.field in fields:
+                    subscriber.put(change)
 
     def _worker(self) -> None:
+        perf_counter_ns = time.perf_counter_ns
+        done = perf_counter_ns()
         while True and not self._stop.is_set():
-            msg: SimpleMessage = self.recv()
-            if msg.header.msg_type == MsgType.JOINT_FEEDBACK:
-                with self._lock:
-                    self._joint_feedback[msg.body.groupno] = deepcopy(msg.body)
-                    for callback in self._joint_feedback_callbacks:
-                        callback(deepcopy(msg.body))
-
-            elif msg.header.msg_type == MsgType.MOTO_JOINT_FEEDBACK_EX:
-                with self._lock:
-                    self._joint_feedback_ex = deepcopy(msg.body)
-                    for callback in self._joint_feedback_ex_callbacks:
-                        callback(deepcopy(msg.body))
-
-            elif msg.header.msg_type == MsgType.ROBOT_STATUS:
-                with self._lock:
-                    self._robot_status = deepcopy(msg.body)
+            try:
+                frame = self.recv_frame()
+            except OSError:
+                if self._stop.is_set():
+                    return
+                raise
+            arrival = self.arrival_ns
+            # Frames of the same read were waiting for the previous frame
+            start = max(arrival, done)
+            msg: SimpleMessage = SimpleMessage.from_bytes(frame)
+            decoded = perf_counter_ns()
+            self._dispatch(msg, arrival)
+            done = perf_counter_ns()
+            self._statistics.record(
+                msg.header.msg_type, arrival, decoded - start, done - decoded
+            )
 
             if not self._initial_response.is_set() and (
                 isinstance(self.robot_status(), RobotStatus)
@@ -107,3 +430,39 @@ class StateConnection(SimpleMessageConnection):
                 and isinstance(self.joint_feedback_ex(), JointFeedbackEx)
             ):
                 self._initial_response.set()
+
+    def _dispatch(self, msg: SimpleMessage, arrival_ns: int) -> None:
+        # Publishing is a single reference assignment, which is atomic
+        if msg.header.msg_type == MsgType.JOINT_FEEDBACK:
+            # Estimated first, so the estimate is never older than the feedback
+            estimator = self._estimator
+            if estimator is not None:
+                estimator.update_feedback(msg.body)
+            self._joint_feedback[msg.body.groupno] = msg.body
+            history = self._histories[msg.body.groupno]
+            if history is not None:
+                history.append(msg.body)
+            shared_state = self._shared_state
+            if shared_state is not None:
+                shared_state.write_joint_feedback(msg.body)
+            for subscriber in self._joint_feedback_subscribers:
+                subscriber.put(msg.body)
+
+        elif msg.header.msg_type == MsgType.MOTO_JOINT_FEEDBACK_EX:
+            self._joint_feedback_ex = msg.body
+            for subscriber in self._joint_feedback_ex_subscribers:
+                subscriber.put(msg.body)
+
+        elif msg.header.msg_type == MsgType.ROBOT_STATUS:
+            previous = self._robot_status
+            self._robot_status = msg.body
+            shared_state = self._shared_state
+            if shared_state is not None:
+                shared_state.write_robot_status(msg.body)
+            if previous is not None and self._robot_status_change_subscribers:
+                self._publish_robot_status_changes(
+                    diff_robot_status(previous, msg.body, arrival_ns * 1e-9)
+                )
+
+        for waiter in self._waiters:
+            waiter.check()
@@ -0,0 +1,161 @@
+# Copyright 2021 Norwegian University of Science and Technology.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Streaming statistics of received messages, per message type.
+
+All times are measured with time.perf_counter_ns() and reported in seconds.
+"""
+
+from typing import Dict, Tuple
+from bisect import bisect_right
+from dataclasses import dataclass
+
+from moto.simple_message import MsgType
+
+# Upper edges of the jitter histogram bins in nanoseconds. Jitter is the
+# deviation of an inter-arrival time from the mean inter-arrival time. The last
+# bin counts everything above the last edge.
+_JITTER_BIN_EDGES_NS: Tuple[int, ...] = (
+    10_000,
+    50_000,
+    100_000,
+    500_000,
+    1_000_000,
+    5_000_000,
+    10_000_000,
+    50_000_000,
+)
+JITTER_BIN_EDGES: Tuple[float, ...] = tuple(
+    edge * 1e-9 for edge in _JITTER_BIN_EDGES_NS
+)
+
+
+@dataclass(frozen=True)
+class MessageStatistics:
+    msg_type: MsgType
+    count: int
+    # Messages per second between the first and the last message
+    rate: float
+    interarrival_min: float
+    interarrival_mean: float
+    interarrival_max: float
+    # Counts of the jitter below each of JITTER_BIN_EDGES, and above the last
+    jitter_histogram: Tuple[int, ...]
+    decode_time_mean: float
+    decode_time_max: float
+    # Time spent on the receive thread publishing the message and handing it
+    # to the history, callback subscribers and waiters
+    callback_time_mean: float
+    callback_time_max: float
+
+
+class _Accumulator:
+    __slots__ = (
+        "count",
+        "first",
+        "last",
+        "interarrival_sum",
+        "interarrival_min",
+        "interarrival_max",
+        "jitter",
+        "decode_sum",
+        "decode_max",
+        "callback_sum",
+        "callback_max",
+    )
+
+    def __init__(self) -> None:
+        self.count: int = 0
+        self.first: int = 0
+        self.last: int = 0
+        self.interarrival_sum: int = 0
+        self.interarrival_min: int = 0
+        self.interarrival_max: int = 0
+        self.jitter = [0] * (len(_JITTER_BIN_EDGES_NS) + 1)
+        self.decode_sum: int = 0
+        self.decode_max: int = 0
+        self.callback_sum: int = 0
+        self.callback_max: int = 0
+
+    def update(self, arrival: int, decode: int, callback: int) -> None:
+        count = self.count
+        if count:
+            interarrival = arrival - self.last
+            self.interarrival_sum += interarrival
+            if count == 1 or interarrival < self.interarrival_min:
+                self.interarrival_min = interarrival
+            if interarrival > self.interarrival_max:
+                self.interarrival_max = interarrival
+            jitter = abs(interarrival - self.interarrival_sum // count)
+            self.jitter[bisect_right(_JITTER_BIN_EDGES_NS, jitter)] += 1
+        else:
+            self.first = arrival
+        self.last = arrival
+        self.count = count + 1
+        self.decode_sum += decode
+        if decode > self.decode_max:
+            self.decode_max = decode
+        self.callback_sum += callback
+        if callback > self.callback_max:
+            self.callback_max = callback
+
+    def snapshot(self, msg_type: MsgType) -> MessageStatistics:
+        count = self.count
+        intervals = count - 1
+        duration = self.last - self.first
+        return MessageStatistics(
+            msg_type=msg_type,
+            count=count,
+            rate=intervals / (duration * 1e-9) if duration > 0 else 0.0,
+            interarrival_min=self.interarrival_min * 1e-9,
+            interarrival_mean=(
+                self.interarrival_sum / intervals * 1e-9 if intervals > 0 else 0.0
+            ),
+            interarrival_max=self.interarrival_max * 1e-9,
+            jitter_histogram=tuple(self.jitter),
+            decode_time_mean=self.decode_sum / count * 1e-9 if count else 0.0,
+            decode_time_max=self.decode_max * 1e-9,
+            callback_time_mean=self.callback_sum / count * 1e-9 if count else 0.0,
+            callback_time_max=self.callback_max * 1e-9,
+        )
+
+
+class Statistics:
+    """Per message type statistics, updated by a single receive thread."""
+
+    def __init__(self) -> None:
+        # Keyed by the value of the MsgType, which is much faster to hash
+        self._accumulators: Dict[int, _Accumulator] = {}
+
+    def record(self, msg_type: MsgType, arrival: int, decode: int, callback: int):
+        """Record a message that arrived at `arrival` ns.
+
+        `decode` and `callback` are the decode and callback times in ns.
+        """
+        key = msg_type._value_
+        accumulator = self._accumulators.get(key)
+        if accumulator is None:
+            accumulator = self._accumulators[key] = _Accumulator()
+        accumulator.update(arrival, decode, callback)
+
+    def snapshot(self) -> Dict[MsgType, MessageStatistics]:
+        snapshot = {}
+        for value, accumulator in list(self._accumulators.items()):
+            msg_type = MsgType(value)
+            snapshot[msg_type] = accumulator.snapshot(msg_type)
+        return snapshot
+
+    def reset(self) -> None:
+        # Swapped, so the receive thread never sees a half-reset accumulator
+        self._accumulators = {}
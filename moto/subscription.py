@@ -0,0 +1,270 @@
+# Copyright 2021 Norwegian University of Science and Technology.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Union
+from collections import OrderedDict, deque
+from enum import Enum
+from threading import Condition, Thread, current_thread
+
+import logging
+import numbers
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class BackpressurePolicy(Enum):
+    # Wait for space in the queue, which blocks the receive thread
+    BLOCK = 0
+    # Discard the oldest queued message to make room for the new one
+    DROP_OLDEST = 1
+    # Keep only the latest message (per coalesce key) in the queue
+    COALESCE = 2
+
+
+class _FilterState:
+    __slots__ = ("count", "last_delivery", "last_positions")
+
+    def __init__(self) -> None:
+        self.count: int = 0
+        self.last_delivery: float = 0.0
+        self.last_positions: Optional[List[float]] = None
+
+
+class SampleFilter:
+    """Selects the messages delivered to a low-rate subscriber.
+
+    Only every `every_nth` message is considered, at most `max_rate` messages
+    per second are delivered, and with a `deadband` (one for all joints or
+    one per joint) only messages where a position moved more than the
+    deadband since the last delivered message. All conditions must hold.
+    Messages are filtered separately per `key(msg)`, e.g. per group, and the
+    positions of a message are read with `positions(msg)`.
+
+    Called only by the receive thread, so it keeps its state without locking.
+    """
+
+    def __init__(
+        self,
+        max_rate: Optional[float] = None,
+        every_nth: Optional[int] = None,
+        deadband: Optional[Union[float, Sequence[float]]] = None,
+        key: Optional[Callable[[Any], Hashable]] = None,
+        positions: Optional[Callable[[Any], Sequence[float]]] = None,
+    ) -> None:
+        if max_rate is not None and max_rate <= 0.0:
+            raise ValueError(f"max_rate must be positive, got {max_rate}")
+        if every_nth is not None and every_nth < 1:
+            raise ValueError(f"every_nth must be positive, got {every_nth}")
+        if deadband is not None and positions is None:
+            raise ValueError("A deadband requires the positions of the messages")
+        self._period: float = 0.0 if max_rate is None else 1.0 / max_rate
+        self._every_nth: int = 1 if every_nth is None else every_nth
+        self._deadband: Optional[Union[float, Sequence[float]]] = deadband
+        self._key: Optional[Callable[[Any], Hashable]] = key
+        self._positions: Optional[Callable[[Any], Sequence[float]]] = positions
+        self._states: Dict[Hashable, _FilterState] = {}
+
+    def accept(self, msg: Any) -> bool:
+        key = None if self._key is None else self._key(msg)
+        state = self._states.get(key)
+        if state is None:
+            state = self._states[key] = _FilterState()
+
+        count = state.count
+        state.count = count + 1
+        if count % self._every_nth:
+            return False
+
+        if self._period:
+            now = time.monotonic()
+            if count and now - state.last_delivery < self._period:
+                return False
+        else:
+            now = 0.0
+
+        if self._deadband is not None:
+            positions = list(self._positions(msg))
+            if state.last_positions is not None and not self._moved(
+                state.last_positions, positions
+            ):
+                return False
+            state.last_positions = positions
+
+        state.last_delivery = now
+        return True
+
+    def _moved(self, last: List[float], positions: List[float]) -> bool:
+        deadband = self._deadband
+        # Also matches NumPy scalars, which are registered as numbers.Real
+        if isinstance(deadband, numbers.Real):
+            return any(abs(p - q) > deadband for p, q in zip(positions, last))
+        return any(
+            abs(p - q) > band for p, q, band in zip(positions, last, deadband)
+        )
+
+
+class Subscriber:
+    """Delivers messages to a callback from its own worker thread.
+
+    `put` is called by the receive thread and only queues the message, so a
+    slow callback does not delay reception. When the queue holds `maxsize`
+    messages, `policy` decides what happens to a new message. With COALESCE,
+    queued messages with the same `coalesce_key(msg)` are replaced by the
+    newest one; without a key, only the latest message is kept. Messages
+    rejected by `sample_filter` are discarded before they are queued.
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[Any], None],
+        policy: BackpressurePolicy = BackpressurePolicy.BLOCK,
+        maxsize: int = 1024,
+        coalesce_key: Optional[Callable[[Any], Hashable]] = None,
+        sample_filter: Optional[SampleFilter] = None,
+    ) -> None:
+        if maxsize < 1:
+            raise ValueError(f"maxsize must be positive, got {maxsize}")
+        self._callback: Callable[[Any], None] = callback
+        self._policy: BackpressurePolicy = policy
+        self._maxsize: int = maxsize
+        self._coalesce_key: Optional[Callable[[Any], Hashable]] = coalesce_key
+        self._sample_filter: Optional[SampleFilter] = sample_filter
+
+        self._queue: deque = deque()
+        self._latest: OrderedDict = OrderedDict()
+        self._condition: Condition = Condition()
+        self._closed: bool = False
+
+        self._received: int = 0
+        self._filtered: int = 0
+        self._delivered: int = 0
+        self._dropped: int = 0
+        self._errors: int = 0
+        self._max_depth: int = 0
+
+        self._worker_thread: Thread = Thread(target=self._worker)
+        self._worker_thread.daemon = True
+        self._worker_thread.start()
+
+    @property
+    def callback(self) -> Callable[[Any], None]:
+        return self._callback
+
+    @property
+    def policy(self) -> BackpressurePolicy:
+        return self._policy
+
+    @property
+    def depth(self) -> int:
+        """Number of queued messages."""
+        return len(self._queue) + len(self._latest)
+
+    @property
+    def max_depth(self) -> int:
+        return self._max_depth
+
+    @property
+    def received(self) -> int:
+        return self._received
+
+    @property
+    def filtered(self) -> int:
+        """Number of messages rejected by the sample filter."""
+        return self._filtered
+
+    @property
+    def delivered(self) -> int:
+        return self._delivered
+
+    @property
+    def dropped(self) -> int:
+        """Number of messages discarded or replaced by a newer message."""
+        return self._dropped
+
+    @property
+    def errors(self) -> int:
+        """Number of messages for which the callback raised an exception."""
+        return self._errors
+
+    def put(self, msg: Any) -> None:
+        if self._sample_filter is not None and not self._sample_filter.accept(msg):
+            self._filtered += 1
+            return
+        with self._condition:
+            if self._closed:
+                return
+            self._received += 1
+            if self._policy is BackpressurePolicy.COALESCE:
+                key = None if self._coalesce_key is None else self._coalesce_key(msg)
+                if key in self._latest:
+                    self._dropped += 1
+                elif len(self._latest) >= self._maxsize:
+                    self._latest.popitem(last=False)
+                    self._dropped += 1
+                # Assigning to an existing key keeps its place in the queue
+                self._latest[key] = msg
+            else:
+                if len(self._queue) >= self._maxsize:
+                    if self._policy is BackpressurePolicy.BLOCK:
+                        self._condition.wait_for(
+                            lambda: len(self._queue) < self._maxsize or self._closed
+                        )
+                        if self._closed:
+                            return
+                    else:
+                        self._queue.popleft()
+                        self._dropped += 1
+                self._queue.append(msg)
+            self._max_depth = max(self._max_depth, self.depth)
+            self._condition.notify_all()
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Stop the worker after the queued messages have been delivered.
+
+        When called from the callback, e.g. to remove the callback from
+        itself, the queued messages are discarded and close returns without
+        waiting for the worker, which stops once the callback returns.
+        """
+        in_worker = current_thread() is self._worker_thread
+        with self._condition:
+            self._closed = True
+            if in_worker:
+                self._dropped += self.depth
+                self._queue.clear()
+                self._latest.clear()
+            self._condition.notify_all()
+        if not in_worker:
+            self._worker_thread.join(timeout)
+
+    def _get(self) -> Any:
+        if self._latest:
+            return self._latest.popitem(last=False)[1]
+        return self._queue.popleft()
+
+    def _worker(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self.depth > 0 or self._closed)
+                if self.depth == 0:
+                    return
+                msg = self._get()
+                # Wake up a receive thread blocked on a full queue
+                self._condition.notify_all()
+            try:
+                self._callback(msg)
+            except Exception:
+                self._errors += 1
+                logger.exception("Exception in subscriber callback")
+            self._delivered += 1
@@ -0,0 +1,196 @@
+# Copyright 2021 Norwegian University of Science and Technology.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Multi group trajectories held as NumPy arrays.
+
+Requires NumPy, which is an optional dependency of moto.
+"""
+
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from moto import numpy_codec
+from moto.control_group import ControlGroupDefinition
+from moto.packed_trajectory import (
+    GroupTrajectory,
+    PackedTrajectory,
+    pack_joint_trajectory_ex,
+)
+from moto.simple_message import (
+    JointTrajPtFullEx,
+    MsgType,
+    ValidFields,
+    MOT_MAX_GR,
+    ROS_MAX_JOINT,
+)
+
+_MSG_TYPE = MsgType.MOTO_JOINT_TRAJ_PT_FULL_EX
+
+
+class GroupArrays(NamedTuple):
+    # Time from start of every point, shape (num_points,)
+    time: np.ndarray
+    # Shape (num_points, num_joints), vel and acc are None when not given
+    pos: np.ndarray
+    vel: Optional[np.ndarray]
+    acc: Optional[np.ndarray]
+
+
+def _as_array(values, shape, name: str) -> np.ndarray:
+    array = np.array(values, dtype=np.float64)
+    if array.shape != shape:
+        raise ValueError(f"Expected {name} of shape {shape}, got {array.shape}")
+    return array
+
+
+class Trajectory:
+    """Trajectory of one or more control groups, as one array per field.
+
+    Every group has the same number of points, and point k of all groups is
+    sent as MOTO_JOINT_TRAJ_PT_FULL_EX message k. The joints of a group are
+    padded to ROS_MAX_JOINT, and the valid fields of a group follow from the
+    arrays it was added with.
+
+    `pack`, `messages` and `to_array` validate the trajectory: the values must
+    be finite and the times of every group non-negative and strictly
+    increasing as 32-bit floats, the precision they are sent with.
+    """
+
+    def __init__(self) -> None:
+        # Keyed by group number, control group definitions are not hashable
+        self._defs: Dict[int, ControlGroupDefinition] = {}
+        self._groups: Dict[int, GroupArrays] = {}
+
+    def add_group(
+        self,
+        control_group_def: ControlGroupDefinition,
+        time: Sequence[float],
+        pos: Sequence[Sequence[float]],
+        vel: Optional[Sequence[Sequence[float]]] = None,
+        acc: Optional[Sequence[Sequence[float]]] = None,
+    ) -> None:
+        """Add the points of a group, copying the values."""
+        groupno = control_group_def.groupno
+        if groupno in self._groups:
+            raise ValueError(f"Group {groupno} was already added")
+        if len(self._groups) == MOT_MAX_GR:
+            raise ValueError(f"At most {MOT_MAX_GR} groups are supported")
+        num_joints = control_group_def.num_joints
+        if num_joints > ROS_MAX_JOINT:
+            raise ValueError(
+                f"At most {ROS_MAX_JOINT} joints are supported, got {num_joints}"
+            )
+        time = np.array(time, dtype=np.float64)
+        if time.ndim != 1:
+            raise ValueError(f"Expected one time per point, got shape {time.shape}")
+        shape = (len(time), num_joints)
+        self._defs[groupno] = control_group_def
+        self._groups[groupno] = GroupArrays(
+            time,
+            _as_array(pos, shape, "positions"),
+            None if vel is None else _as_array(vel, shape, "velocities"),
+            None if acc is None else _as_array(acc, shape, "accelerations"),
+        )
+
+    @property
+    def control_groups(self) -> List[ControlGroupDefinition]:
+        """The control groups in the order of their group numbers."""
+        return [self._defs[groupno] for groupno in sorted(self._defs)]
+
+    def __getitem__(self, control_group_def: ControlGroupDefinition) -> GroupArrays:
+        return self._groups[control_group_def.groupno]
+
+    def __len__(self) -> int:
+        """Number of points, 0 without groups."""
+        return min((len(group.time) for group in self._groups.values()), default=0)
+
+    def valid_fields(self, control_group_def: ControlGroupDefinition) -> ValidFields:
+        group = self._groups[control_group_def.groupno]
+        valid_fields = ValidFields.TIME | ValidFields.POSITION
+        if group.vel is not None:
+            valid_fields |= ValidFields.VELOCITY
+        if group.acc is not None:
+            valid_fields |= ValidFields.ACCELERATION
+        return valid_fields
+
+    def validate(self) -> None:
+        """Raise ValueError if the trajectory can not be sent."""
+        if not self._groups:
+            raise ValueError("The trajectory has no groups")
+        num_points = {len(group.time) for group in self._groups.values()}
+        if len(num_points) != 1:
+            raise ValueError(
+                f"All groups must have the same number of points, got {num_points}"
+            )
+        if num_points == {0}:
+            raise ValueError("The trajectory has no points")
+
+        for groupno, group in self._groups.items():
+            for name, values in zip(GroupArrays._fields, group):
+                if values is None:
+                    continue
+                finite = np.isfinite(values).reshape(len(values), -1).all(axis=1)
+                if not finite.all():
+                    index = np.flatnonzero(~finite)[0]
+                    raise ValueError(
+                        f"Point {index} of group {groupno} has a non-finite {name}"
+                    )
+            time = group.time.astype(np.float32)
+            if time[0] < 0.0:
+                raise ValueError(f"Group {groupno} starts at negative time {time[0]}")
+            not_increasing = np.flatnonzero(np.diff(time) <= 0.0)
+            if len(not_increasing) > 0:
+                index = not_increasing[0] + 1
+                raise ValueError(
+                    f"The time of point {index} of group {groupno} is not after the"
+                    f" time of the previous point: {time[index]} <= {time[index - 1]}"
+                )
+
+    def pack(self, sequence_start: int = 0) -> PackedTrajectory:
+        """Validate the trajectory and pack its messages into one buffer."""
+        self.validate()
+        return pack_joint_trajectory_ex(
+            [
+                GroupTrajectory(groupno, *self._groups[groupno])
+                for groupno in sorted(self._groups)
+            ],
+            sequence_start,
+        )
+
+    def to_array(self, sequence_start: int = 0) -> np.ndarray:
+        """Record array of the packed messages, see `moto.numpy_codec`."""
+        packed = self.pack(sequence_start)
+        return numpy_codec.decode(packed.buffer, _MSG_TYPE, len(self._groups))
+
+    def messages(self, sequence_start: int = 0) -> Iterator[JointTrajPtFullEx]:
+        """Validate the trajectory and generate its points one at a time.
+
+        The points are packed at once, but each JointTrajPtFullEx is only
+        decoded when it is requested.
+        """
+        packed = self.pack(sequence_start)
+        return (packed.point(index) for index in range(len(packed)))
+
+    def goals(self) -> Dict[int, List[float]]:
+        """The positions of the last point per group number."""
+        return {
+            groupno: group.pos[-1].tolist() for groupno, group in self._groups.items()
+        }
+
+    def times(self) -> List[float]:
+        """The distinct times from start of all groups, in increasing order."""
+        times = [group.time.astype(np.float32) for group in self._groups.values()]
+        return np.unique(np.concatenate(times)).tolist()
+
@@ -0,0 +1,196 @@
+# Copyright 2021 Norwegian University of Science and Technology.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Union,
+)
+from bisect import bisect_right
+from concurrent.futures import Future
+from threading import Thread
+
+import time
+
+from moto.motion_connection import JointTrajPt, MotionConnection, TrajectoryPointResult
+from moto.packed_trajectory import PackedTrajectory
+from moto.simple_message import JointTrajPtFull, Ternary
+from moto.state_connection import StateConnection
+from moto.trajectory_executor import TrajectoryExecutor
+
+if TYPE_CHECKING:
+    from moto.trajectory import Trajectory
+
+
+class TrajectoryResult(NamedTuple):
+    # Seconds from the first accepted point until the goal was reached
+    duration: float
+    # Final position minus goal position, per joint of every group
+    tracking_error: Dict[int, List[float]]
+
+
+def _goals_and_times(points: Sequence[JointTrajPt]):
+    goals: Dict[int, Sequence[float]] = {}
+    times = set()
+    for point in points:
+        if isinstance(point, JointTrajPtFull):
+            data = [point]
+        else:
+            data = point.joint_traj_pt_data
+        for group in data:
+            goals[group.groupno] = group.pos
+            times.add(group.time)
+    return goals, sorted(times)
+
+
+class TrajectoryExecution(Future):
+    """Progress of a trajectory executed in the background.
+
+    The points are sent by a TrajectoryExecutor on a worker thread, while
+    progress is tracked from the state connection. The future resolves with
+    a TrajectoryResult when all points are accepted, the robot is not in
+    motion and every joint is within `tol` of the last point of its group.
+    It fails with TimeoutError if the goal is not reached `settle_timeout`
+    seconds after the expected end of the trajectory, and with the exception
+    of the executor if a point is rejected.
+
+    Progress is estimated from the time the first point was accepted and the
+    time from start of the points. Only the joints in `num_joints` (all by
+    default) of each group are compared with the goal.
+
+    A `moto.trajectory.Trajectory` is packed and sent as it is packed, and
+    only its joints are compared with the goal.
+    """
+
+    def __init__(
+        self,
+        points: Union[Iterable[JointTrajPt], "Trajectory"],
+        motion_connection: MotionConnection,
+        state_connection: StateConnection,
+        tol: float = 1e-3,
+        settle_timeout: float = 5.0,
+        num_joints: Optional[Mapping[int, int]] = None,
+        executor: Optional[TrajectoryExecutor] = None,
+    ) -> None:
+        super().__init__()
+        self._points: Union[List[JointTrajPt], PackedTrajectory]
+        if hasattr(points, "pack"):
+            # A Trajectory, validated by pack()
+            self._points = points.pack()
+            self._goals, self._times = points.goals(), points.times()
+        else:
+            self._points = list(points)
+            if not self._points:
+                raise ValueError("The trajectory has no points")
+            self._goals, self._times = _goals_and_times(self._points)
+        self._state_connection: StateConnection = state_connection
+        self._executor: TrajectoryExecutor = executor or TrajectoryExecutor(
+            motion_connection
+        )
+        self._tol: float = tol
+        self._settle_timeout: float = settle_timeout
+        self._num_joints: Mapping[int, int] = num_joints or {}
+
+        self._accepted: int = 0
+        self._start: Optional[float] = None
+        self._worker_thread: Thread = Thread(target=self._worker)
+        self._worker_thread.daemon = True
+
+    def start(self) -> "TrajectoryExecution":
+        self.set_running_or_notify_cancel()
+        self._worker_thread.start()
+        return self
+
+    def abort(self) -> None:
+        """Stop sending points. Does not stop the motion of sent points."""
+        self._executor.cancel()
+
+    @property
+    def points_accepted(self) -> int:
+        return self._accepted
+
+    @property
+    def duration(self) -> float:
+        """Time from start of the last point."""
+        return self._times[-1]
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the first point was accepted, 0 before."""
+        return 0.0 if self._start is None else time.monotonic() - self._start
+
+    @property
+    def segment(self) -> int:
+        """Index of the waypoint the robot is moving towards.
+
+        Waypoints are the distinct times from start of the points; the index
+        is that of the last waypoint once its time has passed.
+        """
+        return min(bisect_right(self._times, self.elapsed), len(self._times) - 1)
+
+    @property
+    def remaining_time(self) -> float:
+        """Estimated seconds until the end of the trajectory."""
+        if self.done():
+            return 0.0
+        return max(0.0, self._times[-1] - self.elapsed)
+
+    @property
+    def tracking_error(self) -> Dict[int, List[float]]:
+        """Latest position minus goal position per group, empty if unknown."""
+        errors = {}
+        for groupno, goal in self._goals.items():
+            feedback = self._state_connection.joint_feedback(groupno)
+            if feedback is None:
+                continue
+            n = self._num_joints.get(groupno, len(goal))
+            errors[groupno] = [
+                pos - goal_pos for pos, goal_pos in zip(feedback.pos[:n], goal[:n])
+            ]
+        return errors
+
+    def _goal_reached(self) -> bool:
+        robot_status = self._state_connection.robot_status()
+        if robot_status is not None and robot_status.in_motion is Ternary.TRUE:
+            return False
+        errors = self.tracking_error
+        return len(errors) == len(self._goals) and all(
+            abs(error) <= self._tol for group in errors.values() for error in group
+        )
+
+    def _on_accepted(self, result: TrajectoryPointResult) -> None:
+        if self._start is None:
+            self._start = time.monotonic()
+        self._accepted += 1
+
+    def _worker(self) -> None:
+        try:
+            self._executor.execute(self._points, self._on_accepted)
+            timeout = self.remaining_time + self._settle_timeout
+            if not self._state_connection.wait_for(self._goal_reached, timeout):
+                raise TimeoutError(
+                    f"The goal was not reached within {self._settle_timeout} s"
+                    " after the end of the trajectory"
+                )
+            result = TrajectoryResult(self.elapsed, self.tracking_error)
+        except BaseException as e:
+            self.set_exception(e)
+        else:
+            self.set_result(result)
@@ -0,0 +1,172 @@
+# Copyright 2021 Norwegian University of Science and Technology.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Callable, Iterable, List, Optional, Union
+from threading import Event
+
+from moto.motion_connection import JointTrajPt, MotionConnection, TrajectoryPointResult
+from moto.packed_trajectory import PackedTrajectory
+from moto.simple_message import JointTrajPtFull, ResultType, SimpleMessage
+
+
+class TrajectoryExecutionError(Exception):
+    def __init__(self, result: TrajectoryPointResult) -> None:
+        super().__init__(
+            f"Point {result.index} (sequence {result.point.sequence}) was rejected:"
+            f" {result.reply.result}, subcode {result.reply.subcode}"
+        )
+        self.result: TrajectoryPointResult = result
+
+
+class TrajectoryCancelled(Exception):
+    pass
+
+
+class TrajectoryExecutor:
+    """Streams trajectories of any length into the controller motion queue.
+
+    MotoROS converts one trajectory point at a time into increments in its
+    motion queue and replies BUSY to a point while it cannot take it. A point
+    is therefore sent only when the previous one was accepted, and a rejected
+    point is resent, so points are never lost or reordered.
+
+    The retry delay adapts to the controller: after a BUSY reply the number
+    of increments in the motion queue of the groups of the point is read with
+    CHECK_QUEUE_CNT. The executor waits for the queue to drain down to
+    `low_watermark` increments of `interpolation_period` seconds each, which
+    keeps the queue filled without polling the controller continuously. If
+    the queue count is not available, the delay grows exponentially while
+    the controller is busy. The delay is always between `min_backoff` and
+    `max_backoff`.
+    """
+
+    def __init__(
+        self,
+        motion_connection: MotionConnection,
+        low_watermark: int = 20,
+        interpolation_period: float = 0.004,
+        min_backoff: float = 0.001,
+        max_backoff: float = 0.1,
+    ) -> None:
+        if not 0.0 < min_backoff <= max_backoff:
+            raise ValueError(f"Invalid backoff range [{min_backoff}, {max_backoff}]")
+        self._motion_connection: MotionConnection = motion_connection
+        self._low_watermark: int = low_watermark
+        self._interpolation_period: float = interpolation_period
+        self._min_backoff: float = min_backoff
+        self._max_backoff: float = max_backoff
+        self._backoff: float = min_backoff
+        self._cancelled: Event = Event()
+
+        self._busy_replies: int = 0
+        self._waited: float = 0.0
+
+    @property
+    def busy_replies(self) -> int:
+        """Number of BUSY replies, i.e. of points that were resent."""
+        return self._busy_replies
+
+    @property
+    def waited(self) -> float:
+        """Total time in seconds spent waiting for the controller."""
+        return self._waited
+
+    def cancel(self) -> None:
+        """Stop `execute` before the next point, from any thread."""
+        self._cancelled.set()
+
+    def execute(
+        self,
+        points: Union[Iterable[JointTrajPt], PackedTrajectory],
+        callback: Optional[Callable[[TrajectoryPointResult], None]] = None,
+    ) -> List[TrajectoryPointResult]:
+        """Send all points, retrying every BUSY point until it is accepted.
+
+        `callback` is called with the result of every accepted point. Raises
+        TrajectoryExecutionError if a point is rejected for another reason
+        than BUSY, and TrajectoryCancelled if `cancel` was called. The
+        messages of a PackedTrajectory are sent as they are packed, and
+        `point` of a result is None for a point that was accepted at once.
+        """
+        if isinstance(points, PackedTrajectory):
+            packed = points
+            items = ((index, None) for index in range(len(packed)))
+
+            def send(index: int, point: Optional[JointTrajPt]) -> SimpleMessage:
+                return self._motion_connection.request_frame(
+                    packed.message(index), packed.sequence(index)
+                ).result()
+
+        else:
+            items = enumerate(points)
+
+            def send(index: int, point: Optional[JointTrajPt]) -> SimpleMessage:
+                return self._motion_connection.send_joint_trajectory_point(point)
+
+        self._cancelled.clear()
+        results: List[TrajectoryPointResult] = []
+        for index, point in items:
+            while True:
+                if self._cancelled.is_set():
+                    raise TrajectoryCancelled(
+                        f"Cancelled before point {index} of the trajectory"
+                    )
+                reply = send(index, point)
+                if point is None and reply.body.result is not ResultType.SUCCESS:
+                    # Only the points of a PackedTrajectory that are not
+                    # accepted at once are decoded
+                    point = packed.point(index)
+                result = TrajectoryPointResult(index, point, reply.body)
+                if result.reply.result is not ResultType.BUSY:
+                    break
+                self._busy_replies += 1
+                self._wait(self._retry_delay(point))
+
+            if not result.success:
+                raise TrajectoryExecutionError(result)
+            # Decay the fallback delay while the controller accepts points
+            self._backoff = max(self._min_backoff, self._backoff / 2.0)
+            results.append(result)
+            if callback is not None:
+                callback(result)
+        return results
+
+    def _retry_delay(self, point: JointTrajPt) -> float:
+        count = self._queue_count(point)
+        if count is None:
+            delay = self._backoff
+            self._backoff = min(self._max_backoff, self._backoff * 2.0)
+        else:
+            delay = (count - self._low_watermark) * self._interpolation_period
+        return min(self._max_backoff, max(self._min_backoff, delay))
+
+    def _queue_count(self, point: JointTrajPt) -> Optional[int]:
+        """Most increments queued for any group of the point, None if unknown."""
+        if isinstance(point, JointTrajPtFull):
+            groupnos = [point.groupno]
+        else:
+            groupnos = [data.groupno for data in point.joint_traj_pt_data]
+        counts = []
+        for groupno in groupnos:
+            reply = self._motion_connection.check_queue_count(groupno).body
+            if reply.result is not ResultType.SUCCESS or not isinstance(
+                reply.subcode, int
+            ):
+                return None
+            counts.append(int(reply.subcode))
+        return max(counts)
+
+    def _wait(self, delay: float) -> None:
+        self._cancelled.wait(delay)
+        self._waited += delay
@@ -0,0 +1,199 @@
+import asyncio
+import unittest
+
+from moto.async_state_connection import AsyncStateConnection
+from moto.simple_message import (
+    CommType,
+    Header,
+    JointFeedback,
+    JointFeedbackEx,
+    MsgType,
+    PendantMode,
+    ReplyType,
+    RobotStatus,
+    SimpleMessage,
+    Ternary,
+    ValidFields,
+)
+from moto.subscription import BackpressurePolicy
+
+
+def robot_status_msg(in_motion: Ternary = Ternary.FALSE) -> SimpleMessage:
+    return SimpleMessage(
+        Header(MsgType.ROBOT_STATUS, CommType.TOPIC, ReplyType.INVALID),
+        RobotStatus(
+            Ternary.TRUE,
+            Ternary.FALSE,
+            0,
+            Ternary.FALSE,
+            in_motion,
+            PendantMode.AUTO,
+            Ternary.TRUE,
+        ),
+    )
+
+
+def joint_feedback(groupno: int, time: float) -> JointFeedback:
+    return JointFeedback(
+        groupno,
+        ValidFields.TIME | ValidFields.POSITION,
+        time,
+        [time] * 10,
+        [0.0] * 10,
+        [0.0] * 10,
+    )
+
+
+def joint_feedback_msg(groupno: int, time: float) -> SimpleMessage:
+    return SimpleMessage(
+        Header(MsgType.JOINT_FEEDBACK, CommType.TOPIC, ReplyType.INVALID),
+        joint_feedback(groupno, time),
+    )
+
+
+def joint_feedback_ex_msg(time: float) -> SimpleMessage:
+    return SimpleMessage(
+        Header(MsgType.MOTO_JOINT_FEEDBACK_EX, CommType.TOPIC, ReplyType.INVALID),
+        JointFeedbackEx(1, [joint_feedback(0, time)]),
+    )
+
+
+class TestAsyncStateConnection(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.writer = None
+        self.accepted = asyncio.Event()
+
+        async def accept(reader, writer):
+            self.writer = writer
+            self.accepted.set()
+
+        self.server = await asyncio.start_server(accept, "127.0.0.1", 0)
+        port = self.server.sockets[0].getsockname()[1]
+        cls = type(
+            "LocalAsyncStateConnection",
+            (AsyncStateConnection,),
+            {"TCP_PORT_STATE": port},
+        )
+        self.connection = cls("127.0.0.1")
+
+    async def asyncTearDown(self):
+        self.connection.stop()
+        await self.connection.wait_closed()
+        if self.writer is not None:
+            self.writer.close()
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def send(self, *msgs: SimpleMessage) -> None:
+        await self.accepted.wait()
+        self.writer.write(b"".join(msg.to_bytes() for msg in msgs))
+        await self.writer.drain()
+
+    async def start(self) -> None:
+        start = asyncio.ensure_future(self.connection.start())
+        await self.send(
+            robot_status_msg(), joint_feedback_msg(0, 0.0), joint_feedback_ex_msg(0.0)
+        )
+        await start
+
+    async def test_getters(self):
+        await self.start()
+        self.assertEqual(await self.connection.robot_status(), robot_status_msg().body)
+        self.assertEqual((await self.connection.joint_feedback(0)).time, 0.0)
+        self.assertEqual(
+            await self.connection.joint_feedback_ex(), joint_feedback_ex_msg(0.0).body
+        )
+
+        # Waits for the first feedback of the group
+        getter = asyncio.ensure_future(self.connection.joint_feedback(1))
+        await asyncio.sleep(0.01)
+        self.assertFalse(getter.done())
+        await self.send(joint_feedback_msg(1, 1.0))
+        self.assertEqual((await asyncio.wait_for(getter, 5.0)).groupno, 1)
+
+    async def test_start_timeout(self):
+        with self.assertRaises(TimeoutError):
+            await self.connection.start(timeout=0.05)
+
+    async def test_feedback_streams(self):
+        await self.start()
+
+        async def consume(n):
+            async with self.connection.feedback(0) as stream:
+                times = []
+                async for feedback in stream:
+                    times.append(feedback.time)
+                    if len(times) == n:
+                        return times
+
+        consumers = [asyncio.ensure_future(consume(3)) for _ in range(100)]
+        await asyncio.sleep(0.01)
+        await self.send(
+            joint_feedback_msg(1, 5.0),
+            *(joint_feedback_msg(0, float(k)) for k in range(1, 4)),
+        )
+        results = await asyncio.wait_for(asyncio.gather(*consumers), 5.0)
+        self.assertEqual(results, [[1.0, 2.0, 3.0]] * 100)
+        self.assertEqual(self.connection._joint_feedback_streams[0], [])
+
+    async def test_coalesce(self):
+        await self.start()
+        stream = self.connection.feedback(0, BackpressurePolicy.COALESCE)
+        await self.send(*(joint_feedback_msg(0, float(k)) for k in range(1, 6)))
+        self.assertTrue(
+            await self.connection.wait_for(
+                lambda: self.connection._joint_feedback[0].time == 5.0, 5.0
+            )
+        )
+        self.assertEqual(stream.depth, 1)
+        self.assertEqual(stream.dropped, 4)
+        self.assertEqual((await stream.__anext__()).time, 5.0)
+        stream.close()
+
+    async def test_block_pauses_reading(self):
+        await self.start()
+        stream = self.connection.feedback(0, BackpressurePolicy.BLOCK, maxsize=2)
+        await self.send(*(joint_feedback_msg(0, float(k)) for k in range(1, 11)))
+        times = []
+        async for feedback in stream:
+            times.append(feedback.time)
+            if len(times) == 10:
+                break
+        self.assertEqual(times, [float(k) for k in range(1, 11)])
+        self.assertEqual(stream.dropped, 0)
+        stream.close()
+
+    async def test_stream_ends_when_closed(self):
+        await self.start()
+        stream = self.connection.robot_status_stream()
+        await self.send(robot_status_msg(Ternary.TRUE))
+        self.writer.close()
+        statuses = [status async for status in stream]
+        self.assertEqual(statuses, [robot_status_msg(Ternary.TRUE).body])
+
+    async def test_wait_until_stopped(self):
+        await self.start()
+        self.assertFalse(
+            await self.connection.wait_for(
+                lambda: self.connection._robot_status.in_motion is Ternary.TRUE, 0.01
+            )
+        )
+        await self.send(robot_status_msg(Ternary.TRUE))
+        self.assertTrue(
+            await self.connection.wait_for(
+                lambda: self.connection._robot_status.in_motion is Ternary.TRUE, 5.0
+            )
+        )
+        waiter = asyncio.ensure_future(self.connection.wait_until_stopped(5.0))
+        await asyncio.sleep(0.01)
+        self.assertFalse(waiter.done())
+        await self.send(robot_status_msg(Ternary.FALSE))
+        self.assertTrue(await waiter)
+
+    async def test_stats(self):
+        await self.start()
+        self.assertEqual(self.connection.stats()[MsgType.ROBOT_STATUS].count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,327 @@
+import os
+import socket
+import tempfile
+import threading
+import unittest
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from moto.capture import (
+    CaptureError,
+    CaptureReader,
+    CaptureWriter,
+    Direction,
+    FILE_HEADER,
+    RECORD_HEADER,
+    CAPTURE_MAGIC,
+    CAPTURE_VERSION,
+)
+from moto.real_time_motion_connection import RealTimeMotionServer
+from moto.simple_message import (
+    CommType,
+    Header,
+    JointFeedback,
+    JointFeedbackEx,
+    MotoRealTimeMotionJointCommandEx,
+    MotoRealTimeMotionJointCommandExData,
+    MotoRealTimeMotionJointStateEx,
+    MotoRealTimeMotionJointStateExData,
+    MotoRealTimeMotionMode,
+    MsgType,
+    ReplyType,
+    RobotStatus,
+    SimpleMessage,
+    Ternary,
+    PendantMode,
+    ValidFields,
+)
+from moto.simple_message_connection import SimpleMessageConnection
+
+
+def robot_status_msg() -> SimpleMessage:
+    return SimpleMessage(
+        Header(MsgType.ROBOT_STATUS, CommType.TOPIC, ReplyType.INVALID),
+        RobotStatus(
+            Ternary.TRUE,
+            Ternary.FALSE,
+            0,
+            Ternary.FALSE,
+            Ternary.FALSE,
+            PendantMode.AUTO,
+            Ternary.TRUE,
+        ),
+    )
+
+
+def joint_feedback_ex_msg(time: float) -> SimpleMessage:
+    return SimpleMessage(
+        Header(MsgType.MOTO_JOINT_FEEDBACK_EX, CommType.TOPIC, ReplyType.INVALID),
+        JointFeedbackEx(
+            2,
+            [
+                JointFeedback(
+                    groupno,
+                    ValidFields.TIME | ValidFields.POSITION,
+                    time,
+                    [time] * 10,
+                    [0.0] * 10,
+                    [0.0] * 10,
+                )
+                for groupno in range(2)
+            ],
+        ),
+    )
+
+
+def read_records(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version = FILE_HEADER.unpack_from(data)
+    assert magic == CAPTURE_MAGIC and version == CAPTURE_VERSION
+    offset = FILE_HEADER.size
+    records = []
+    while offset < len(data):
+        timestamp, direction, port, length = RECORD_HEADER.unpack_from(data, offset)
+        offset += RECORD_HEADER.size
+        records.append((timestamp, direction, port, data[offset : offset + length]))
+        offset += length
+    return records
+
+
+class TestCaptureWriter(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".cap")
+        os.close(fd)
+        os.remove(self.path)
+
+    def tearDown(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def test_record(self):
+        data = robot_status_msg().to_bytes()
+        with CaptureWriter(self.path, buffer_size=100) as writer:
+            for k in range(10):
+                writer.record(Direction.RECV, 50241, data, timestamp=float(k))
+            writer.record(Direction.SEND, 50240, memoryview(data), timestamp=10.0)
+
+        records = read_records(self.path)
+        self.assertEqual(len(records), 11)
+        self.assertEqual(records[0], (0.0, Direction.RECV, 50241, data))
+        self.assertEqual(records[-1], (10.0, Direction.SEND, 50240, data))
+
+    def test_append(self):
+        data = robot_status_msg().to_bytes()
+        for _ in range(2):
+            with CaptureWriter(self.path) as writer:
+                writer.record(Direction.RECV, 50241, data)
+        self.assertEqual(len(read_records(self.path)), 2)
+
+    def test_not_a_capture_file(self):
+        with open(self.path, "wb") as f:
+            f.write(b"something else")
+        with self.assertRaises(CaptureError):
+            CaptureWriter(self.path)
+
+
+class TestCaptureReader(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".cap")
+        os.close(fd)
+        os.remove(self.path)
+        with CaptureWriter(self.path) as writer:
+            for k in range(100):
+                writer.record(
+                    Direction.RECV,
+                    50241,
+                    joint_feedback_ex_msg(float(k)).to_bytes(),
+                    timestamp=float(k),
+                )
+                if k % 10 == 0:
+                    writer.record(
+                        Direction.RECV,
+                        50241,
+                        robot_status_msg().to_bytes(),
+                        timestamp=float(k),
+                    )
+
+    def tearDown(self):
+        for path in (self.path, self.path + ".idx"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_index(self):
+        with CaptureReader(self.path) as reader:
+            self.assertEqual(len(reader), 110)
+            record = reader[1]
+            self.assertEqual(record.msg_type, MsgType.ROBOT_STATUS.value)
+            self.assertEqual(record.port, 50241)
+            self.assertEqual(record.direction, Direction.RECV)
+            self.assertEqual(
+                SimpleMessage.from_bytes(record.frame), robot_status_msg()
+            )
+            del record
+        self.assertTrue(os.path.exists(self.path + ".idx"))
+
+        with CaptureWriter(self.path) as writer:
+            writer.record(
+                Direction.RECV, 50241, robot_status_msg().to_bytes(), timestamp=100.0
+            )
+        with CaptureReader(self.path) as reader:
+            self.assertEqual(len(reader), 111)
+            self.assertEqual(reader.timestamps[-1], 100.0)
+
+    def test_index_of_replaced_capture(self):
+        os.remove(self.path)
+        feedback = SimpleMessage(
+            Header(MsgType.JOINT_FEEDBACK, CommType.TOPIC, ReplyType.INVALID),
+            JointFeedback(0, ValidFields.TIME, 0.0, [0.0] * 10, [0.0] * 10, [0.0] * 10),
+        )
+        with CaptureWriter(self.path) as writer:
+            for k in range(10):
+                writer.record(
+                    Direction.RECV, 50241, feedback.to_bytes(), timestamp=float(k)
+                )
+        with CaptureReader(self.path) as reader:
+            self.assertEqual(len(reader), 10)
+
+        # Replaced by a larger capture, the index does not describe it
+        os.remove(self.path)
+        with CaptureWriter(self.path) as writer:
+            for k in range(40):
+                writer.record(
+                    Direction.RECV,
+                    50241,
+                    robot_status_msg().to_bytes(),
+                    timestamp=100.0 + k,
+                )
+        with CaptureReader(self.path) as reader:
+            self.assertEqual(len(reader), 40)
+            self.assertEqual(
+                set(reader.msg_types.tolist()), {MsgType.ROBOT_STATUS.value}
+            )
+
+    def test_time_range_and_type_filter(self):
+        with CaptureReader(self.path) as reader:
+            times = [
+                JointFeedbackEx.from_bytes(body).joint_feedback_data[0].time
+                for _, body in reader.bodies(
+                    MsgType.MOTO_JOINT_FEEDBACK_EX, start=10.0, end=20.0
+                )
+            ]
+            self.assertEqual(times, [float(k) for k in range(10, 20)])
+
+            statuses = list(
+                reader.records(start=50.0, msg_types=[MsgType.ROBOT_STATUS])
+            )
+            self.assertEqual(
+                [record.timestamp for record in statuses],
+                [50.0, 60.0, 70.0, 80.0, 90.0],
+            )
+            del statuses
+            self.assertEqual(list(reader.records(port=50240)), [])
+
+    @unittest.skipIf(np is None, "requires numpy")
+    def test_to_numpy(self):
+        with CaptureReader(self.path) as reader:
+            timestamps, messages = reader.to_numpy(
+                MsgType.MOTO_JOINT_FEEDBACK_EX, start=5.0, number_of_valid_groups=2
+            )
+        np.testing.assert_array_equal(timestamps, np.arange(5.0, 100.0))
+        np.testing.assert_array_equal(
+            messages["joint_feedback_data"]["pos"][:, 1, 0], np.arange(5.0, 100.0)
+        )
+
+
+class TestConnectionRecorder(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".cap")
+        os.close(fd)
+        os.remove(self.path)
+
+    def tearDown(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def test_send_and_recv(self):
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.bind(("127.0.0.1", 0))
+        server.listen()
+        port = server.getsockname()[1]
+
+        def echo():
+            conn, _ = server.accept()
+            with conn:
+                conn.sendall(conn.recv(1024))
+
+        thread = threading.Thread(target=echo)
+        thread.start()
+
+        msg = robot_status_msg()
+        with CaptureWriter(self.path) as writer:
+            connection = SimpleMessageConnection(("127.0.0.1", port), writer)
+            connection.start()
+            response = connection.send_and_recv(msg)
+            connection.set_recorder(None)
+        thread.join()
+        server.close()
+
+        self.assertEqual(response, msg)
+        records = read_records(self.path)
+        self.assertEqual(
+            [(direction, port_) for _, direction, port_, _ in records],
+            [(Direction.SEND, port), (Direction.RECV, port)],
+        )
+        self.assertEqual(records[0][3], msg.to_bytes())
+        self.assertEqual(records[1][3], msg.to_bytes())
+        self.assertLessEqual(records[0][0], records[1][0])
+
+
+    def test_real_time_motion(self):
+        state = SimpleMessage(
+            Header(
+                MsgType.MOTO_REALTIME_MOTION_JOINT_STATE_EX,
+                CommType.TOPIC,
+                ReplyType.INVALID,
+            ),
+            MotoRealTimeMotionJointStateEx(
+                7,
+                MotoRealTimeMotionMode.JOINT_VELOCITY,
+                1,
+                [MotoRealTimeMotionJointStateExData(0, [0.5] * 6, [0.0] * 6)],
+            ),
+        )
+        command = MotoRealTimeMotionJointCommandEx(
+            7, 1, [MotoRealTimeMotionJointCommandExData(0, [0.1] * 6)]
+        )
+        controller = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        controller.settimeout(5.0)
+        self.addCleanup(controller.close)
+
+        with CaptureWriter(self.path) as writer:
+            server = RealTimeMotionServer("127.0.0.1", 0, recorder=writer)
+            server.start()
+            self.addCleanup(server.close)
+            server.settimeout(5.0)
+            controller.sendto(state.to_bytes(), server.address)
+            self.assertEqual(server.recv_state(), state.body)
+            server.send_command(command)
+            reply, _ = controller.recvfrom(1024)
+
+        records = read_records(self.path)
+        # Recorded as received and sent by this host, the state at its arrival
+        self.assertEqual(
+            [(direction, data) for _, direction, _, data in records],
+            [(Direction.RECV, state.to_bytes()), (Direction.SEND, reply)],
+        )
+        self.assertEqual(records[0][0], server.arrival_ns * 1e-9)
+        self.assertEqual(
+            {port for _, _, port, _ in records}, {server.address[1]}
+        )
+        self.assertEqual(SimpleMessage.from_bytes(reply).body, command)
+
+if __name__ == "__main__":
+    unittest.main()
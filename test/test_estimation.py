@@ -0,0 +1,123 @@
+import unittest
+from unittest import mock
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from moto.simple_message import JointFeedback, ValidFields
+
+if np is not None:
+    from moto.estimation import AlphaBetaGammaEstimator
+
+
+@unittest.skipIf(np is None, "requires numpy")
+class TestAlphaBetaGammaEstimator(unittest.TestCase):
+    def test_first_sample(self):
+        estimator = AlphaBetaGammaEstimator()
+        self.assertIsNone(estimator.estimate(0))
+        estimate = estimator.update(0, 1.0, [1.0, 2.0])
+        self.assertIs(estimator.estimate(0), estimate)
+        self.assertEqual(estimate.time, 1.0)
+        np.testing.assert_array_equal(estimate.pos[:2], [1.0, 2.0])
+        np.testing.assert_array_equal(estimate.vel, 0.0)
+        self.assertIsNone(estimator.estimate(1))
+
+    def test_constant_acceleration(self):
+        estimator = AlphaBetaGammaEstimator()
+        acc = np.linspace(-1.0, 1.0, 10)
+        vel0 = np.linspace(0.5, -0.5, 10)
+        for k in range(500):
+            t = k * 0.004
+            estimate = estimator.update(1, t, vel0 * t + 0.5 * acc * t * t)
+        np.testing.assert_allclose(estimate.vel, vel0 + acc * t, atol=1e-6)
+        np.testing.assert_allclose(estimate.acc, acc, atol=1e-4)
+
+    def test_alpha_beta(self):
+        estimator = AlphaBetaGammaEstimator(0.5, 0.1, 0.0)
+        for k in range(500):
+            estimate = estimator.update(0, k * 0.01, [2.0 * k * 0.01] * 10)
+        np.testing.assert_allclose(estimate.vel, 2.0, atol=1e-6)
+        np.testing.assert_array_equal(estimate.acc, 0.0)
+
+    def test_critically_damped(self):
+        estimator = AlphaBetaGammaEstimator.critically_damped(0.5)
+        self.assertEqual(
+            (estimator._alpha, estimator._beta, estimator._gamma),
+            (0.875, 0.5625, 0.0625),
+        )
+
+    def test_repeated_sample(self):
+        estimator = AlphaBetaGammaEstimator()
+        estimator.update(0, 0.0, [0.0] * 10)
+        estimate = estimator.update(0, 0.1, [1.0] * 10)
+        self.assertIs(estimator.update(0, 0.1, [5.0] * 10), estimate)
+        self.assertIs(estimator.update(0, 0.05, [5.0] * 10), estimate)
+
+    def test_reset(self):
+        estimator = AlphaBetaGammaEstimator()
+        estimator.update(0, 0.0, [0.0] * 10)
+        estimator.update(0, 0.1, [1.0] * 10)
+        estimator.reset(0)
+        self.assertIsNone(estimator.estimate(0))
+        np.testing.assert_array_equal(estimator.update(0, 5.0, [3.0] * 10).vel, 0.0)
+
+    def test_feedback(self):
+        estimator = AlphaBetaGammaEstimator()
+        feedback = JointFeedback(
+            2,
+            ValidFields.TIME | ValidFields.POSITION,
+            3.0,
+            [1.0] * 10,
+            [0.0] * 10,
+            [0.0] * 10,
+        )
+        self.assertEqual(estimator.update_feedback(feedback).time, 3.0)
+        self.assertIsNotNone(estimator.estimate(2))
+
+    def test_feedback_time_not_advancing(self):
+        # Like the simulator, which sends a valid time that is always 0.0
+        estimator = AlphaBetaGammaEstimator()
+        with mock.patch("moto.estimation.time.monotonic") as monotonic:
+            for k in range(200):
+                monotonic.return_value = 100.0 + k * 0.01
+                feedback = JointFeedback(
+                    0,
+                    ValidFields.TIME | ValidFields.POSITION,
+                    0.0,
+                    [0.5 * k * 0.01] * 10,
+                    [0.0] * 10,
+                    [0.0] * 10,
+                )
+                estimate = estimator.update_feedback(feedback)
+        self.assertAlmostEqual(estimate.time, 101.99)
+        np.testing.assert_allclose(estimate.vel, 0.5, atol=1e-6)
+
+    def test_feedback_time_reset(self):
+        estimator = AlphaBetaGammaEstimator()
+        for t in (10.0, 10.1, 0.0):
+            feedback = JointFeedback(
+                0,
+                ValidFields.TIME | ValidFields.POSITION,
+                t,
+                [t] * 10,
+                [0.0] * 10,
+                [0.0] * 10,
+            )
+            estimate = estimator.update_feedback(feedback)
+        self.assertEqual(estimate.time, 0.0)
+        np.testing.assert_array_equal(estimate.pos, 0.0)
+        np.testing.assert_array_equal(estimate.vel, 0.0)
+
+    def test_invalid_gains(self):
+        with self.assertRaises(ValueError):
+            AlphaBetaGammaEstimator(alpha=0.0)
+        with self.assertRaises(ValueError):
+            AlphaBetaGammaEstimator(beta=-1.0)
+        with self.assertRaises(ValueError):
+            AlphaBetaGammaEstimator.critically_damped(1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
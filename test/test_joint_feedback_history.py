@@ -0,0 +1,77 @@
+import unittest
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from moto.simple_message import JointFeedback, ValidFields
+
+if np is not None:
+    from moto.joint_feedback_history import JointFeedbackHistory
+
+
+def joint_feedback(time: float) -> JointFeedback:
+    return JointFeedback(
+        0,
+        ValidFields.TIME | ValidFields.POSITION | ValidFields.VELOCITY,
+        time,
+        [time] * 6,
+        [2.0 * time] * 6,
+        [0.0] * 6,
+    )
+
+
+@unittest.skipIf(np is None, "requires numpy")
+class TestJointFeedbackHistory(unittest.TestCase):
+    def setUp(self):
+        self.history = JointFeedbackHistory(capacity=8)
+        for k in range(12):
+            self.history.append(joint_feedback(float(k)), stamp=100.0 + k)
+
+    def test_last(self):
+        self.assertEqual(len(self.history), 8)
+        self.assertEqual(self.history.count, 12)
+
+        samples = self.history.last(3)
+        np.testing.assert_array_equal(samples.time, [9.0, 10.0, 11.0])
+        np.testing.assert_array_equal(samples.stamp, [109.0, 110.0, 111.0])
+        np.testing.assert_array_equal(samples.pos[:, 0], [9.0, 10.0, 11.0])
+        np.testing.assert_array_equal(samples.vel[:, 5], [18.0, 20.0, 22.0])
+        self.assertEqual(samples.pos.shape, (3, 10))
+
+        # The full history wraps around the end of the buffer
+        np.testing.assert_array_equal(self.history.last().time, np.arange(4.0, 12.0))
+
+    def test_last_view(self):
+        view = self.history.last_view(3)
+        np.testing.assert_array_equal(view.time, [9.0, 10.0, 11.0])
+        self.assertFalse(view.time.flags.owndata)
+        self.assertIsNone(self.history.last_view(8))
+
+    def test_between(self):
+        samples = self.history.between(105.0, 108.0)
+        np.testing.assert_array_equal(samples.time, [5.0, 6.0, 7.0])
+        samples = self.history.between(6.5, 100.0, clock="time")
+        np.testing.assert_array_equal(samples.time, np.arange(7.0, 12.0))
+        self.assertEqual(len(self.history.between(0.0, 1.0)), 0)
+
+    def test_interpolate(self):
+        samples = self.history.interpolate([104.0, 106.25, 111.0, 112.0])
+        np.testing.assert_allclose(samples.time[:3], [4.0, 6.25, 11.0])
+        np.testing.assert_allclose(samples.pos[:3, 0], [4.0, 6.25, 11.0])
+        np.testing.assert_allclose(samples.vel[:3, 0], [8.0, 12.5, 22.0])
+        self.assertTrue(np.all(np.isnan(samples.pos[3])))
+
+        samples = self.history.interpolate(np.array([7.5]), clock="time")
+        np.testing.assert_allclose(samples.stamp, [107.5])
+
+    def test_overwritten_while_copying(self):
+        # Pretend the writer has started writing sample 12, which overwrites
+        # the oldest sample 4
+        self.history._started += 1
+        np.testing.assert_array_equal(self.history.last().time, np.arange(5.0, 12.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
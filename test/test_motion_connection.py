@@ -0,0 +1,230 @@
+import socket
+import threading
+import unittest
+
+from moto.motion_connection import MotionConnection
+from moto.packed_trajectory import GroupTrajectory, pack_joint_trajectory_ex
+from moto.simple_message import (
+    CommType,
+    Header,
+    JointTrajPtExData,
+    JointTrajPtFull,
+    JointTrajPtFullEx,
+    MotoMotionReply,
+    MsgType,
+    ReplyType,
+    ResultType,
+    SimpleMessage,
+    ValidFields,
+)
+from moto.simple_message_connection import MessageFramer
+
+
+def joint_traj_pt_full(groupno: int, sequence: int) -> JointTrajPtFull:
+    return JointTrajPtFull(
+        groupno,
+        sequence,
+        ValidFields.TIME | ValidFields.POSITION,
+        float(sequence),
+        [0.0] * 10,
+        [0.0] * 10,
+        [0.0] * 10,
+    )
+
+
+def joint_traj_pt_full_ex(sequence: int) -> JointTrajPtFullEx:
+    return JointTrajPtFullEx(
+        number_of_valid_groups=1,
+        sequence=sequence,
+        joint_traj_pt_data=[
+            JointTrajPtExData(
+                groupno=0,
+                valid_fields=ValidFields.TIME | ValidFields.POSITION,
+                time=float(sequence),
+                pos=[0.0] * 10,
+                vel=[0.0] * 10,
+                acc=[0.0] * 10,
+            )
+        ],
+    )
+
+
+class FakeMotionServer:
+    """Replies to every request with `result(request)`, SUCCESS by default."""
+
+    def __init__(self, result=None) -> None:
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.bind(("127.0.0.1", 0))
+        self._server.listen()
+        self.port: int = self._server.getsockname()[1]
+        self._result = result or (lambda request: ResultType.SUCCESS)
+        self.requests = []
+        self._conn = None
+        threading.Thread(target=self._worker, daemon=True).start()
+
+    def _worker(self) -> None:
+        try:
+            self._conn, _ = self._server.accept()
+            self._serve()
+        except OSError:
+            # Closed by the test
+            pass
+
+    def _serve(self) -> None:
+        framer = MessageFramer()
+        while True:
+            nbytes = self._conn.recv_into(framer.writable())
+            if nbytes == 0:
+                return
+            framer.commit(nbytes)
+            for frame in framer.frames():
+                request = SimpleMessage.from_bytes(frame)
+                self.requests.append(request)
+                body = request.body
+                groupno = -1
+                if request.header.msg_type == MsgType.JOINT_TRAJ_PT_FULL:
+                    groupno = body.groupno
+                reply = SimpleMessage(
+                    Header(
+                        MsgType.MOTO_MOTION_REPLY,
+                        CommType.SERVICE_REPLY,
+                        ReplyType.SUCCESS,
+                    ),
+                    MotoMotionReply(
+                        groupno,
+                        body.sequence,
+                        request.header.msg_type,
+                        self._result(body),
+                        0,
+                    ),
+                )
+                self._conn.sendall(reply.to_bytes())
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+        self._server.close()
+
+
+class CountingMotionConnection(MotionConnection):
+    """Records the largest number of points sent without a reply."""
+
+    def __init__(self, port: int) -> None:
+        self.TCP_PORT_MOTION = port
+        super().__init__("127.0.0.1")
+        self.sent = 0
+        self.replied = 0
+        self.max_in_flight = 0
+
+    def send_frame(self, frame) -> None:
+        super().send_frame(frame)
+        self.sent += 1
+        self.max_in_flight = max(self.max_in_flight, self.sent - self.replied)
+
+    def on_result(self, result) -> None:
+        self.replied += 1
+
+
+class TestStreamJointTrajectory(unittest.TestCase):
+    def connect(self, result=None) -> CountingMotionConnection:
+        self.server = FakeMotionServer(result)
+        self.addCleanup(self.server.close)
+        connection = CountingMotionConnection(self.server.port)
+        connection.start()
+        self.addCleanup(connection.close)
+        return connection
+
+    def test_window(self):
+        connection = self.connect()
+        points = [joint_traj_pt_full(0, k) for k in range(50)]
+
+        results = connection.stream_joint_trajectory(
+            iter(points), window=8, callback=connection.on_result
+        )
+
+        self.assertEqual([result.index for result in results], list(range(50)))
+        self.assertEqual([result.point for result in results], points)
+        self.assertTrue(all(result.success for result in results))
+        self.assertEqual([result.reply.sequence for result in results], list(range(50)))
+        self.assertEqual(connection.max_in_flight, 8)
+        self.assertEqual(connection.replied, 50)
+
+    def test_groups_share_sequences(self):
+        connection = self.connect()
+        points = [joint_traj_pt_full(k % 2, k // 2) for k in range(10)]
+        results = connection.stream_joint_trajectory(points, window=4)
+        self.assertEqual(
+            [(r.reply.groupno, r.reply.sequence) for r in results],
+            [(k % 2, k // 2) for k in range(10)],
+        )
+
+    def test_full_ex(self):
+        connection = self.connect()
+        results = connection.stream_joint_trajectory(
+            [joint_traj_pt_full_ex(k) for k in range(10)], window=3
+        )
+        self.assertEqual([r.reply.sequence for r in results], list(range(10)))
+
+    def test_stop_on_error(self):
+        connection = self.connect(
+            lambda point: ResultType.BUSY if point.sequence == 3 else ResultType.SUCCESS
+        )
+        results = connection.stream_joint_trajectory(
+            [joint_traj_pt_full(0, k) for k in range(20)], window=4
+        )
+        # The points in flight when the failure was received were replied to
+        self.assertLess(len(results), 20)
+        self.assertGreaterEqual(len(results), 4)
+        self.assertEqual(len(results), len(self.server.requests))
+        self.assertIs(results[3].reply.result, ResultType.BUSY)
+        self.assertEqual([r.success for r in results[:3]], [True] * 3)
+
+    def test_packed(self):
+        connection = self.connect()
+        packed = pack_joint_trajectory_ex(
+            [GroupTrajectory(0, [float(k) for k in range(10)], [[0.1] * 6] * 10)]
+        )
+        results = connection.stream_joint_trajectory(packed, window=3)
+        self.assertEqual([r.reply.sequence for r in results], list(range(10)))
+        # Accepted points are not decoded
+        self.assertEqual([r.point for r in results], [None] * 10)
+        # Sent as packed
+        self.assertEqual(
+            [request.to_bytes() for request in self.server.requests],
+            [bytes(frame) for frame in packed],
+        )
+
+    def test_packed_error(self):
+        connection = self.connect(
+            lambda point: ResultType.BUSY if point.sequence == 3 else ResultType.SUCCESS
+        )
+        packed = pack_joint_trajectory_ex(
+            [GroupTrajectory(0, [float(k) for k in range(10)], [[0.1] * 6] * 10)]
+        )
+        results = connection.stream_joint_trajectory(packed, window=2)
+        self.assertIs(results[3].reply.result, ResultType.BUSY)
+        self.assertEqual(results[3].point, packed.point(3))
+        self.assertIsNone(results[2].point)
+
+    def test_request_frame(self):
+        connection = self.connect()
+        packed = pack_joint_trajectory_ex(
+            [GroupTrajectory(0, [0.0], [[0.0] * 6])], sequence_start=7
+        )
+        reply = connection.request_frame(packed.message(0), packed.sequence(0))
+        self.assertEqual(reply.result(timeout=5.0).body.sequence, 7)
+
+    def test_duplicate_sequence(self):
+        connection = self.connect()
+        with self.assertRaises(ValueError):
+            connection.stream_joint_trajectory(
+                [joint_traj_pt_full(0, 0), joint_traj_pt_full(0, 0)], window=2
+            )
+
+    def test_invalid_window(self):
+        with self.assertRaises(ValueError):
+            MotionConnection("127.0.0.1").stream_joint_trajectory([], window=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
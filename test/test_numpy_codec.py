@@ -0,0 +1,119 @@
+import unittest
+
+try:
+    import numpy as np
+    from moto import numpy_codec
+except ImportError:
+    np = None
+
+from moto.simple_message import (
+    CommType,
+    Header,
+    JointFeedback,
+    JointFeedbackEx,
+    MotoRealTimeMotionJointStateEx,
+    MotoRealTimeMotionJointStateExData,
+    MotoRealTimeMotionMode,
+    MsgType,
+    ReplyType,
+    SimpleMessage,
+    SimpleMessageError,
+)
+
+
+def joint_feedback(groupno: int, time: float) -> JointFeedback:
+    return JointFeedback(
+        groupno=groupno,
+        valid_fields=3,
+        time=time,
+        pos=[time + k for k in range(10)],
+        vel=[0.0] * 10,
+        acc=[0.0] * 10,
+    )
+
+
+@unittest.skipIf(np is None, "requires numpy")
+class TestNumpyCodec(unittest.TestCase):
+    def test_decode_joint_feedback(self):
+        msgs = [
+            SimpleMessage(
+                Header(MsgType.JOINT_FEEDBACK, CommType.TOPIC, ReplyType.INVALID),
+                joint_feedback(0, float(k)),
+            )
+            for k in range(5)
+        ]
+
+        array = numpy_codec.decode(
+            b"".join(msg.to_bytes() for msg in msgs), MsgType.JOINT_FEEDBACK
+        )
+
+        self.assertEqual(len(array), 5)
+        np.testing.assert_array_equal(array["time"], np.arange(5))
+        np.testing.assert_array_equal(array["pos"][:, 3], np.arange(5) + 3)
+
+    def test_decode_joint_feedback_ex(self):
+        msg = SimpleMessage(
+            Header(MsgType.MOTO_JOINT_FEEDBACK_EX, CommType.TOPIC, ReplyType.INVALID),
+            JointFeedbackEx(2, [joint_feedback(0, 1.0), joint_feedback(1, 2.0)]),
+        )
+
+        array = numpy_codec.decode(
+            msg.to_bytes() * 3, MsgType.MOTO_JOINT_FEEDBACK_EX, 2
+        )
+
+        self.assertEqual(array.shape, (3,))
+        np.testing.assert_array_equal(
+            array["joint_feedback_data"]["groupno"], [[0, 1]] * 3
+        )
+        np.testing.assert_array_equal(
+            array["joint_feedback_data"]["time"], [[1.0, 2.0]] * 3
+        )
+
+    def test_encode_round_trip(self):
+        msg = SimpleMessage(
+            Header(
+                MsgType.MOTO_REALTIME_MOTION_JOINT_STATE_EX,
+                CommType.TOPIC,
+                ReplyType.INVALID,
+            ),
+            MotoRealTimeMotionJointStateEx(
+                7,
+                MotoRealTimeMotionMode.JOINT_VELOCITY,
+                1,
+                [MotoRealTimeMotionJointStateExData(0, [0.5] * 6, [0.25] * 6)],
+            ),
+        )
+        bytes_ = msg.to_bytes()
+
+        array = numpy_codec.decode(
+            bytes_, MsgType.MOTO_REALTIME_MOTION_JOINT_STATE_EX, 1
+        )
+        self.assertEqual(
+            numpy_codec.encode(array, MsgType.MOTO_REALTIME_MOTION_JOINT_STATE_EX, 1),
+            bytes_,
+        )
+
+        body = np.zeros(
+            1, numpy_codec.body_dtype(MsgType.MOTO_REALTIME_MOTION_JOINT_STATE_EX, 1)
+        )
+        body["message_id"] = 7
+        body["mode"] = MotoRealTimeMotionMode.JOINT_VELOCITY.value
+        body["number_of_valid_groups"] = 1
+        body["joint_state_data"]["pos"][0, 0, :6] = 0.5
+        body["joint_state_data"]["vel"][0, 0, :6] = 0.25
+        self.assertEqual(
+            numpy_codec.encode(body, MsgType.MOTO_REALTIME_MOTION_JOINT_STATE_EX, 1),
+            bytes_,
+        )
+
+    def test_decode_wrong_msg_type(self):
+        msg = SimpleMessage(
+            Header(MsgType.JOINT_FEEDBACK, CommType.TOPIC, ReplyType.INVALID),
+            joint_feedback(0, 0.0),
+        )
+        with self.assertRaises(SimpleMessageError):
+            numpy_codec.decode(msg.to_bytes(), MsgType.JOINT_TRAJ_PT_FULL)
+
+
+if __name__ == "__main__":
+    unittest.main()
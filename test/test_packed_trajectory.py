@@ -0,0 +1,104 @@
+import unittest
+
+from moto.packed_trajectory import (
+    GroupTrajectory,
+    pack_joint_trajectory,
+    pack_joint_trajectory_ex,
+)
+from moto.simple_message import (
+    CommType,
+    Header,
+    JointTrajPtExData,
+    JointTrajPtFull,
+    JointTrajPtFullEx,
+    MsgType,
+    ReplyType,
+    SimpleMessage,
+    SimpleMessageError,
+    ValidFields,
+)
+
+
+class TestPackJointTrajectory(unittest.TestCase):
+    def test_matches_simple_message(self):
+        time = [0.0, 0.5, 1.0]
+        pos = [[0.1 * k] * 6 for k in range(3)]
+        vel = [[0.2 * k] * 6 for k in range(3)]
+
+        packed = pack_joint_trajectory(1, time, pos, vel, sequence_start=4)
+
+        self.assertEqual(len(packed), 3)
+        for k, msg in enumerate(packed):
+            expected = SimpleMessage(
+                Header(
+                    MsgType.JOINT_TRAJ_PT_FULL,
+                    CommType.SERVICE_REQUEST,
+                    ReplyType.INVALID,
+                ),
+                JointTrajPtFull(
+                    groupno=1,
+                    sequence=4 + k,
+                    valid_fields=ValidFields.TIME
+                    | ValidFields.POSITION
+                    | ValidFields.VELOCITY,
+                    time=time[k],
+                    pos=pos[k] + [0.0] * 4,
+                    vel=vel[k] + [0.0] * 4,
+                    acc=[0.0] * 10,
+                ),
+            )
+            self.assertEqual(bytes(msg), expected.to_bytes())
+            self.assertEqual(bytes(packed.message(k)), expected.to_bytes())
+
+    def test_ex_matches_simple_message(self):
+        groups = [
+            GroupTrajectory(0, [0.0, 1.0], [[0.0] * 6, [1.0] * 6]),
+            GroupTrajectory(1, [0.0, 2.0], [[0.0] * 2, [2.0] * 2]),
+        ]
+
+        packed = pack_joint_trajectory_ex(groups)
+
+        self.assertEqual(packed.offsets[1], packed.msg_size)
+        for k, msg in enumerate(packed):
+            expected = SimpleMessage(
+                Header(
+                    MsgType.MOTO_JOINT_TRAJ_PT_FULL_EX,
+                    CommType.SERVICE_REQUEST,
+                    ReplyType.INVALID,
+                ),
+                JointTrajPtFullEx(
+                    number_of_valid_groups=2,
+                    sequence=k,
+                    joint_traj_pt_data=[
+                        JointTrajPtExData(
+                            groupno=group.groupno,
+                            valid_fields=ValidFields.TIME | ValidFields.POSITION,
+                            time=group.time[k],
+                            pos=group.pos[k] + [0.0] * (10 - len(group.pos[k])),
+                            vel=[0.0] * 10,
+                            acc=[0.0] * 10,
+                        )
+                        for group in groups
+                    ],
+                ),
+            )
+            self.assertEqual(bytes(msg), expected.to_bytes())
+
+    def test_mismatched_lengths(self):
+        with self.assertRaises(SimpleMessageError):
+            pack_joint_trajectory(0, [0.0, 1.0], [[0.0] * 6])
+        with self.assertRaises(SimpleMessageError):
+            pack_joint_trajectory(0, [0.0, 1.0], [[0.0] * 6, [0.0] * 5])
+        with self.assertRaises(SimpleMessageError):
+            pack_joint_trajectory(0, [0.0], [[0.0] * 11])
+        with self.assertRaises(SimpleMessageError):
+            pack_joint_trajectory_ex(
+                [
+                    GroupTrajectory(0, [0.0, 1.0], [[0.0] * 6] * 2),
+                    GroupTrajectory(1, [0.0], [[0.0] * 2]),
+                ]
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+import os
+import socket
+import tempfile
+import time
+import unittest
+
+from moto.capture import CaptureWriter, Direction
+from moto.simple_message import (
+    CommType,
+    Header,
+    JointFeedback,
+    MotoRealTimeMotionJointStateEx,
+    MotoRealTimeMotionJointStateExData,
+    MotoRealTimeMotionMode,
+    MsgType,
+    ReplyType,
+    SimpleMessage,
+    ValidFields,
+)
+from moto.simple_message_connection import SimpleMessageConnection
+from moto.sim.replay_server import ReplayServer
+
+
+def free_port(kind=socket.SOCK_STREAM) -> int:
+    with socket.socket(socket.AF_INET, kind) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def joint_feedback_msg(time: float) -> SimpleMessage:
+    return SimpleMessage(
+        Header(MsgType.JOINT_FEEDBACK, CommType.TOPIC, ReplyType.INVALID),
+        JointFeedback(
+            0,
+            ValidFields.TIME | ValidFields.POSITION,
+            time,
+            [time] * 10,
+            [0.0] * 10,
+            [0.0] * 10,
+        ),
+    )
+
+
+def rt_state_msg(message_id: int) -> SimpleMessage:
+    return SimpleMessage(
+        Header(
+            MsgType.MOTO_REALTIME_MOTION_JOINT_STATE_EX,
+            CommType.TOPIC,
+            ReplyType.INVALID,
+        ),
+        MotoRealTimeMotionJointStateEx(
+            message_id,
+            MotoRealTimeMotionMode.JOINT_VELOCITY,
+            1,
+            [MotoRealTimeMotionJointStateExData(0, [0.0] * 10, [0.0] * 10)],
+        ),
+    )
+
+
+def connect(port: int, timeout: float = 5.0) -> SimpleMessageConnection:
+    deadline = time.monotonic() + timeout
+    while True:
+        connection = SimpleMessageConnection(("127.0.0.1", port))
+        try:
+            connection.start()
+            return connection
+        except ConnectionRefusedError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.01)
+
+
+class TestReplayServer(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".cap")
+        os.close(fd)
+        os.remove(self.path)
+        with CaptureWriter(self.path) as writer:
+            for k in range(50):
+                timestamp = 0.01 * k
+                writer.record(
+                    Direction.RECV,
+                    ReplayServer.TCP_PORT_STATE,
+                    joint_feedback_msg(timestamp).to_bytes(),
+                    timestamp=timestamp,
+                )
+                writer.record(
+                    Direction.SEND,
+                    ReplayServer.UDP_PORT_REALTIME_MOTION,
+                    rt_state_msg(k).to_bytes(),
+                    timestamp=timestamp,
+                )
+
+    def tearDown(self):
+        for path in (self.path, self.path + ".idx"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def replay(self, speed):
+        udp_port = free_port(socket.SOCK_DGRAM)
+        udp_server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        udp_server.bind(("127.0.0.1", udp_port))
+        udp_server.settimeout(5.0)
+
+        state_port = free_port()
+        server = ReplayServer(
+            self.path,
+            ip_address="127.0.0.1",
+            client_ip_address="127.0.0.1",
+            speed=speed,
+            state_port=state_port,
+            realtime_motion_port=udp_port,
+        )
+        server.start()
+        connection = connect(state_port)
+        start = time.monotonic()
+        frames = [bytes(connection.recv_frame()) for _ in range(50)]
+        elapsed = time.monotonic() - start
+        message_ids = [
+            SimpleMessage.from_bytes(udp_server.recv(1024)).body.message_id
+            for _ in range(50)
+        ]
+        self.assertTrue(server.wait(5.0))
+        server.close()
+        udp_server.close()
+
+        self.assertEqual(
+            frames, [joint_feedback_msg(0.01 * k).to_bytes() for k in range(50)]
+        )
+        self.assertEqual(message_ids, list(range(50)))
+        self.assertEqual(server.sent_state, 50)
+        self.assertEqual(server.sent_realtime_motion, 50)
+        return elapsed
+
+    def test_as_fast_as_possible(self):
+        self.replay(None)
+
+    def test_speed(self):
+        # 0.49 s of recorded traffic played ten times faster
+        elapsed = self.replay(10.0)
+        self.assertGreater(elapsed, 0.04)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,210 @@
+import socket
+import threading
+import unittest
+from concurrent import futures
+
+from moto.io_connection import IoConnection
+from moto.motion_connection import MotionConnection
+from moto.simple_message import (
+    CommType,
+    Header,
+    IoResultCodes,
+    JointTrajPtFull,
+    MotoIoCtrlReply,
+    MotoMotionReply,
+    MotoReadIO,
+    MotoReadIOReply,
+    MsgType,
+    ReplyType,
+    ResultType,
+    SimpleMessage,
+    ValidFields,
+)
+from moto.simple_message_connection import MessageFramer
+
+
+def reply_msg(msg_type: MsgType, body) -> SimpleMessage:
+    header = Header(msg_type, CommType.SERVICE_REPLY, ReplyType.SUCCESS)
+    return SimpleMessage(header, body)
+
+
+class FakeServiceServer:
+    """Replies to every request with the replies returned by `handler`."""
+
+    def __init__(self, handler) -> None:
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.bind(("127.0.0.1", 0))
+        self._server.listen()
+        self.port: int = self._server.getsockname()[1]
+        self._handler = handler
+        self._conn = None
+        threading.Thread(target=self._worker, daemon=True).start()
+
+    def _worker(self) -> None:
+        try:
+            self._conn, _ = self._server.accept()
+            framer = MessageFramer()
+            while True:
+                nbytes = self._conn.recv_into(framer.writable())
+                if nbytes == 0:
+                    return
+                framer.commit(nbytes)
+                for frame in framer.frames():
+                    replies = self._handler(SimpleMessage.from_bytes(frame))
+                    data = b"".join(reply.to_bytes() for reply in replies)
+                    self._conn.sendall(data)
+        except OSError:
+            # Closed by the test
+            pass
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+        self._server.close()
+
+
+def motion_reply(request: SimpleMessage, subcode: int = 0) -> SimpleMessage:
+    return reply_msg(
+        MsgType.MOTO_MOTION_REPLY,
+        MotoMotionReply(
+            request.body.groupno,
+            request.body.sequence,
+            request.header.msg_type,
+            ResultType.SUCCESS,
+            subcode,
+        ),
+    )
+
+
+def read_io_bit_msg(address: int) -> SimpleMessage:
+    return SimpleMessage(
+        Header(MsgType.MOTO_READ_IO_BIT, CommType.SERVICE_REQUEST, ReplyType.INVALID),
+        MotoReadIO(address),
+    )
+
+
+def point(sequence: int) -> JointTrajPtFull:
+    return JointTrajPtFull(
+        0, sequence, ValidFields.TIME, 0.0, [0.0] * 10, [0.0] * 10, [0.0] * 10
+    )
+
+
+class TestServiceConnection(unittest.TestCase):
+    def connect(self, cls, handler):
+        server = FakeServiceServer(handler)
+        self.addCleanup(server.close)
+        connection = cls("127.0.0.1")
+        connection._tcp_client._address = ("127.0.0.1", server.port)
+        connection.start()
+        self.addCleanup(connection.close)
+        return connection
+
+    def test_concurrent_requests(self):
+        # The queue count of a group is its group number
+        connection = self.connect(
+            MotionConnection,
+            lambda request: [motion_reply(request, subcode=request.body.groupno)],
+        )
+        errors = []
+
+        def check(groupno: int) -> None:
+            for _ in range(50):
+                reply = connection.check_queue_count(groupno)
+                if reply.body.groupno != groupno or reply.body.subcode != groupno:
+                    errors.append((groupno, reply.body))
+
+        threads = [threading.Thread(target=check, args=(g,)) for g in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10.0)
+        self.assertEqual(errors, [])
+
+    def test_replies_matched_by_sequence(self):
+        held = []
+
+        def handler(request):
+            # Reply to the trajectory points in pairs, in reverse order
+            held.append(request)
+            if len(held) < 2:
+                return []
+            replies = [motion_reply(r) for r in reversed(held)]
+            held.clear()
+            return replies
+
+        connection = self.connect(MotionConnection, handler)
+        first = connection.request(connection._joint_trajectory_point_msg(point(1)))
+        second = connection.request(connection._joint_trajectory_point_msg(point(2)))
+        self.assertEqual(first.result(5.0).body.sequence, 1)
+        self.assertEqual(second.result(5.0).body.sequence, 2)
+
+    def test_io_error_reply(self):
+        def handler(request):
+            if request.body.address == 0:
+                return [
+                    reply_msg(
+                        MsgType.MOTO_IOCTRL_REPLY,
+                        MotoIoCtrlReply(ResultType.FAILURE, 0),
+                    )
+                ]
+            return [
+                reply_msg(
+                    MsgType.MOTO_READ_IO_BIT_REPLY,
+                    MotoReadIOReply(request.body.address, IoResultCodes.OK),
+                )
+            ]
+
+        connection = self.connect(IoConnection, handler)
+        self.assertEqual(
+            connection.read_io_bit(0).header.msg_type, MsgType.MOTO_IOCTRL_REPLY
+        )
+        self.assertEqual(connection.read_io_bit(27010).body.value, 27010)
+
+    def test_timeout(self):
+        def handler(request):
+            # No reply to the read of address 0
+            if request.body.address == 0:
+                return []
+            return [
+                reply_msg(
+                    MsgType.MOTO_READ_IO_BIT_REPLY,
+                    MotoReadIOReply(request.body.address, IoResultCodes.OK),
+                )
+            ]
+
+        connection = self.connect(IoConnection, handler)
+        with self.assertRaises(futures.TimeoutError):
+            connection.send_and_recv(read_io_bit_msg(0), timeout=0.05)
+        # Fails instead of being matched with the reply to the timed out read
+        with self.assertRaises(ConnectionError):
+            connection.request(read_io_bit_msg(27010)).result(5.0)
+
+    def test_cancelled_request(self):
+        held = []
+
+        def handler(request):
+            # Reply to both requests once the second one is received
+            held.append(request)
+            if len(held) < 2:
+                return []
+            return [motion_reply(r) for r in held]
+
+        connection = self.connect(MotionConnection, handler)
+        first = connection.request(connection._joint_trajectory_point_msg(point(1)))
+        self.assertTrue(first.cancel())
+        second = connection.request(connection._joint_trajectory_point_msg(point(1)))
+        self.assertEqual(second.result(5.0).body.sequence, 1)
+        self.assertEqual(len(connection._pending), 0)
+
+    def test_connection_lost(self):
+        connection = self.connect(MotionConnection, lambda request: [])
+        future = connection.request(connection._joint_trajectory_point_msg(point(0)))
+        connection.close()
+        with self.assertRaises(ConnectionError):
+            future.result(5.0)
+        with self.assertRaises(ConnectionError):
+            connection.stop_motion()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+import multiprocessing
+import subprocess
+import sys
+import unittest
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from moto.simple_message import (
+    JointFeedback,
+    PendantMode,
+    RobotStatus,
+    Ternary,
+    ValidFields,
+)
+
+if np is not None:
+    from moto.shared_state import (
+        SharedStateError,
+        SharedStatePublisher,
+        SharedStateReader,
+    )
+
+
+def joint_feedback(groupno: int, time: float) -> JointFeedback:
+    return JointFeedback(
+        groupno,
+        ValidFields.TIME | ValidFields.POSITION,
+        time,
+        [time + k for k in range(10)],
+        [0.0] * 10,
+        [0.0] * 10,
+    )
+
+
+def robot_status() -> RobotStatus:
+    return RobotStatus(
+        Ternary.TRUE,
+        Ternary.FALSE,
+        42,
+        Ternary.FALSE,
+        Ternary.TRUE,
+        PendantMode.AUTO,
+        Ternary.TRUE,
+    )
+
+
+def read_in_other_process(name, queue) -> None:
+    reader = SharedStateReader(name)
+    feedback = reader.joint_feedback(1)
+    queue.put((feedback.time, feedback.pos.tolist(), reader.robot_status()))
+    reader.close()
+
+
+@unittest.skipIf(np is None, "requires numpy")
+class TestSharedState(unittest.TestCase):
+    def setUp(self):
+        self.publisher = SharedStatePublisher()
+        self.reader = SharedStateReader(self.publisher.name)
+
+    def tearDown(self):
+        self.reader.close()
+        self.publisher.close()
+
+    def test_empty(self):
+        self.assertIsNone(self.reader.joint_feedback(0))
+        self.assertIsNone(self.reader.robot_status())
+        self.assertEqual(self.reader.sequence(0), 0)
+
+    def test_joint_feedback(self):
+        self.publisher.write_joint_feedback(joint_feedback(1, 2.0), stamp=10.0)
+        self.assertIsNone(self.reader.joint_feedback(0))
+
+        feedback = self.reader.joint_feedback(1)
+        self.assertEqual(feedback.sequence, 2)
+        self.assertEqual(feedback.stamp, 10.0)
+        self.assertEqual(feedback.groupno, 1)
+        self.assertEqual(feedback.valid_fields, ValidFields.TIME | ValidFields.POSITION)
+        self.assertEqual(feedback.time, 2.0)
+        np.testing.assert_array_equal(feedback.pos, np.arange(10) + 2.0)
+
+        # Copies are not modified, views are
+        view = self.reader.view(1)
+        self.publisher.write_joint_feedback(joint_feedback(1, 3.0))
+        self.assertEqual(feedback.time, 2.0)
+        self.assertEqual(view["time"], 3.0)
+        self.assertEqual(self.reader.sequence(1), 4)
+        del view
+
+    def test_robot_status(self):
+        self.publisher.write_robot_status(robot_status())
+        self.assertEqual(self.reader.robot_status(), robot_status())
+        self.assertEqual(self.reader.robot_status_sequence(), 2)
+
+    def test_not_a_shared_state_block(self):
+        from multiprocessing.shared_memory import SharedMemory
+
+        shm = SharedMemory(create=True, size=4096)
+        try:
+            with self.assertRaises(SharedStateError):
+                SharedStateReader(shm.name)
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def test_other_process(self):
+        self.publisher.write_joint_feedback(joint_feedback(1, 5.0))
+        self.publisher.write_robot_status(robot_status())
+        context = multiprocessing.get_context("spawn")
+        queue = context.Queue()
+        process = context.Process(
+            target=read_in_other_process, args=(self.publisher.name, queue)
+        )
+        process.start()
+        time, pos, status = queue.get(timeout=30.0)
+        process.join(30.0)
+        self.assertEqual(process.exitcode, 0)
+        self.assertEqual(time, 5.0)
+        self.assertEqual(pos, [5.0 + k for k in range(10)])
+        self.assertEqual(status, robot_status())
+
+    def test_reader_exit_keeps_block(self):
+        # A process with its own resource tracker must not remove the block
+        subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import sys; from moto.shared_state import SharedStateReader; "
+                "SharedStateReader(sys.argv[1]).close()",
+                self.publisher.name,
+            ],
+            check=True,
+            timeout=30.0,
+        )
+        SharedStateReader(self.publisher.name).close()
+
+
+if __name__ == "__main__":
+    unittest.main()
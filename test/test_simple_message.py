@@ -1,7 +1,23 @@
+import copy
+import pickle
 import unittest
+from array import array
 
 from moto.simple_message import (
+    CommType,
+    DhLink,
+    DhParameters,
+    Header,
     JointFeedback,
+    JointFeedbackEx,
+    JointTrajPtExData,
+    JointTrajPtFullEx,
+    MotoGetDhParameters,
+    MotoRealTimeMotionJointCommandEx,
+    MotoRealTimeMotionJointCommandExData,
+    MsgType,
+    ReplyType,
+    SimpleMessage,
     JointTrajPtFull,
     MotoMotionCtrl,
     MotoMotionReply,
@@ -41,6 +57,12 @@ class TestRobotStatus(unittest.TestCase):
             robot_status.motion_possible, robot_status_from_bytes.motion_possible
         )
 
+    def test_from_bytes_matches_init(self):
+        robot_status = RobotStatus(1, 0, 4107, 1, -1, 2, 0)
+        self.assertEqual(RobotStatus.from_bytes(robot_status.to_bytes()), robot_status)
+        with self.assertRaises(ValueError):
+            RobotStatus.from_bytes(RobotStatus.struct_.pack(1, 0, 0, 0, 0, 5, 0))
+
 
 class TestJointTrajPtFull(unittest.TestCase):
     def test_to_and_from_bytes(self):
@@ -122,6 +144,49 @@ class TestJointFeedback(unittest.TestCase):
         for a, a_from_bytes in zip(joint_feedback.acc, joint_feedback_from_bytes.acc):
             self.assertAlmostEqual(a, a_from_bytes)
 
+    def test_compact_representation(self):
+        joint_feedback = JointFeedback(
+            groupno=0,
+            valid_fields=ValidFields.TIME | ValidFields.POSITION,
+            time=0.0,
+            pos=[1.0] * 6,
+            vel=[0.0] * 10,
+            acc=[0.0] * 10,
+        )
+
+        self.assertFalse(hasattr(joint_feedback, "__dict__"))
+        self.assertEqual(list(joint_feedback.pos), [1.0] * 6 + [0.0] * 4)
+        self.assertEqual(len(joint_feedback.to_bytes()), JointFeedback.size)
+
+    def test_payload_copied(self):
+        pos = array("f", [1.0] * 10)
+        joint_feedback = JointFeedback(0, ValidFields.POSITION, 0.0, pos, pos, pos)
+        # The array passed in is not shared with the message
+        pos[0] = 2.0
+        self.assertEqual(joint_feedback.pos[0], 1.0)
+        self.assertIsNot(joint_feedback.pos, joint_feedback.vel)
+
+    def test_copy_and_pickle(self):
+        joint_feedback = JointFeedback.from_bytes(
+            JointFeedback(
+                1, ValidFields.POSITION, 0.5, [1.0] * 6, [0.0] * 10, [0.0] * 10
+            ).to_bytes()
+        )
+        self.assertEqual(copy.deepcopy(joint_feedback), joint_feedback)
+        self.assertEqual(pickle.loads(pickle.dumps(joint_feedback)), joint_feedback)
+        self.assertIn("[1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 0.0", repr(joint_feedback))
+
+    def test_from_bytes_matches_init(self):
+        joint_feedback = JointFeedback(
+            2, ValidFields.TIME | ValidFields.POSITION, 0.5, [0.5] * 6, [1.0], []
+        )
+        joint_feedback_from_bytes = JointFeedback.from_bytes(joint_feedback.to_bytes())
+        self.assertEqual(joint_feedback_from_bytes, joint_feedback)
+        self.assertIs(
+            joint_feedback_from_bytes.valid_fields, joint_feedback.valid_fields
+        )
+        self.assertIsNot(joint_feedback_from_bytes.pos, joint_feedback_from_bytes.vel)
+
 
 class TestMotoMotionCtrl(unittest.TestCase):
     def test_to_and_from_bytes(self):
@@ -174,5 +239,122 @@ class TestMotoMotionReply(unittest.TestCase):
             self.assertAlmostEqual(d, d_from_bytes)
 
 
+class TestSimpleMessage(unittest.TestCase):
+    def test_joint_feedback_ex_to_and_from_bytes(self):
+        msg = SimpleMessage(
+            Header(MsgType.MOTO_JOINT_FEEDBACK_EX, CommType.TOPIC, ReplyType.INVALID),
+            JointFeedbackEx(
+                number_of_valid_groups=2,
+                joint_feedback_data=[
+                    JointFeedback(
+                        groupno=groupno,
+                        valid_fields=ValidFields.TIME | ValidFields.POSITION,
+                        time=0.5,
+                        pos=[float(groupno)] * 10,
+                        vel=[0.0] * 10,
+                        acc=[0.0] * 10,
+                    )
+                    for groupno in range(2)
+                ],
+            ),
+        )
+
+        msg_from_bytes = SimpleMessage.from_bytes(msg.to_bytes())
+
+        self.assertEqual(msg_from_bytes.header, msg.header)
+        self.assertEqual(msg_from_bytes.body, msg.body)
+        self.assertIsInstance(msg_from_bytes.body.joint_feedback_data, tuple)
+        self.assertEqual(msg_from_bytes.body.number_of_valid_groups, 2)
+        for groupno, joint_feedback in enumerate(
+            msg_from_bytes.body.joint_feedback_data
+        ):
+            self.assertEqual(joint_feedback.groupno, groupno)
+            self.assertIs(
+                joint_feedback.valid_fields, ValidFields.TIME | ValidFields.POSITION
+            )
+            self.assertEqual(list(joint_feedback.pos), [float(groupno)] * 10)
+
+    def test_joint_traj_pt_full_ex_to_and_from_bytes(self):
+        joint_traj_pt_full_ex = JointTrajPtFullEx(
+            number_of_valid_groups=2,
+            sequence=3,
+            joint_traj_pt_data=[
+                JointTrajPtExData(
+                    groupno=groupno,
+                    valid_fields=ValidFields.TIME | ValidFields.POSITION,
+                    time=2.0,
+                    pos=[0.5 * groupno] * 10,
+                    vel=[0.0] * 10,
+                    acc=[0.0] * 10,
+                )
+                for groupno in range(2)
+            ],
+        )
+
+        bytes_ = joint_traj_pt_full_ex.to_bytes()
+        joint_traj_pt_full_ex_from_bytes = JointTrajPtFullEx.from_bytes(
+            b"\x00" * 4 + bytes_, offset=4
+        )
+
+        self.assertEqual(len(bytes_), joint_traj_pt_full_ex.size)
+        self.assertEqual(joint_traj_pt_full_ex_from_bytes.sequence, 3)
+        for groupno, pt in enumerate(
+            joint_traj_pt_full_ex_from_bytes.joint_traj_pt_data
+        ):
+            self.assertEqual(pt.groupno, groupno)
+            self.assertEqual(list(pt.pos), [0.5 * groupno] * 10)
+        self.assertEqual(joint_traj_pt_full_ex_from_bytes.to_bytes(), bytes_)
+
+    def test_realtime_motion_joint_command_ex_to_and_from_bytes(self):
+        command = MotoRealTimeMotionJointCommandEx(
+            message_id=11,
+            number_of_valid_groups=2,
+            joint_command_data=[
+                MotoRealTimeMotionJointCommandExData(0, [0.25] * 6),
+                MotoRealTimeMotionJointCommandExData(1, [0.5] * 2),
+            ],
+        )
+
+        command_from_bytes = MotoRealTimeMotionJointCommandEx.from_bytes(
+            command.to_bytes()
+        )
+
+        self.assertEqual(command_from_bytes.message_id, 11)
+        self.assertEqual(command_from_bytes.joint_command_data[1].groupno, 1)
+        self.assertEqual(
+            list(command_from_bytes.joint_command_data[1].command),
+            [0.5] * 2 + [0.0] * 8,
+        )
+
+    def test_dh_parameters_to_and_from_bytes(self):
+        dh_parameters = MotoGetDhParameters(
+            [
+                DhParameters(
+                    [DhLink(float(g), float(k), 0.5, -0.5) for k in range(8)]
+                )
+                for g in range(4)
+            ]
+        )
+
+        bytes_ = dh_parameters.to_bytes()
+        dh_parameters_from_bytes = MotoGetDhParameters.from_bytes(bytes_)
+
+        self.assertEqual(len(bytes_), MotoGetDhParameters.size)
+        self.assertEqual(dh_parameters_from_bytes, dh_parameters)
+
+    def test_unknown_reply_values_are_kept(self):
+        bytes_ = MotoMotionReply.struct_.pack(0, 3, 12345, 42, 7, *[0.0] * 10)
+
+        reply_from_bytes = MotoMotionReply.from_bytes(bytes_)
+
+        self.assertEqual(reply_from_bytes.command, 12345)
+        self.assertEqual(reply_from_bytes.result, 42)
+        self.assertEqual(reply_from_bytes.subcode, 7)
+
+    def test_unknown_msg_type_is_invalid(self):
+        header = Header(4242, CommType.TOPIC, ReplyType.INVALID)
+        self.assertIs(header.msg_type, MsgType.INVALID)
+
+
 if __name__ == "__main__":
     unittest.main()
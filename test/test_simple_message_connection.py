@@ -0,0 +1,107 @@
+import unittest
+
+from moto.simple_message import (
+    CommType,
+    Header,
+    JointFeedback,
+    MsgType,
+    ReplyType,
+    SimpleMessage,
+    SimpleMessageError,
+    ValidFields,
+)
+from moto.simple_message_connection import MessageFramer, SimpleMessageConnection
+
+
+def joint_feedback_msg(groupno: int) -> SimpleMessage:
+    return SimpleMessage(
+        Header(MsgType.JOINT_FEEDBACK, CommType.TOPIC, ReplyType.INVALID),
+        JointFeedback(
+            groupno=groupno,
+            valid_fields=ValidFields.TIME | ValidFields.POSITION,
+            time=1.0,
+            pos=[float(groupno)] * 10,
+            vel=[0.0] * 10,
+            acc=[0.0] * 10,
+        ),
+    )
+
+
+class TestMessageFramer(unittest.TestCase):
+    def test_merged_messages(self):
+        framer = MessageFramer()
+        framer.feed(b"".join(joint_feedback_msg(i).to_bytes() for i in range(4)))
+
+        frames = [SimpleMessage.from_bytes(frame) for frame in framer.frames()]
+
+        self.assertEqual(len(frames), 4)
+        for groupno, msg in enumerate(frames):
+            self.assertEqual(msg.header.msg_type, MsgType.JOINT_FEEDBACK)
+            self.assertEqual(msg.body.groupno, groupno)
+        self.assertEqual(framer.pending, 0)
+
+    def test_split_messages(self):
+        framer = MessageFramer(capacity=64)
+        data = b"".join(joint_feedback_msg(i).to_bytes() for i in range(3))
+
+        groupnos = []
+        for k in range(0, len(data), 7):
+            framer.feed(data[k : k + 7])
+            for frame in framer.frames():
+                groupnos.append(SimpleMessage.from_bytes(frame).body.groupno)
+
+        self.assertEqual(groupnos, [0, 1, 2])
+        self.assertEqual(framer.pending, 0)
+
+    def test_recv_into(self):
+        framer = MessageFramer()
+        data = joint_feedback_msg(1).to_bytes()
+
+        buffer = framer.writable()
+        buffer[: len(data) - 1] = data[:-1]
+        framer.commit(len(data) - 1)
+        self.assertIsNone(framer.next_frame())
+
+        framer.writable()[:1] = data[-1:]
+        framer.commit(1)
+        self.assertEqual(bytes(framer.next_frame()), data)
+
+    def test_invalid_length(self):
+        framer = MessageFramer()
+        framer.feed(b"\x00\x00\x00\x00")
+        with self.assertRaises(SimpleMessageError):
+            framer.next_frame()
+
+
+class FakeTcpClient:
+    def __init__(self, reads) -> None:
+        self.reads = list(reads)
+
+    def recv_into(self, buffer: memoryview) -> int:
+        data = self.reads.pop(0)
+        buffer[: len(data)] = data
+        return len(data)
+
+    def close(self) -> None:
+        pass
+
+
+class TestSimpleMessageConnection(unittest.TestCase):
+    def test_arrival_per_read(self):
+        first, second, third = (joint_feedback_msg(i).to_bytes() for i in range(3))
+        connection = SimpleMessageConnection(("127.0.0.1", 0))
+        connection.close()
+        connection._tcp_client = FakeTcpClient([first + second, third])
+
+        arrivals = []
+        for groupno in range(3):
+            self.assertEqual(connection.recv().body.groupno, groupno)
+            arrivals.append(connection.arrival_ns)
+
+        # The first two frames were received in one read
+        self.assertEqual(arrivals[0], arrivals[1])
+        self.assertLess(arrivals[1], arrivals[2])
+
+
+if __name__ == "__main__":
+    unittest.main()
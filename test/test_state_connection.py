@@ -0,0 +1,341 @@
+import socket
+import threading
+import time
+import unittest
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from moto.simple_message import (
+    CommType,
+    Header,
+    JointFeedback,
+    JointFeedbackEx,
+    MsgType,
+    PendantMode,
+    ReplyType,
+    RobotStatus,
+    SimpleMessage,
+    Ternary,
+    ValidFields,
+)
+from moto.control_group import ControlGroup, ControlGroupDefinition
+from moto.robot_status_change import RobotStatusField
+from moto.state_connection import StateConnection
+
+
+def robot_status_msg(in_motion: Ternary = Ternary.FALSE) -> SimpleMessage:
+    return SimpleMessage(
+        Header(MsgType.ROBOT_STATUS, CommType.TOPIC, ReplyType.INVALID),
+        RobotStatus(
+            Ternary.TRUE,
+            Ternary.FALSE,
+            0,
+            Ternary.FALSE,
+            in_motion,
+            PendantMode.AUTO,
+            Ternary.TRUE,
+        ),
+    )
+
+
+def joint_feedback(groupno: int, time: float, pos=None) -> JointFeedback:
+    return JointFeedback(
+        groupno,
+        ValidFields.TIME | ValidFields.POSITION,
+        time,
+        pos if pos is not None else [time] * 10,
+        [0.0] * 10,
+        [0.0] * 10,
+    )
+
+
+def joint_feedback_msg(groupno: int, time: float, pos=None) -> SimpleMessage:
+    return SimpleMessage(
+        Header(MsgType.JOINT_FEEDBACK, CommType.TOPIC, ReplyType.INVALID),
+        joint_feedback(groupno, time, pos),
+    )
+
+
+def joint_feedback_ex_msg(time: float) -> SimpleMessage:
+    return SimpleMessage(
+        Header(MsgType.MOTO_JOINT_FEEDBACK_EX, CommType.TOPIC, ReplyType.INVALID),
+        JointFeedbackEx(1, [joint_feedback(0, time)]),
+    )
+
+
+class FakeStateServer:
+    """Accepts a single StateConnection and sends it the queued messages."""
+
+    def __init__(self) -> None:
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.bind(("127.0.0.1", 0))
+        self._server.listen()
+        self.port: int = self._server.getsockname()[1]
+        self._conn = None
+        self._accepted = threading.Event()
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self) -> None:
+        self._conn, _ = self._server.accept()
+        self._accepted.set()
+
+    def send(self, *msgs: SimpleMessage) -> None:
+        self._accepted.wait(5.0)
+        self._conn.sendall(b"".join(msg.to_bytes() for msg in msgs))
+
+    def send_initial(self) -> None:
+        self.send(
+            robot_status_msg(), joint_feedback_msg(0, 0.0), joint_feedback_ex_msg(0.0)
+        )
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+        self._server.close()
+
+
+def connect(server: FakeStateServer, **kwargs) -> StateConnection:
+    cls = type(
+        "LocalStateConnection", (StateConnection,), {"TCP_PORT_STATE": server.port}
+    )
+    connection = cls("127.0.0.1", **kwargs)
+    threading.Thread(target=server.send_initial, daemon=True).start()
+    connection.start()
+    return connection
+
+
+def wait_for(predicate, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.001)
+    return True
+
+
+class TestStateConnection(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeStateServer()
+        self.connection = None
+
+    def tearDown(self):
+        if self.connection is not None:
+            self.connection.stop()
+        self.server.close()
+
+    def send_later(self, *msgs: SimpleMessage, delay: float = 0.05) -> None:
+        def send():
+            time.sleep(delay)
+            self.server.send(*msgs)
+
+        threading.Thread(target=send).start()
+
+    def test_shared_snapshots(self):
+        received = []
+        connection = self.connection = connect(self.server)
+        connection.add_joint_feedback_msg_callback(received.append)
+
+        self.server.send(joint_feedback_msg(0, 1.0))
+        self.assertTrue(wait_for(lambda: len(received) == 1))
+
+        feedback = connection.joint_feedback(0)
+        self.assertIs(feedback, received[0])
+        self.assertIs(feedback, connection.joint_feedback(0))
+        self.assertEqual(feedback.time, 1.0)
+        self.assertEqual(connection.robot_status(), robot_status_msg().body)
+
+        # A new message replaces, and does not modify, the published snapshot
+        self.server.send(joint_feedback_msg(0, 2.0))
+        self.assertTrue(wait_for(lambda: len(received) == 2))
+        self.assertEqual(feedback.time, 1.0)
+        self.assertEqual(connection.joint_feedback(0).time, 2.0)
+
+    def test_concurrent_callbacks(self):
+        connection = self.connection = connect(self.server)
+        barrier = threading.Barrier(4)
+
+        def add() -> None:
+            barrier.wait()
+            for _ in range(25):
+                connection.add_joint_feedback_msg_callback(lambda msg: None)
+                connection.add_robot_status_change_callback(lambda change: None)
+
+        threads = [threading.Thread(target=add) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10.0)
+        self.assertEqual(len(connection._joint_feedback_subscribers), 100)
+        self.assertEqual(len(connection._robot_status_change_subscribers), 100)
+
+    def test_wait_for(self):
+        connection = self.connection = connect(self.server)
+        self.assertFalse(
+            connection.wait_for(lambda: connection.joint_feedback(0).time > 0.0, 0.05)
+        )
+
+        self.send_later(*(joint_feedback_msg(0, float(k)) for k in range(1, 4)))
+        seen = []
+
+        def predicate():
+            seen.append(connection.joint_feedback(0).time)
+            return seen[-1] >= 2.0
+
+        self.assertTrue(connection.wait_for(predicate, timeout=5.0))
+        # Woken up by the message that satisfied the predicate
+        self.assertEqual(seen[-1], 2.0)
+
+    def test_wait_until_position(self):
+        connection = self.connection = connect(self.server)
+        target = [0.5] * 6
+        self.send_later(
+            joint_feedback_msg(0, 1.0, [0.2] * 6),
+            joint_feedback_msg(0, 2.0, [0.5001] * 6),
+        )
+        self.assertTrue(connection.wait_until_position(0, target, 1e-3, timeout=5.0))
+        self.assertEqual(connection.joint_feedback(0).time, 2.0)
+
+    def test_wait_for_exception(self):
+        connection = self.connection = connect(self.server)
+        calls = []
+
+        def predicate():
+            calls.append(None)
+            if len(calls) > 2:
+                raise ValueError()
+            return False
+
+        self.send_later(joint_feedback_msg(0, 1.0))
+        with self.assertRaises(ValueError):
+            connection.wait_for(predicate, timeout=5.0)
+
+    def test_wait_until_stopped(self):
+        connection = self.connection = connect(self.server)
+        self.server.send(robot_status_msg(Ternary.TRUE))
+        self.assertTrue(
+            wait_for(lambda: connection.robot_status().in_motion is Ternary.TRUE)
+        )
+        self.assertFalse(connection.wait_until_stopped(timeout=0.05))
+        self.send_later(robot_status_msg(Ternary.FALSE))
+        self.assertTrue(connection.wait_until_stopped(timeout=5.0))
+        self.assertTrue(connection.wait_until_motion_possible(timeout=5.0))
+
+    def test_robot_status_changes(self):
+        connection = self.connection = connect(self.server)
+        changes = []
+        in_motion_changes = []
+        connection.add_robot_status_change_callback(changes.append)
+        connection.add_robot_status_change_callback(
+            in_motion_changes.append, fields=[RobotStatusField.IN_MOTION]
+        )
+
+        stopped = robot_status_msg(Ternary.FALSE)
+        moving = robot_status_msg(Ternary.TRUE)
+        alarm = robot_status_msg(Ternary.TRUE)
+        alarm.body.in_error = Ternary.TRUE
+        alarm.body.error_code = 4107
+        sent = time.perf_counter()
+        self.server.send(stopped, moving, moving, alarm)
+        self.assertTrue(wait_for(lambda: len(changes) == 3))
+        received = time.perf_counter()
+        self.assertTrue(wait_for(lambda: len(in_motion_changes) == 1))
+
+        self.assertEqual(
+            [(c.field, c.old, c.new) for c in changes],
+            [
+                (RobotStatusField.IN_MOTION, Ternary.FALSE, Ternary.TRUE),
+                (RobotStatusField.ERROR_CODE, 0, 4107),
+                (RobotStatusField.IN_ERROR, Ternary.FALSE, Ternary.TRUE),
+            ],
+        )
+        self.assertEqual(changes[1].stamp, changes[2].stamp)
+        # Stamped with the arrival time of the frame
+        self.assertTrue(sent <= changes[0].stamp <= changes[1].stamp <= received)
+        self.assertEqual(in_motion_changes, changes[:1])
+
+    def test_filtered_callback(self):
+        received = []
+        connection = self.connection = connect(self.server)
+        subscriber = connection.add_joint_feedback_msg_callback(
+            received.append, every_nth=2, deadband=1.5
+        )
+        self.server.send(*(joint_feedback_msg(k % 2, k * 0.25) for k in range(12)))
+        self.assertTrue(wait_for(lambda: subscriber.filtered + len(received) == 12))
+        self.assertTrue(wait_for(lambda: len(received) == 4))
+        self.assertEqual(
+            [(feedback.groupno, feedback.time) for feedback in received],
+            [(0, 0.0), (1, 0.25), (0, 2.0), (1, 2.25)],
+        )
+
+    def test_stats(self):
+        connection = self.connection = connect(self.server)
+        connection.reset_stats()
+        self.server.send(*(joint_feedback_msg(0, float(k)) for k in range(5)))
+        self.assertTrue(
+            wait_for(
+                lambda: MsgType.JOINT_FEEDBACK in connection.stats()
+                and connection.stats()[MsgType.JOINT_FEEDBACK].count == 5
+            )
+        )
+        self.assertNotIn(MsgType.ROBOT_STATUS, connection.stats())
+
+    @unittest.skipIf(np is None, "requires numpy")
+    def test_history(self):
+        connection = self.connection = connect(self.server)
+        history = connection.enable_history(0, capacity=100)
+        self.assertIs(connection.history(0), history)
+        self.assertIsNone(connection.history(1))
+
+        self.server.send(*(joint_feedback_msg(0, float(k)) for k in range(1, 6)))
+        self.assertTrue(wait_for(lambda: history.count == 5))
+        np.testing.assert_array_equal(history.last(3).time, [3.0, 4.0, 5.0])
+
+    @unittest.skipIf(np is None, "requires numpy")
+    def test_estimation(self):
+        connection = self.connection = connect(self.server)
+        group = ControlGroup(
+            ControlGroupDefinition("robot", 0, 2, ["joint_1", "joint_2"]),
+            None,
+            connection,
+        )
+        self.assertIsNone(connection.estimate(0))
+        connection.enable_estimation()
+
+        self.server.send(
+            *(joint_feedback_msg(0, k * 0.01, [k * 0.01] * 10) for k in range(1, 101))
+        )
+        self.assertTrue(wait_for(lambda: connection.joint_feedback(0).time == 1.0))
+        np.testing.assert_allclose(connection.estimate(0).vel, 1.0, atol=1e-3)
+        # The feedback has TIME | POSITION only, so the estimate is used
+        np.testing.assert_allclose(group.velocity, [1.0, 1.0], atol=1e-3)
+        np.testing.assert_allclose(group.acceleration, [0.0, 0.0], atol=1e-2)
+
+        connection.disable_estimation()
+        self.assertEqual(list(group.velocity), [0.0, 0.0])
+
+    @unittest.skipIf(np is None, "requires numpy")
+    def test_shared_state(self):
+        from moto.shared_state import SharedStateReader
+
+        connection = self.connection = connect(self.server)
+        publisher = connection.enable_shared_state()
+        self.assertIs(connection.shared_state(), publisher)
+        reader = SharedStateReader(publisher.name)
+        try:
+            # The state received before is published immediately
+            self.assertEqual(reader.robot_status(), robot_status_msg().body)
+            self.assertEqual(reader.joint_feedback(0).time, 0.0)
+
+            self.server.send(joint_feedback_msg(0, 1.0))
+            self.assertTrue(wait_for(lambda: reader.joint_feedback(0).time == 1.0))
+        finally:
+            reader.close()
+        connection.disable_shared_state()
+        self.assertIsNone(connection.shared_state())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+
+from moto.simple_message import MsgType
+from moto.statistics import JITTER_BIN_EDGES, Statistics
+
+
+class TestStatistics(unittest.TestCase):
+    def test_empty(self):
+        self.assertEqual(Statistics().snapshot(), {})
+
+    def test_single_message(self):
+        statistics = Statistics()
+        statistics.record(MsgType.ROBOT_STATUS, 1_000_000, 2_000, 3_000)
+
+        stats = statistics.snapshot()[MsgType.ROBOT_STATUS]
+        self.assertEqual(stats.count, 1)
+        self.assertEqual(stats.rate, 0.0)
+        self.assertEqual(stats.interarrival_mean, 0.0)
+        self.assertAlmostEqual(stats.decode_time_mean, 2e-6)
+        self.assertAlmostEqual(stats.callback_time_max, 3e-6)
+
+    def test_interarrival(self):
+        statistics = Statistics()
+        # 4 ms period, with one message 1 ms late
+        arrivals = [0, 4_000_000, 8_000_000, 13_000_000, 16_000_000]
+        for k, arrival in enumerate(arrivals):
+            statistics.record(MsgType.JOINT_FEEDBACK, arrival, 1_000 * (k + 1), 100)
+        statistics.record(MsgType.ROBOT_STATUS, 0, 0, 0)
+
+        snapshot = statistics.snapshot()
+        self.assertEqual(set(snapshot), {MsgType.JOINT_FEEDBACK, MsgType.ROBOT_STATUS})
+        stats = snapshot[MsgType.JOINT_FEEDBACK]
+        self.assertIs(stats.msg_type, MsgType.JOINT_FEEDBACK)
+        self.assertEqual(stats.count, 5)
+        self.assertAlmostEqual(stats.rate, 250.0)
+        self.assertAlmostEqual(stats.interarrival_min, 3e-3)
+        self.assertAlmostEqual(stats.interarrival_mean, 4e-3)
+        self.assertAlmostEqual(stats.interarrival_max, 5e-3)
+        self.assertEqual(len(stats.jitter_histogram), len(JITTER_BIN_EDGES) + 1)
+        self.assertEqual(sum(stats.jitter_histogram), 4)
+        self.assertAlmostEqual(stats.decode_time_mean, 3e-6)
+        self.assertAlmostEqual(stats.decode_time_max, 5e-6)
+        self.assertAlmostEqual(stats.callback_time_mean, 1e-7)
+
+    def test_reset(self):
+        statistics = Statistics()
+        statistics.record(MsgType.ROBOT_STATUS, 0, 0, 0)
+        statistics.reset()
+        self.assertEqual(statistics.snapshot(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,178 @@
+import threading
+import unittest
+from unittest import mock
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from moto.subscription import BackpressurePolicy, SampleFilter, Subscriber
+
+
+class Feedback:
+    def __init__(self, groupno: int, value: int, pos=None) -> None:
+        self.groupno = groupno
+        self.value = value
+        self.pos = pos
+
+
+class TestSubscriber(unittest.TestCase):
+    def setUp(self):
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.received = []
+
+    def slow_callback(self, msg):
+        self.started.set()
+        self.release.wait(5.0)
+        self.received.append(msg)
+
+    def fill(self, subscriber, values):
+        # The first message occupies the worker, the rest are queued
+        subscriber.put(values[0])
+        self.assertTrue(self.started.wait(5.0))
+        for value in values[1:]:
+            subscriber.put(value)
+
+    def test_block(self):
+        subscriber = Subscriber(self.slow_callback, BackpressurePolicy.BLOCK, 2)
+        self.fill(subscriber, [0, 1, 2])
+        self.assertEqual(subscriber.depth, 2)
+
+        producer = threading.Thread(target=subscriber.put, args=(3,))
+        producer.start()
+        producer.join(0.05)
+        self.assertTrue(producer.is_alive())
+
+        self.release.set()
+        producer.join(5.0)
+        subscriber.close(5.0)
+        self.assertEqual(self.received, [0, 1, 2, 3])
+        self.assertEqual(subscriber.dropped, 0)
+        self.assertEqual(subscriber.delivered, 4)
+
+    def test_drop_oldest(self):
+        subscriber = Subscriber(self.slow_callback, BackpressurePolicy.DROP_OLDEST, 2)
+        self.fill(subscriber, [0, 1, 2, 3, 4])
+        self.assertEqual(subscriber.depth, 2)
+        self.assertEqual(subscriber.dropped, 2)
+
+        self.release.set()
+        subscriber.close(5.0)
+        self.assertEqual(self.received, [0, 3, 4])
+        self.assertEqual(subscriber.max_depth, 2)
+
+    def test_coalesce(self):
+        subscriber = Subscriber(
+            lambda msg: self.slow_callback((msg.groupno, msg.value)),
+            BackpressurePolicy.COALESCE,
+            coalesce_key=lambda msg: msg.groupno,
+        )
+        self.fill(
+            subscriber,
+            [Feedback(0, 0), Feedback(0, 1), Feedback(1, 1), Feedback(0, 2)],
+        )
+        self.assertEqual(subscriber.depth, 2)
+        self.assertEqual(subscriber.dropped, 1)
+
+        self.release.set()
+        subscriber.close(5.0)
+        self.assertEqual(self.received, [(0, 0), (0, 2), (1, 1)])
+
+    def test_callback_exception(self):
+        def callback(msg):
+            raise RuntimeError(msg)
+
+        subscriber = Subscriber(callback)
+        with self.assertLogs("moto.subscription"):
+            subscriber.put(0)
+            subscriber.close(5.0)
+        self.assertEqual(subscriber.errors, 1)
+
+    def test_close_from_callback(self):
+        def callback(msg):
+            self.slow_callback(msg)
+            # Removing the callback from itself must not join its own thread
+            subscriber.close()
+
+        subscriber = Subscriber(callback)
+        self.fill(subscriber, [0, 1, 2])
+        self.release.set()
+        subscriber._worker_thread.join(5.0)
+        self.assertFalse(subscriber._worker_thread.is_alive())
+        self.assertEqual(self.received, [0])
+        self.assertEqual(subscriber.dropped, 2)
+        self.assertEqual(subscriber.errors, 0)
+
+    def test_sample_filter(self):
+        subscriber = Subscriber(
+            self.received.append, sample_filter=SampleFilter(every_nth=3)
+        )
+        for value in range(7):
+            subscriber.put(value)
+        subscriber.close(5.0)
+        self.assertEqual(self.received, [0, 3, 6])
+        self.assertEqual(subscriber.filtered, 4)
+        self.assertEqual(subscriber.received, 3)
+
+
+class TestSampleFilter(unittest.TestCase):
+    def accepted(self, sample_filter, msgs):
+        return [msg.value for msg in msgs if sample_filter.accept(msg)]
+
+    def test_every_nth_per_key(self):
+        sample_filter = SampleFilter(every_nth=2, key=lambda msg: msg.groupno)
+        msgs = [Feedback(k % 2, k) for k in range(8)]
+        self.assertEqual(self.accepted(sample_filter, msgs), [0, 1, 4, 5])
+
+    def test_max_rate(self):
+        sample_filter = SampleFilter(max_rate=10.0)
+        with mock.patch("moto.subscription.time.monotonic") as monotonic:
+            accepted = []
+            for k in range(25):
+                # 40 ms period
+                monotonic.return_value = 100.0 + k * 0.04
+                if sample_filter.accept(Feedback(0, k)):
+                    accepted.append(k)
+        self.assertEqual(accepted, [0, 3, 6, 9, 12, 15, 18, 21, 24])
+
+    def test_deadband(self):
+        sample_filter = SampleFilter(
+            deadband=[0.1, 1.0], positions=lambda msg: msg.pos
+        )
+        msgs = [
+            Feedback(0, 0, [0.0, 0.0]),
+            Feedback(0, 1, [0.05, 0.5]),
+            Feedback(0, 2, [0.15, 0.5]),
+            Feedback(0, 3, [0.2, 1.0]),
+            Feedback(0, 4, [0.2, 1.6]),
+        ]
+        self.assertEqual(self.accepted(sample_filter, msgs), [0, 2, 4])
+
+        sample_filter = SampleFilter(deadband=0.3, positions=lambda msg: msg.pos)
+        self.assertEqual(self.accepted(sample_filter, msgs), [0, 1, 3, 4])
+
+    @unittest.skipIf(np is None, "requires numpy")
+    def test_numpy_deadband(self):
+        msgs = [Feedback(0, k, [0.2 * k, 0.0]) for k in range(5)]
+        sample_filter = SampleFilter(
+            deadband=np.float32(0.3), positions=lambda msg: msg.pos
+        )
+        self.assertEqual(self.accepted(sample_filter, msgs), [0, 2, 4])
+        sample_filter = SampleFilter(
+            deadband=np.array([0.3, 0.1]), positions=lambda msg: msg.pos
+        )
+        self.assertEqual(self.accepted(sample_filter, msgs), [0, 2, 4])
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            SampleFilter(max_rate=0.0)
+        with self.assertRaises(ValueError):
+            SampleFilter(every_nth=0)
+        with self.assertRaises(ValueError):
+            SampleFilter(deadband=0.1)
+
+
+if __name__ == "__main__":
+    unittest.main()
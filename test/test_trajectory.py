@@ -0,0 +1,157 @@
+import unittest
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from moto.control_group import ControlGroupDefinition
+from moto.simple_message import (
+    CommType,
+    Header,
+    JointTrajPtExData,
+    JointTrajPtFullEx,
+    MsgType,
+    Prefix,
+    ReplyType,
+    SimpleMessage,
+    ValidFields,
+)
+
+if np is not None:
+    from moto.trajectory import Trajectory
+
+ROBOT = ControlGroupDefinition("robot", 0, 6, [f"joint_{k}" for k in range(6)])
+POSITIONER = ControlGroupDefinition("positioner", 1, 2, ["joint_1", "joint_2"])
+
+
+@unittest.skipIf(np is None, "requires numpy")
+class TestTrajectory(unittest.TestCase):
+    def trajectory(self, num_points: int = 3) -> "Trajectory":
+        time = np.arange(num_points) * 0.5
+        trajectory = Trajectory()
+        # Added out of order, sent in the order of the group numbers
+        trajectory.add_group(POSITIONER, time + 0.25, np.full((num_points, 2), 0.3))
+        trajectory.add_group(
+            ROBOT,
+            time,
+            np.outer(np.arange(num_points), np.ones(6)) * 0.1,
+            vel=np.full((num_points, 6), 0.2),
+        )
+        return trajectory
+
+    def test_messages(self):
+        trajectory = self.trajectory()
+        self.assertEqual(len(trajectory), 3)
+        self.assertEqual(trajectory.control_groups, [ROBOT, POSITIONER])
+
+        messages = list(trajectory.messages(sequence_start=4))
+
+        self.assertEqual(len(messages), 3)
+        expected = JointTrajPtFullEx(
+            number_of_valid_groups=2,
+            sequence=5,
+            joint_traj_pt_data=[
+                JointTrajPtExData(
+                    0,
+                    ValidFields.TIME | ValidFields.POSITION | ValidFields.VELOCITY,
+                    0.5,
+                    [0.1] * 6,
+                    [0.2] * 6,
+                    [0.0] * 6,
+                ),
+                JointTrajPtExData(
+                    1,
+                    ValidFields.TIME | ValidFields.POSITION,
+                    0.75,
+                    [0.3] * 2,
+                    [0.0] * 2,
+                    [0.0] * 2,
+                ),
+            ],
+        )
+        self.assertEqual(messages[1].to_bytes(), expected.to_bytes())
+
+    def test_pack(self):
+        trajectory = self.trajectory()
+        packed = trajectory.pack(sequence_start=2)
+        self.assertEqual(len(packed), 3)
+        for k, (msg, point) in enumerate(zip(packed, trajectory.messages(2))):
+            expected = SimpleMessage(
+                Header(
+                    MsgType.MOTO_JOINT_TRAJ_PT_FULL_EX,
+                    CommType.SERVICE_REQUEST,
+                    ReplyType.INVALID,
+                ),
+                point,
+            )
+            self.assertEqual(point.sequence, 2 + k)
+            self.assertEqual(bytes(msg), expected.to_bytes())
+
+    def test_goals_and_times(self):
+        trajectory = self.trajectory()
+        self.assertEqual(trajectory.times(), [0.0, 0.25, 0.5, 0.75, 1.0, 1.25])
+        goals = trajectory.goals()
+        np.testing.assert_allclose(goals[0], [0.2] * 6)
+        np.testing.assert_allclose(goals[1], [0.3] * 2)
+
+    def test_add_group_errors(self):
+        trajectory = Trajectory()
+        with self.assertRaises(ValueError):
+            trajectory.add_group(ROBOT, [0.0, 1.0], np.zeros((2, 5)))
+        with self.assertRaises(ValueError):
+            trajectory.add_group(ROBOT, [0.0, 1.0], np.zeros((2, 6)), np.zeros((3, 6)))
+        trajectory.add_group(ROBOT, [0.0, 1.0], np.zeros((2, 6)))
+        with self.assertRaises(ValueError):
+            trajectory.add_group(ROBOT, [0.0, 1.0], np.zeros((2, 6)))
+
+    def test_validate(self):
+        with self.assertRaisesRegex(ValueError, "no groups"):
+            Trajectory().validate()
+
+        trajectory = Trajectory()
+        trajectory.add_group(ROBOT, [0.0, 1.0], np.zeros((2, 6)))
+        trajectory.add_group(POSITIONER, [0.0], np.zeros((1, 2)))
+        with self.assertRaisesRegex(ValueError, "same number of points"):
+            trajectory.validate()
+
+        trajectory = Trajectory()
+        trajectory.add_group(ROBOT, [0.0, 1.0, 1.0], np.zeros((3, 6)))
+        with self.assertRaisesRegex(ValueError, "point 2"):
+            trajectory.validate()
+        # Not even started, messages() validates at once
+        with self.assertRaises(ValueError):
+            trajectory.messages()
+
+        # Distinct as 64-bit floats, but not as sent
+        trajectory = Trajectory()
+        trajectory.add_group(ROBOT, [0.0, 100.0, 100.0 + 1e-7], np.zeros((3, 6)))
+        with self.assertRaisesRegex(ValueError, "point 2"):
+            trajectory.validate()
+
+        trajectory = Trajectory()
+        pos = np.zeros((3, 6))
+        pos[1, 4] = np.nan
+        trajectory.add_group(ROBOT, [0.0, 1.0, 2.0], pos)
+        with self.assertRaisesRegex(ValueError, "Point 1 .* non-finite pos"):
+            trajectory.validate()
+
+        trajectory = Trajectory()
+        trajectory.add_group(ROBOT, [-1.0, 1.0], np.zeros((2, 6)))
+        with self.assertRaisesRegex(ValueError, "negative"):
+            trajectory.validate()
+
+    def test_large(self):
+        num_points = 50000
+        trajectory = self.trajectory(num_points)
+        packed = trajectory.pack()
+        self.assertEqual(len(packed), num_points)
+        last = JointTrajPtFullEx.from_bytes(
+            packed.message(num_points - 1), Prefix.size + Header.size
+        )
+        self.assertEqual(last.sequence, num_points - 1)
+        self.assertEqual(last.joint_traj_pt_data[0].time, (num_points - 1) * 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
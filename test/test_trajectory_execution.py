@@ -0,0 +1,202 @@
+import threading
+import unittest
+from concurrent.futures import Future
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from moto.control_group import ControlGroupDefinition
+from moto.simple_message import (
+    CommType,
+    Header,
+    JointFeedback,
+    JointTrajPtFull,
+    MotoMotionReply,
+    MsgType,
+    ReplyType,
+    ResultType,
+    RobotStatus,
+    SimpleMessage,
+    Ternary,
+    ValidFields,
+)
+from moto.trajectory_execution import TrajectoryExecution, TrajectoryResult
+from moto.trajectory_executor import TrajectoryExecutionError
+
+if np is not None:
+    from moto.trajectory import Trajectory
+
+
+def point(sequence: int, t: float, pos: float, groupno: int = 0) -> JointTrajPtFull:
+    return JointTrajPtFull(
+        groupno,
+        sequence,
+        ValidFields.TIME | ValidFields.POSITION,
+        t,
+        [pos] * 10,
+        [0.0] * 10,
+        [0.0] * 10,
+    )
+
+
+def feedback(pos, groupno: int = 0) -> JointFeedback:
+    return JointFeedback(
+        groupno, ValidFields.POSITION, 0.0, list(pos), [0.0] * 10, [0.0] * 10
+    )
+
+
+def robot_status(in_motion: Ternary) -> RobotStatus:
+    return RobotStatus(1, 0, 0, 0, in_motion, 2, 1)
+
+
+class FakeMotionConnection:
+    def __init__(self, rejected=()) -> None:
+        self.rejected = set(rejected)
+        self.sent = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def request_frame(self, frame, sequence) -> Future:
+        future = Future()
+        future.set_result(
+            self.send_joint_trajectory_point(SimpleMessage.from_bytes(frame).body)
+        )
+        return future
+
+    def send_joint_trajectory_point(self, point) -> SimpleMessage:
+        self.release.wait()
+        self.sent.append(point.sequence)
+        if point.sequence in self.rejected:
+            result = ResultType.INVALID
+        else:
+            result = ResultType.SUCCESS
+        return SimpleMessage(
+            Header(
+                MsgType.MOTO_MOTION_REPLY, CommType.SERVICE_REPLY, ReplyType.SUCCESS
+            ),
+            MotoMotionReply(
+                getattr(point, "groupno", 0),
+                point.sequence,
+                MsgType.JOINT_TRAJ_PT_FULL,
+                result,
+                0,
+            ),
+        )
+
+
+class FakeStateConnection:
+    """Evaluates the waiters whenever the state is set, like the receive thread."""
+
+    def __init__(self) -> None:
+        self._condition = threading.Condition()
+        self._joint_feedback = {}
+        self._robot_status = None
+
+    def joint_feedback(self, groupno: int) -> JointFeedback:
+        return self._joint_feedback.get(groupno)
+
+    def robot_status(self) -> RobotStatus:
+        return self._robot_status
+
+    def set(self, joint_feedback=None, robot_status=None) -> None:
+        with self._condition:
+            if joint_feedback is not None:
+                self._joint_feedback[joint_feedback.groupno] = joint_feedback
+            if robot_status is not None:
+                self._robot_status = robot_status
+            self._condition.notify_all()
+
+    def wait_for(self, predicate, timeout=None) -> bool:
+        with self._condition:
+            return self._condition.wait_for(predicate, timeout)
+
+
+class TestTrajectoryExecution(unittest.TestCase):
+    def setUp(self):
+        self.motion = FakeMotionConnection()
+        self.state = FakeStateConnection()
+        self.state.set(feedback([0.0] * 10), robot_status(Ternary.FALSE))
+
+    def test_resolves_at_goal(self):
+        points = [point(0, 0.0, 0.0), point(1, 0.5, 1.0), point(2, 1.0, 2.0)]
+        execution = TrajectoryExecution(points, self.motion, self.state).start()
+        self.assertEqual(execution.duration, 1.0)
+
+        self.state.set(feedback([1.0] * 10), robot_status(Ternary.TRUE))
+        self.assertFalse(execution.done())
+        self.assertEqual(execution.tracking_error[0], [-1.0] * 10)
+        self.assertLessEqual(execution.remaining_time, 1.0)
+        self.assertIn(execution.segment, (1, 2))
+
+        # At the goal, but still moving
+        self.state.set(feedback([2.0] * 10))
+        self.assertFalse(execution.done())
+
+        self.state.set(robot_status=robot_status(Ternary.FALSE))
+        result = execution.result(timeout=5.0)
+        self.assertIsInstance(result, TrajectoryResult)
+        self.assertEqual(result.tracking_error, {0: [0.0] * 10})
+        self.assertEqual(execution.points_accepted, 3)
+        self.assertEqual(execution.remaining_time, 0.0)
+        self.assertEqual(self.motion.sent, [0, 1, 2])
+
+    def test_tolerance_and_num_joints(self):
+        points = [point(0, 0.0, 0.0), point(1, 0.1, 1.0)]
+        execution = TrajectoryExecution(
+            points, self.motion, self.state, tol=0.01, num_joints={0: 6}
+        ).start()
+        # Joints beyond the sixth are not part of the group
+        self.state.set(feedback([1.005] * 6 + [0.0] * 4))
+        result = execution.result(timeout=5.0)
+        self.assertEqual(len(result.tracking_error[0]), 6)
+
+    def test_progress_before_first_point(self):
+        self.motion.release.clear()
+        points = [point(0, 0.0, 0.0), point(1, 2.0, 1.0)]
+        execution = TrajectoryExecution(points, self.motion, self.state).start()
+        self.assertEqual(execution.elapsed, 0.0)
+        self.assertEqual(execution.segment, 1)
+        self.assertEqual(execution.remaining_time, 2.0)
+        self.motion.release.set()
+        self.state.set(feedback([1.0] * 10))
+        execution.result(timeout=5.0)
+
+    def test_timeout(self):
+        points = [point(0, 0.0, 0.0), point(1, 0.0, 1.0)]
+        execution = TrajectoryExecution(
+            points, self.motion, self.state, settle_timeout=0.05
+        ).start()
+        self.assertIsInstance(execution.exception(timeout=5.0), TimeoutError)
+
+    def test_rejected(self):
+        self.motion.rejected.add(1)
+        points = [point(0, 0.0, 0.0), point(1, 1.0, 1.0)]
+        execution = TrajectoryExecution(points, self.motion, self.state).start()
+        with self.assertRaises(TrajectoryExecutionError):
+            execution.result(timeout=5.0)
+
+    @unittest.skipIf(np is None, "requires numpy")
+    def test_trajectory(self):
+        trajectory = Trajectory()
+        trajectory.add_group(
+            ControlGroupDefinition("robot", 0, 6, [f"joint_{k}" for k in range(6)]),
+            [0.0, 0.5, 1.0],
+            np.outer([0.0, 1.0, 2.0], np.ones(6)),
+        )
+        execution = TrajectoryExecution(trajectory, self.motion, self.state).start()
+        self.assertEqual(execution.duration, 1.0)
+        # Only the six joints of the group are compared with the goal
+        self.state.set(feedback([2.0] * 6 + [5.0] * 4))
+        result = execution.result(timeout=5.0)
+        self.assertEqual(result.tracking_error, {0: [0.0] * 6})
+        self.assertEqual(self.motion.sent, [0, 1, 2])
+
+    def test_empty(self):
+        with self.assertRaises(ValueError):
+            TrajectoryExecution([], self.motion, self.state)
+
+
+if __name__ == "__main__":
+    unittest.main()
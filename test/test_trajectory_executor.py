@@ -0,0 +1,181 @@
+import unittest
+from concurrent.futures import Future
+from unittest import mock
+
+from moto.packed_trajectory import pack_joint_trajectory
+from moto.simple_message import (
+    CommandType,
+    CommType,
+    Header,
+    JointTrajPtExData,
+    JointTrajPtFull,
+    JointTrajPtFullEx,
+    MotoMotionReply,
+    MsgType,
+    ReplyType,
+    ResultType,
+    SimpleMessage,
+    ValidFields,
+)
+from moto.trajectory_executor import (
+    TrajectoryCancelled,
+    TrajectoryExecutionError,
+    TrajectoryExecutor,
+)
+
+
+def point(sequence: int, groupno: int = 0) -> JointTrajPtFull:
+    return JointTrajPtFull(
+        groupno,
+        sequence,
+        ValidFields.TIME | ValidFields.POSITION,
+        float(sequence),
+        [0.0] * 10,
+        [0.0] * 10,
+        [0.0] * 10,
+    )
+
+
+def reply(
+    groupno: int, sequence: int, command, result: ResultType, subcode: int = 0
+) -> SimpleMessage:
+    return SimpleMessage(
+        Header(MsgType.MOTO_MOTION_REPLY, CommType.SERVICE_REPLY, ReplyType.SUCCESS),
+        MotoMotionReply(groupno, sequence, command, result, subcode),
+    )
+
+
+class FakeMotionConnection:
+    """Replies BUSY `busy[sequence]` times before accepting a point."""
+
+    def __init__(self, busy=None, queue_count=50, rejected=()) -> None:
+        self.busy = dict(busy or {})
+        self.queue_count = queue_count
+        self.rejected = set(rejected)
+        self.sent = []
+        self.frames = []
+        self.queue_count_requests = []
+
+    def send_joint_trajectory_point(self, point) -> SimpleMessage:
+        self.sent.append(point.sequence)
+        if self.busy.get(point.sequence, 0) > 0:
+            self.busy[point.sequence] -= 1
+            result = ResultType.BUSY
+        elif point.sequence in self.rejected:
+            result = ResultType.INVALID
+        else:
+            result = ResultType.SUCCESS
+        return reply(0, point.sequence, MsgType.JOINT_TRAJ_PT_FULL, result)
+
+    def request_frame(self, frame, sequence) -> Future:
+        self.frames.append(bytes(frame))
+        future = Future()
+        future.set_result(
+            self.send_joint_trajectory_point(SimpleMessage.from_bytes(frame).body)
+        )
+        return future
+
+    def check_queue_count(self, groupno: int) -> SimpleMessage:
+        self.queue_count_requests.append(groupno)
+        if self.queue_count is None:
+            return reply(groupno, -1, CommandType.CHECK_QUEUE_CNT, ResultType.FAILURE)
+        return reply(
+            groupno,
+            -1,
+            CommandType.CHECK_QUEUE_CNT,
+            ResultType.SUCCESS,
+            self.queue_count,
+        )
+
+
+class TestTrajectoryExecutor(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch("threading.Event.wait")
+        self.wait = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def delays(self):
+        return [call.args[0] for call in self.wait.call_args_list]
+
+    def test_resends_busy_points_in_order(self):
+        connection = FakeMotionConnection(busy={1: 2, 3: 1})
+        executor = TrajectoryExecutor(connection)
+        accepted = []
+
+        results = executor.execute((point(k) for k in range(5)), accepted.append)
+
+        self.assertEqual(connection.sent, [0, 1, 1, 1, 2, 3, 3, 4])
+        self.assertEqual([r.point.sequence for r in results], list(range(5)))
+        self.assertEqual(accepted, results)
+        self.assertEqual(executor.busy_replies, 3)
+
+    def test_packed(self):
+        connection = FakeMotionConnection(busy={1: 1})
+        packed = pack_joint_trajectory(0, [0.0, 1.0, 2.0], [[0.0] * 6] * 3)
+        results = TrajectoryExecutor(connection).execute(packed)
+        self.assertEqual(connection.sent, [0, 1, 1, 2])
+        self.assertEqual(connection.frames[2], bytes(packed.message(1)))
+        self.assertEqual([r.reply.sequence for r in results], [0, 1, 2])
+        # Only the point that was resent was decoded
+        self.assertEqual([r.point for r in results], [None, packed.point(1), None])
+
+    def test_delay_from_queue_count(self):
+        connection = FakeMotionConnection(busy={0: 1}, queue_count=45)
+        executor = TrajectoryExecutor(
+            connection, low_watermark=20, interpolation_period=0.004
+        )
+        executor.execute([point(0)])
+        self.assertEqual(connection.queue_count_requests, [0])
+        self.assertAlmostEqual(self.delays()[0], 0.1)
+
+        connection = FakeMotionConnection(busy={0: 1}, queue_count=5)
+        executor = TrajectoryExecutor(connection, min_backoff=0.002)
+        executor.execute([point(0)])
+        self.assertAlmostEqual(self.delays()[1], 0.002)
+        self.assertAlmostEqual(executor.waited, 0.002)
+
+    def test_exponential_backoff_without_queue_count(self):
+        connection = FakeMotionConnection(busy={0: 4}, queue_count=None)
+        executor = TrajectoryExecutor(connection, min_backoff=0.01, max_backoff=0.05)
+        executor.execute([point(0)])
+        self.assertEqual(self.delays(), [0.01, 0.02, 0.04, 0.05])
+
+    def test_queue_count_of_all_groups(self):
+        connection = FakeMotionConnection(busy={0: 1})
+        ex_point = JointTrajPtFullEx(
+            number_of_valid_groups=2,
+            sequence=0,
+            joint_traj_pt_data=[
+                JointTrajPtExData(
+                    groupno, ValidFields.TIME, 0.0, [0.0] * 10, [0.0] * 10, [0.0] * 10
+                )
+                for groupno in (0, 1)
+            ],
+        )
+        TrajectoryExecutor(connection).execute([ex_point])
+        self.assertEqual(connection.queue_count_requests, [0, 1])
+
+    def test_rejected(self):
+        connection = FakeMotionConnection(rejected={2})
+        with self.assertRaises(TrajectoryExecutionError) as context:
+            TrajectoryExecutor(connection).execute(point(k) for k in range(5))
+        self.assertEqual(context.exception.result.index, 2)
+        self.assertEqual(connection.sent, [0, 1, 2])
+
+    def test_cancel(self):
+        connection = FakeMotionConnection(busy={1: 1})
+        executor = TrajectoryExecutor(connection)
+        self.wait.side_effect = lambda timeout: executor.cancel()
+        with self.assertRaises(TrajectoryCancelled):
+            executor.execute(point(k) for k in range(5))
+        self.assertEqual(connection.sent, [0, 1])
+
+    def test_invalid_backoff(self):
+        with self.assertRaises(ValueError):
+            TrajectoryExecutor(
+                FakeMotionConnection(), min_backoff=0.1, max_backoff=0.01
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()